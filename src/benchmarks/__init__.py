@@ -0,0 +1,7 @@
+"""Benchmarks for the model and controller hot paths.
+
+    python -m benchmarks --rows 100000 --out results.json
+    python -m benchmarks.ledger_generator --rows 1000000 data/big.json
+    python -m benchmarks.gui --sizes 1000 10000 100000
+    python -m benchmarks.memory --rows 10000 --refreshes 200
+"""
@@ -0,0 +1,40 @@
+import argparse
+import json
+import sys
+
+from benchmarks.suite import BUDGETS_FILE, LedgerBenchmarks, format_report, load_budgets, over_budget, run
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks",
+                                     description="Time the model and controller hot paths")
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--only', nargs='+', choices=LedgerBenchmarks.NAMES)
+    parser.add_argument('--out', help="write the results as JSON here")
+    parser.add_argument('--baseline', help="results JSON of an earlier run to compare against")
+    parser.add_argument('--budgets', default=BUDGETS_FILE, help="per-operation budgets (default: %(default)s)")
+    parser.add_argument('--no-budgets', action='store_true', help="report only, never fail")
+    args = parser.parse_args()
+
+    budgets = None if args.no_budgets else load_budgets(args.budgets)
+    document = run(args.rows, args.seed, args.repeat, args.only, budgets)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+    print(format_report(document, baseline))
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(document, f, indent=2)
+
+    failed = over_budget(document)
+    if failed:
+        print(f"Over budget: {', '.join(failed)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""Offscreen benchmark of MainWindow refreshes on generated ledgers.
+
+    python -m benchmarks.gui --sizes 1000 10000 100000 --frame-budget-ms 100 --out gui.json
+
+For each ledger size a MainWindow is shown (analytics tab built) and
+refreshed after a one-row change, the way the app does after an add. Each
+phase of refresh_data is timed on its own, including the event processing
+(layout and paint) it causes, along with the live QObject count. A second
+pass drives the same refreshes from timers inside the running event loop
+while a heartbeat timer measures how long the loop stalls.
+
+Exits 1 if any refresh takes longer than --frame-budget-ms.
+"""
+import os
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import argparse
+import json
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List
+
+from PyQt6.QtCore import QCoreApplication, QElapsedTimer, QEvent, QObject, QTimer
+from PyQt6.QtWidgets import QApplication
+
+from benchmarks.suite import LedgerBenchmarks, git_revision
+from models.budget import Transaction
+from views.main_window import MainWindow
+from views.styles.styles import HyprlandStyles
+
+PHASES = ('label', 'transactions_table', 'summary_table', 'income_expense_chart', 'balance_chart', 'events')
+HEADINGS = ('label', 'table', 'summary', 'bar chart', 'line chart', 'events')
+
+
+def flush_events(app: QApplication):
+    """Run pending layout/paint work and actually delete deleteLater()'d objects"""
+    app.processEvents()
+    QCoreApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete.value)
+
+
+def qobject_count(window: MainWindow) -> int:
+    return len(window.findChildren(QObject)) + 1
+
+
+def touch_ledger(bench: LedgerBenchmarks):
+    """One new row, so the next refresh has real work to do"""
+    bench.model.add_transactions([Transaction(
+        str(uuid.UUID(int=bench.rng.getrandbits(128), version=4)), 9.99, 'Food',
+        'Benchmark lunch', '2022-06-15T12:00:00', 'expense')], save=False)
+
+
+def time_phases(app: QApplication, window: MainWindow) -> Dict[str, float]:
+    """Milliseconds per refresh_data phase"""
+    steps = {
+        'label': window.refresh_balance,
+        'transactions_table': window.transactions_table.refresh,
+        'summary_table': window.refresh_summary_table,
+        'income_expense_chart': window.update_income_expense_chart,
+        'balance_chart': window.update_balance_chart,
+        'events': lambda: flush_events(app),
+    }
+    timings = {}
+    for phase in PHASES:
+        start = time.perf_counter()
+        steps[phase]()
+        timings[phase] = (time.perf_counter() - start) * 1000
+    return timings
+
+
+def measure_stalls(app: QApplication, window: MainWindow, bench: LedgerBenchmarks,
+                   refreshes: int, interval_ms: int = 5, spacing_ms: int = 100) -> List[float]:
+    """Event-loop gaps (ms beyond the heartbeat interval) while refreshes run from timers"""
+    gaps: List[float] = []
+    clock = QElapsedTimer()
+    heartbeat = QTimer()
+    heartbeat.setInterval(interval_ms)
+
+    def beat():
+        gaps.append(max(0.0, clock.nsecsElapsed() / 1e6 - interval_ms))
+        clock.restart()
+
+    def refresh():
+        touch_ledger(bench)
+        window.refresh_data()
+
+    heartbeat.timeout.connect(beat)
+    clock.start()
+    heartbeat.start()
+    for i in range(refreshes):
+        QTimer.singleShot(spacing_ms * (i + 1), refresh)
+    deadline = time.perf_counter() + spacing_ms * (refreshes + 1) / 1000
+    while time.perf_counter() < deadline:
+        app.processEvents()
+        time.sleep(0.001)
+    heartbeat.stop()
+    return gaps
+
+
+def run_size(app: QApplication, rows: int, seed: int, repeat: int, frame_budget_ms: float) -> Dict:
+    bench = LedgerBenchmarks(rows, seed)
+    window = MainWindow(bench.controller)
+    try:
+        window.resize(1300, 800)
+        window.show()
+        for index in range(window.tabs.count()):
+            if window.tabs.tabText(index) == "Analytics":
+                window.ensure_tab_built(index)
+        flush_events(app)
+
+        samples: List[Dict[str, float]] = []
+        objects: List[int] = []
+        for _ in range(repeat):
+            touch_ledger(bench)
+            samples.append(time_phases(app, window))
+            objects.append(qobject_count(window))
+        totals = [sum(sample.values()) for sample in samples]
+        gaps = sorted(measure_stalls(app, window, bench, refreshes=repeat))
+
+        return {
+            'phases_ms': {phase: statistics.median(s[phase] for s in samples) for phase in PHASES},
+            'refresh_ms': {'median': statistics.median(totals), 'max': max(totals)},
+            # Steady-state live objects; growth between refreshes means a leak
+            'qobjects': {'first': objects[0], 'last': objects[-1], 'growth': objects[-1] - objects[0]},
+            'event_loop': {
+                'max_stall_ms': gaps[-1] if gaps else 0.0,
+                'p95_gap_ms': gaps[int(0.95 * (len(gaps) - 1))] if gaps else 0.0,
+                'stalls_over_budget': sum(1 for gap in gaps if gap > frame_budget_ms),
+            },
+            'frame_budget_ms': frame_budget_ms,
+            'within_budget': max(totals) <= frame_budget_ms,
+        }
+    finally:
+        window.close()
+        window.deleteLater()
+        flush_events(app)
+        bench.close()
+
+
+def format_report(document: Dict) -> str:
+    lines = [f"{'rows':>9}" + "".join(f"{heading:>12}" for heading in HEADINGS)
+             + f"{'refresh max':>13}{'stall max':>11}{'objs +':>8}"]
+    for rows, result in document['results'].items():
+        line = f"{int(rows):>9,}" + "".join(f"{result['phases_ms'][phase]:>12.2f}" for phase in PHASES)
+        line += (f"{result['refresh_ms']['max']:>13.1f}{result['event_loop']['max_stall_ms']:>11.1f}"
+                 f"{result['qobjects']['growth']:>8}")
+        if not result['within_budget']:
+            line += "  OVER BUDGET"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.gui",
+                                     description="Time MainWindow refreshes offscreen")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10_000, 100_000])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--frame-budget-ms', type=float, default=250.0,
+                        help="longest acceptable refresh (default: %(default)s)")
+    parser.add_argument('--out', help="write the results as JSON here")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    HyprlandStyles.setup_app_style(app)
+    document = {
+        'meta': {
+            'sizes': args.sizes,
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'platform': app.platformName(),
+            'revision': git_revision(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+        },
+        'results': {str(rows): run_size(app, rows, args.seed, args.repeat, args.frame_budget_ms)
+                    for rows in args.sizes},
+    }
+    print(format_report(document))
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(document, f, indent=2)
+
+    failed = [rows for rows, result in document['results'].items() if not result['within_budget']]
+    if failed:
+        print(f"Refresh over {args.frame_budget_ms} ms at {', '.join(failed)} rows", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
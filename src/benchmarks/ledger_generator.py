@@ -0,0 +1,122 @@
+"""Deterministic synthetic ledgers, from a thousand to tens of millions of rows.
+
+The same (count, seed) always gives the same transactions, spread over
+`years` years from 2020: small ledgers look like a household's, big ones
+like a business with thousands of rows a day. Expenses are spread over
+categories by weight, with log-normal amounts per category and more
+spending at weekends; income is a twice-monthly salary plus occasional
+freelance and investment payments. The salary covers the expected
+spending (household ledgers get at least SALARY) and the side income
+grows with it, so balances of big ledgers drift up the way a
+household's do instead of sinking by millions. Rows come out oldest
+first.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import uuid
+from datetime import datetime, timedelta
+from typing import Iterator
+
+from models.budget import Transaction
+
+# category: (weight, median amount, spread, descriptions)
+EXPENSES = {
+    'Food': (40, 18.0, 0.7, ['Tesco', 'Lidl', 'Starbucks', 'Corner Cafe', 'Pizza Place', 'Whole Foods']),
+    'Transport': (18, 12.0, 0.8, ['Uber trip', 'Shell fuel', 'Metro card', 'City parking', 'Train ticket']),
+    'Shopping': (14, 45.0, 1.0, ['Amazon', 'IKEA', 'Zara', 'eBay', 'Hardware store']),
+    'Entertainment': (10, 15.0, 0.9, ['Netflix', 'Spotify', 'Cinema', 'Steam', 'Concert tickets']),
+    'Bills': (10, 80.0, 0.6, ['Electricity', 'Water', 'Broadband', 'Mobile phone', 'Insurance']),
+    'Healthcare': (8, 35.0, 0.9, ['Pharmacy', 'Dentist', 'Doctor visit', 'Optician']),
+}
+SALARY = 3200.0  # monthly, the least a ledger is paid
+WEEKDAY_RATE, WEEKEND_RATE = 0.85, 1.4  # of per_day
+START = datetime(2020, 1, 1)
+
+
+def _amount(rng: random.Random, median: float, spread: float) -> float:
+    return round(rng.lognormvariate(math.log(median), spread), 2)
+
+
+def monthly_salary(per_day: float) -> float:
+    """Salary for a ledger spending on per_day rows a day, from the mean of each category's log-normal"""
+    weight = sum(w for w, _, _, _ in EXPENSES.values())
+    mean = sum(w * median * math.exp(spread ** 2 / 2) for w, median, spread, _ in EXPENSES.values()) / weight
+    rows_per_day = per_day * (5 * WEEKDAY_RATE + 2 * WEEKEND_RATE) / 7
+    return max(SALARY, rows_per_day * mean * 365 / 12)
+
+
+def generate_transactions(count: int, seed: int = 0, start: datetime = START,
+                          years: float = 5.0) -> Iterator[Transaction]:
+    """Yield `count` transactions; the last ones may run a little past the span"""
+    rng = random.Random(seed)
+    per_day = max(1.0, count / (years * 365))
+    categories = list(EXPENSES)
+    weights = [EXPENSES[c][0] for c in categories]
+    salary = monthly_salary(per_day)
+    scale = salary / SALARY  # side income grows with the salary
+    produced = 0
+    day = start
+    while produced < count:
+        rows = []
+        if day.day in (1, 15):
+            rows.append((round(salary / 2, 2), 'Salary', 'Payroll ACME Corp', 'income'))
+        if rng.random() < 0.03:
+            rows.append((_amount(rng, 400.0 * scale, 0.8), 'Freelance', 'Invoice paid', 'income'))
+        if rng.random() < 0.02:
+            rows.append((_amount(rng, 60.0 * scale, 1.0), 'Investment', 'Dividend', 'income'))
+        # Weekends see more spending
+        expected = per_day * (WEEKEND_RATE if day.weekday() >= 5 else WEEKDAY_RATE)
+        for _ in range(max(0, round(rng.gauss(expected, expected ** 0.5)))):
+            category = rng.choices(categories, weights)[0]
+            _, median, spread, descriptions = EXPENSES[category]
+            rows.append((_amount(rng, median, spread), category, rng.choice(descriptions), 'expense'))
+
+        seconds = sorted(rng.randrange(6 * 3600, 23 * 3600) for _ in rows)
+        for (amount, category, description, kind), second in zip(rows, seconds):
+            if produced == count:
+                return
+            yield Transaction(
+                id=str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+                amount=amount,
+                category=category,
+                description=description,
+                date=(day + timedelta(seconds=second)).isoformat(),
+                type=kind,
+            )
+            produced += 1
+        day += timedelta(days=1)
+
+
+def write_ledger(path: str, count: int, seed: int = 0) -> int:
+    """Write a ledger file in BudgetModel's format without holding it in memory.
+
+    The change log is written empty, as for a ledger that has been synced
+    and compacted.
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    written = 0
+    with open(path, 'w') as f:
+        f.write('{"transactions": [\n')
+        for transaction in generate_transactions(count, seed):
+            if written:
+                f.write(',\n')
+            f.write(json.dumps(transaction.to_dict()))
+            written += 1
+        f.write('\n], "changes": {"seq": 0, "floor": 0, "entries": []}}\n')
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic ledger file")
+    parser.add_argument('path')
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    print(f"{args.path}: wrote {write_ledger(args.path, args.rows, args.seed):,} transactions")
+
+
+if __name__ == "__main__":
+    main()
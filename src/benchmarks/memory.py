@@ -0,0 +1,111 @@
+"""Leak check of the MainWindow refresh cycle, offscreen.
+
+    python -m benchmarks.memory --rows 10000 --refreshes 200 --out memory.txt
+
+Shows a MainWindow with every tab built, runs a few warm-up refreshes, then
+takes a tracemalloc baseline and runs --refreshes more, each after an
+in-place edit of one row, so the ledger changes but does not grow. The
+report attributes Python allocation growth to call sites in the app and
+diffs live QObjects by type.
+
+Exits 1 if, over the second half of the refreshes, Python memory grows by
+more than --max-bytes-per-refresh per refresh, or if any Qt object type
+grew at all. Measuring the second half only leaves out one-off growth
+such as caches filling up.
+"""
+import os
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import argparse
+import dataclasses
+import sys
+
+from PyQt6.QtWidgets import QApplication
+
+from benchmarks.gui import flush_events
+from benchmarks.suite import LedgerBenchmarks
+from utils.memory_profile import MemoryTracker
+from views.diagnostics_panel import count_qobjects
+from views.main_window import MainWindow
+from views.styles.styles import HyprlandStyles
+
+
+def edit_row(bench: LedgerBenchmarks, flip: bool):
+    """Toggle the amount of the newest row, without saving"""
+    model = bench.model
+    newest = model.get_transaction(model._keys[-1][1])
+    model._replace(dataclasses.replace(newest, amount=newest.amount + (0.01 if flip else -0.01)))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.memory",
+                                     description="Look for memory growth across MainWindow refreshes")
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--refreshes', type=int, default=200)
+    parser.add_argument('--max-bytes-per-refresh', type=float, default=512.0,
+                        help="acceptable Python growth per refresh (default: %(default)s)")
+    parser.add_argument('--out', help="write the report here as well")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    HyprlandStyles.setup_app_style(app)
+    bench = LedgerBenchmarks(args.rows, args.seed)
+    window = MainWindow(bench.controller)
+    tracker = MemoryTracker(count_objects=count_qobjects)
+    try:
+        window.resize(1300, 800)
+        window.show()
+        for index in range(window.tabs.count()):
+            window.ensure_tab_built(index)
+        window.refresh_timer.stop()
+
+        def cycle(times: int):
+            for i in range(times):
+                edit_row(bench, i % 2 == 0)
+                window.refresh_data()
+                flush_events(app)
+
+        # Caches, lazy imports and Qt's own pools settle during the warm-up, and
+        # everything a refresh replaces has been allocated under tracing once
+        tracker.start()
+        cycle(args.warmup)
+        baseline = tracker.sample()
+        first_half = args.refreshes // 2
+        cycle(first_half)
+        midpoint = tracker.sample()
+        cycle(args.refreshes - first_half)
+        end = tracker.sample()
+        steady, _, _ = tracker.growth(midpoint, end)
+        _, _, objects = tracker.growth(baseline, end)
+        report = tracker.report()
+    finally:
+        tracker.stop()
+        window.close()
+        window.deleteLater()
+        flush_events(app)
+        bench.close()
+
+    print(report)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(report)
+
+    per_refresh = sum(steady.values()) / max(1, args.refreshes - first_half)
+    print(f"{per_refresh:,.0f} bytes per refresh")
+    failures = []
+    if per_refresh > args.max_bytes_per_refresh:
+        failures.append(f"Python memory grew {per_refresh:,.0f} bytes per refresh")
+    grown = [name for name, diff in objects.items() if diff > 0]
+    if grown:
+        failures.append(f"live Qt objects grew: {', '.join(sorted(grown))}")
+    if failures:
+        print("; ".join(failures), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
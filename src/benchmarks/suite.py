@@ -0,0 +1,162 @@
+"""Timed benchmarks of BudgetModel and BudgetController on a synthetic ledger.
+
+Every benchmark reports seconds per operation (median and best of
+`repeat`) and microseconds per ledger row, so runs at different sizes and
+versions can be compared. budgets.json caps each operation at
+max(floor_ms, us_per_row * rows); run() flags anything over budget.
+Controller reads are timed with the query cache cleared, i.e. uncached.
+"""
+import gc
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.ledger_generator import write_ledger
+from controllers.budget_controller import BudgetController
+from models.budget import BudgetModel, Transaction
+from models.categorizer import Categorizer
+
+BUDGETS_FILE = os.path.join(os.path.dirname(__file__), 'budgets.json')
+
+
+def timed(fn: Callable[[], object], repeat: int, setup: Optional[Callable[[], object]] = None) -> List[float]:
+    """Seconds taken by each of `repeat` calls of fn, each after an untimed setup()"""
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+class LedgerBenchmarks:
+    """The benchmarks, sharing one generated ledger file and loaded model"""
+
+    def __init__(self, rows: int, seed: int = 0, repeat: int = 5, workdir: Optional[str] = None):
+        self.rows = rows
+        self.seed = seed
+        self.repeat = repeat
+        self.workdir = workdir or tempfile.mkdtemp(prefix='budget-bench-')
+        self.path = os.path.join(self.workdir, f"ledger-{rows}-{seed}.json")
+        if not os.path.exists(self.path):
+            write_ledger(self.path, rows, seed)
+        self.model = BudgetModel(self.path)
+        self.controller = BudgetController(self.model, Categorizer(rules_file=None))
+        self.rng = random.Random(seed)
+
+    def close(self):
+        self.model.close()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def load_data(self) -> List[float]:
+        return timed(lambda: BudgetModel(self.path), self.repeat)
+
+    def save_data(self) -> List[float]:
+        return timed(self.model.save_data, self.repeat)
+
+    def add_transaction(self) -> List[float]:
+        def add():
+            self.model.add_transaction(Transaction(
+                str(uuid.UUID(int=self.rng.getrandbits(128), version=4)), 12.5, 'Food',
+                'Benchmark coffee', '2022-06-15T09:30:00', 'expense'))
+        return timed(add, self.repeat)
+
+    def delete_transaction(self) -> List[float]:
+        victims = []
+        return timed(lambda: self.model.delete_transaction(victims.pop()), self.repeat,
+                     setup=lambda: victims.append(self.rng.choice(self.model.transactions).id))
+
+    def get_category_summary(self) -> List[float]:
+        return timed(self.controller.get_category_summary, self.repeat, setup=self.controller.cache.clear)
+
+    def get_monthly_summary(self) -> List[float]:
+        return timed(self.controller.get_monthly_summary, self.repeat, setup=self.controller.cache.clear)
+
+    def get_balance_history(self) -> List[float]:
+        return timed(self.controller.get_balance_history, self.repeat, setup=self.controller.cache.clear)
+
+    NAMES = ('load_data', 'save_data', 'add_transaction', 'delete_transaction',
+             'get_category_summary', 'get_monthly_summary', 'get_balance_history')
+
+
+def load_budgets(path: str = BUDGETS_FILE) -> Dict[str, Dict]:
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run(rows: int, seed: int = 0, repeat: int = 5, only: Optional[List[str]] = None,
+        budgets: Optional[Dict[str, Dict]] = None) -> Dict:
+    """Run the benchmarks; returns the JSON-ready results document"""
+    bench = LedgerBenchmarks(rows, seed, repeat)
+    results = {}
+    try:
+        for name in only or LedgerBenchmarks.NAMES:
+            samples = getattr(bench, name)()
+            median = statistics.median(samples)
+            result = {
+                'median_ms': median * 1000,
+                'best_ms': min(samples) * 1000,
+                'us_per_row': median * 1e6 / rows,
+                'repeat': len(samples),
+            }
+            budget = (budgets or {}).get(name)
+            if budget is not None:
+                limit_ms = max(budget.get('floor_ms', 0.0), budget['us_per_row'] * rows / 1000)
+                result['budget_ms'] = limit_ms
+                result['within_budget'] = result['median_ms'] <= limit_ms
+            results[name] = result
+    finally:
+        bench.close()
+    return {
+        'meta': {
+            'rows': rows,
+            'seed': seed,
+            'repeat': repeat,
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'revision': git_revision(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+        },
+        'results': results,
+    }
+
+
+def over_budget(document: Dict) -> List[str]:
+    return [name for name, result in document['results'].items() if result.get('within_budget') is False]
+
+
+def format_report(document: Dict, baseline: Optional[Dict] = None) -> str:
+    lines = [f"{'benchmark':<24}{'median ms':>12}{'us/row':>10}{'budget ms':>12}"
+             + (f"{'vs base':>10}" if baseline else "")]
+    for name, result in document['results'].items():
+        budget = f"{result['budget_ms']:.1f}" if 'budget_ms' in result else '-'
+        line = f"{name:<24}{result['median_ms']:>12.2f}{result['us_per_row']:>10.3f}{budget:>12}"
+        if baseline:
+            before = baseline['results'].get(name)
+            # Per row, so runs at different sizes still compare
+            line += f"{result['us_per_row'] / before['us_per_row']:>9.2f}x" if before else f"{'-':>10}"
+        if result.get('within_budget') is False:
+            line += "  OVER BUDGET"
+        lines.append(line)
+    return "\n".join(lines)
@@ -0,0 +1,290 @@
+"""Headless `budget` command line for scripted jobs (cron, batch pipelines).
+
+    python src/cli.py balance
+    python src/cli.py import statements/*.csv
+    python src/cli.py export ledger.ndjson.gz --from 2025-01-01
+    python src/cli.py report --from 2025-01-01 --to 2025-04-01 --json
+    python src/cli.py compact
+    python src/cli.py archive 2023
+    python src/cli.py forecast --months 6 --income 4200
+    python src/cli.py serve --port 8765
+    python src/cli.py user add alice
+
+Only the models, the controller and the utils a command needs are
+imported - never PyQt6 - so a run costs tens of milliseconds plus the
+ledger load, and needs no display.
+"""
+import argparse
+import json
+import os
+import sys
+
+from models.budget import BudgetModel
+from controllers.budget_controller import BudgetController
+from utils.metrics import metrics
+
+DEFAULT_DATA_FILE = os.environ.get("BUDGET_DATA", "data/budget_data.json")
+
+
+def cmd_balance(controller: BudgetController, args) -> int:
+    balance = controller.get_current_balance()
+    if args.json:
+        print(json.dumps({'balance': round(balance, 2), 'transactions': len(controller.model.transactions)}))
+    else:
+        print(f"{balance:,.2f}")
+    return 0
+
+
+def cmd_report(controller: BudgetController, args) -> int:
+    categories = controller.get_category_summary(args.start, args.end)
+    months = controller.get_monthly_summary(args.start, args.end)
+    if args.json:
+        print(json.dumps({'categories': categories, 'months': dict(sorted(months.items()))}, indent=2))
+        return 0
+
+    print(f"{'Category':<20}{'Income':>14}{'Expense':>14}")
+    for category, amounts in sorted(categories.items()):
+        print(f"{category:<20}{amounts['income']:>14,.2f}{amounts['expense']:>14,.2f}")
+    print()
+    print(f"{'Month':<20}{'Income':>14}{'Expense':>14}{'Net':>14}")
+    for month, amounts in sorted(months.items()):
+        net = amounts['income'] - amounts['expense']
+        print(f"{month:<20}{amounts['income']:>14,.2f}{amounts['expense']:>14,.2f}{net:>14,.2f}")
+    return 0
+
+
+def is_ledger_file(path: str) -> bool:
+    """NDJSON, or CSV with exactly the columns ledger_io writes; anything else is a bank statement"""
+    from utils.ledger_io import COLUMNS, detect_format, open_text
+    try:
+        if detect_format(path) == 'ndjson':
+            return True
+        with open_text(path, 'r') as f:
+            header = f.readline().strip().lower()
+        return tuple(h.strip() for h in header.split(',')) == COLUMNS
+    except (ValueError, OSError):
+        return False
+
+
+def cmd_import(controller: BudgetController, args) -> int:
+    categorizer = None if args.no_categorize else controller.categorizer
+    ledgers = [p for p in args.paths if args.kind == 'ledger' or (args.kind == 'auto' and is_ledger_file(p))]
+    statements = [p for p in args.paths if p not in ledgers]
+    status = 0
+
+    if ledgers:
+        from utils.ledger_io import import_ledger
+        for path in ledgers:
+            try:
+                added = import_ledger(controller.model, path, categorizer=categorizer)
+                print(f"{path}: added {added:,}")
+            except Exception as e:
+                print(f"Error importing {path}: {e}", file=sys.stderr)
+                status = 1
+
+    if statements:
+        from utils.statement_importer import import_statements
+        result = import_statements(controller.model, statements, max_workers=args.workers,
+                                   dedupe=not args.no_dedupe, categorizer=categorizer)
+        print(f"statements: {result.files} file(s), parsed {result.parsed:,}, "
+              f"added {result.added:,}, duplicates {result.duplicates:,}")
+        for path, error in result.errors.items():
+            print(f"Error importing {path}: {error}", file=sys.stderr)
+            status = 1
+    return status
+
+
+def cmd_export(controller: BudgetController, args) -> int:
+    from utils.ledger_io import COLUMNS, export_ledger
+    columns = args.columns.split(',') if args.columns else COLUMNS
+    count = export_ledger(controller.model, args.path, args.format, columns, args.start, args.end)
+    print(f"{args.path}: wrote {count:,}")
+    return 0
+
+
+def cmd_compact(controller: BudgetController, args) -> int:
+    model = controller.model
+    if args.all:
+        upto = None
+    else:
+        # Only what the Java side has acknowledged can go
+        from utils.java_integration import JavaIntegration
+        checkpoint = args.checkpoint or args.sync_checkpoint
+        upto = JavaIntegration('', checkpoint_file=checkpoint).delta_mark('exported_seq')
+    removed = model.compact_changes(upto)
+    print(f"change log: dropped {removed:,}, kept {len(model.changes):,}")
+    if not removed and upto == 0:
+        print("Nothing has been synced yet; use --all to drop the log anyway", file=sys.stderr)
+    return 0
+
+
+def cmd_archive(controller: BudgetController, args) -> int:
+    model = controller.model
+    archived, kept = model.close_period(args.period, include_unsynced=args.include_unsynced)
+    print(f"archived {archived:,} row(s) through {model.archive.closed_through or '-'}; "
+          f"{len(model.transactions):,} open, {model.archive.rows:,} archived in total")
+    if kept:
+        print(f"{kept:,} unsynced row(s) kept open; sync and compact first, or pass --include-unsynced",
+              file=sys.stderr)
+    return 0
+
+
+def cmd_forecast(controller: BudgetController, args) -> int:
+    if args.income is not None:
+        controller.set_monthly_income(args.income)
+    result = controller.get_forecast(args.months)
+    columns = ('months', 'income', 'expense', 'net', 'balance')
+    if args.json:
+        print(json.dumps(dict({name: result[name] for name in columns},
+                              recurring=[vars(item) for item in result['recurring']]), indent=2))
+        return 0
+
+    print(f"{'Month':<20}{'Income':>14}{'Expense':>14}{'Net':>14}{'Balance':>14}")
+    for month, income, expense, net, balance in zip(*(result[name] for name in columns)):
+        print(f"{month:<20}{income:>14,.2f}{expense:>14,.2f}{net:>14,.2f}{balance:>14,.2f}")
+    if result['recurring']:
+        print()
+        print(f"{'Recurring':<34}{'Category':<20}{'Amount':>14}")
+        for item in result['recurring']:
+            amount = item.amount if item.type == 'income' else -item.amount
+            print(f"{item.description[:33]:<34}{item.category:<20}{amount:>14,.2f}")
+    return 0
+
+
+def cmd_serve(controller: BudgetController, args) -> int:
+    import threading
+    from utils.api_server import start_api_server
+    server, _, base_url = start_api_server(controller, args.host, args.port, args.workers)
+    print(f"Budget API listening on {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+        server.server_close()
+    return 0
+
+
+def cmd_user_add(controller, args) -> int:
+    from models.auth import AuthModel
+    if args.password_stdin:
+        password = sys.stdin.readline().rstrip('\n')
+    else:
+        from getpass import getpass
+        password = getpass(f"Password for {args.name}: ")
+        if getpass("Repeat password: ") != password:
+            raise ValueError("passwords do not match")
+    if not password:
+        raise ValueError("the password must not be empty")
+    auth = AuthModel()
+    existed = args.name in auth.users
+    auth.add_user(args.name, password, args.ledger)
+    verb = "changed the password of" if existed else "added"
+    print(f"{verb} {args.name}; ledger {auth.ledger_file(args.name)}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="budget", description="Budget Manager without the GUI")
+    parser.add_argument('--data', default=DEFAULT_DATA_FILE,
+                        help="ledger file (default: $BUDGET_DATA or %(default)s)")
+    parser.add_argument('--user', help="use this account's ledger instead of --data")
+    parser.add_argument('--durability', help="journal fsync policy: none, group[:ms] or fsync "
+                                             "(default: $BUDGET_DURABILITY or group)")
+    parser.add_argument('--metrics', help="record timings and write them here on exit "
+                                          "(.prom for Prometheus text, else JSON lines)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    balance = commands.add_parser('balance', help="print the current balance")
+    balance.add_argument('--json', action='store_true')
+    balance.set_defaults(run=cmd_balance)
+
+    report = commands.add_parser('report', help="income and expense by category and by month")
+    report.add_argument('--from', dest='start', help="first date, inclusive (YYYY-MM-DD)")
+    report.add_argument('--to', dest='end', help="last date, exclusive (YYYY-MM-DD)")
+    report.add_argument('--json', action='store_true')
+    report.set_defaults(run=cmd_report)
+
+    import_ = commands.add_parser('import', help="add bank statements or exported ledgers")
+    import_.add_argument('paths', nargs='+')
+    import_.add_argument('--kind', choices=('auto', 'statement', 'ledger'), default='auto')
+    import_.add_argument('--workers', type=int, help="statement parser processes")
+    import_.add_argument('--no-dedupe', action='store_true', help="keep rows that look like duplicates")
+    import_.add_argument('--no-categorize', action='store_true', help="do not apply category rules")
+    import_.set_defaults(run=cmd_import)
+
+    export = commands.add_parser('export', help="write the ledger as CSV or NDJSON (.gz compresses)")
+    export.add_argument('path')
+    export.add_argument('--format', choices=('csv', 'ndjson'))
+    export.add_argument('--columns', help="comma-separated subset of id,amount,category,description,date,type")
+    export.add_argument('--from', dest='start', help="first date, inclusive (YYYY-MM-DD)")
+    export.add_argument('--to', dest='end', help="last date, exclusive (YYYY-MM-DD)")
+    export.set_defaults(run=cmd_export)
+
+    compact = commands.add_parser('compact', help="drop change-log entries already synced")
+    compact.add_argument('--all', action='store_true', help="drop unsynced entries too (next sync is a full one)")
+    compact.add_argument('--checkpoint', help="Java sync checkpoint (default: the --user's, "
+                                              "else data/java_sync_checkpoint.json)")
+    compact.set_defaults(run=cmd_compact)
+
+    archive = commands.add_parser('archive', help="move a closed period to cold storage, keeping rollups")
+    archive.add_argument('period', help="YYYY or YYYY-MM; everything up to its end is closed")
+    archive.add_argument('--include-unsynced', action='store_true',
+                         help="archive rows the Java side has not acknowledged, dropping their changes")
+    archive.set_defaults(run=cmd_archive)
+
+    forecast = commands.add_parser('forecast', help="projected income, expense and balance by month")
+    forecast.add_argument('--months', type=int, default=12, help="months ahead, 3 to 24 (default 12)")
+    forecast.add_argument('--income', type=float, help="expected monthly income, instead of projecting it")
+    forecast.add_argument('--json', action='store_true')
+    forecast.set_defaults(run=cmd_forecast)
+    
+    serve = commands.add_parser('serve', help="serve the local JSON API (see utils/api_server.py)")
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--workers', type=int, default=4)
+    serve.set_defaults(run=cmd_serve)
+
+    user = commands.add_parser('user', help="manage sign-in accounts")
+    user_commands = user.add_subparsers(dest='user_command', required=True)
+    user_add = user_commands.add_parser('add', help="create an account, or set a new password for one")
+    user_add.add_argument('name')
+    user_add.add_argument('--ledger', help="ledger file (default: data/ledgers/NAME.json)")
+    user_add.add_argument('--password-stdin', action='store_true',
+                          help="read the password from the first line of stdin instead of prompting")
+    user_add.set_defaults(run=cmd_user_add, needs_ledger=False)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.metrics:
+        os.environ['BUDGET_METRICS'] = args.metrics
+    metrics.configure_from_env()
+    args.sync_checkpoint = "data/java_sync_checkpoint.json"
+    if args.user:
+        from models.auth import AuthModel
+        auth = AuthModel()
+        args.data = auth.ledger_file(args.user)
+        args.sync_checkpoint = auth.sync_checkpoint_file(args.user)
+    if not getattr(args, 'needs_ledger', True):
+        try:
+            return args.run(None, args)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+    try:
+        model = BudgetModel(args.data, durability=args.durability)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    try:
+        return args.run(BudgetController(model), args)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        model.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
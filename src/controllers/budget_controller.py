@@ -1,12 +1,22 @@
+from models.archive import month_last_day, month_of, period_end
 from models.budget import BudgetModel, Transaction
+from models.categorizer import Categorizer
+from models.cube import AggregateCube, empty_totals
+from models.forecast import add_months, forecast
+from utils.metrics import metrics
+from utils.query_cache import QueryCache, memoized
 import uuid
+from dataclasses import replace
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple
 
 class BudgetController:
-    def __init__(self, model: BudgetModel):
+    def __init__(self, model: BudgetModel, categorizer: Categorizer = None):
         self.model = model
+        self.categorizer = categorizer if categorizer is not None else Categorizer()
         self.monthly_income = 0
+        # Read results for the current data_version; see utils/query_cache
+        self.cache = QueryCache()
     
     def add_income(self, amount: float, category: str, description: str):
         transaction = Transaction(
@@ -30,32 +40,103 @@ class BudgetController:
         )
         self.model.add_transaction(transaction)
     
+    def add_transactions(self, transactions: List[Transaction]) -> int:
+        """Bulk add, with category rules applied to uncategorized rows"""
+        self.categorizer.categorize(transactions)
+        return self.model.add_transactions(transactions)
+    
     def delete_transaction(self, transaction_id: str):
         self.model.delete_transaction(transaction_id)
     
+    def delete_transactions(self, transaction_ids) -> int:
+        return self.model.delete_transactions(transaction_ids)
+    
+    def edit_transaction(self, transaction_id: str, **fields) -> bool:
+        """Change amount, category, description, date or type of a transaction"""
+        transaction = self.model.get_transaction(transaction_id)
+        if transaction is None:
+            return False
+        return self.model.update_transaction(replace(transaction, **fields))
+    
+    def import_statements(self, paths: List[str]):
+        """Parse bank statement files in parallel and add them in one bulk insert"""
+        from utils.statement_importer import import_statements
+        return import_statements(self.model, paths, categorizer=self.categorizer)
+    
+    def suggest_category(self, description: str, transaction_type: str, amount: float = 0.0):
+        """Category the rules pick for a description, or None"""
+        return self.categorizer.classify(description, amount, transaction_type)
+    
     def get_current_balance(self) -> float:
         return self.model.get_balance()
     
-    def get_category_summary(self) -> Dict:
+    @memoized
+    @metrics.timed('controller.category_summary')
+    def get_category_summary(self, start_date: str = None, end_date: str = None) -> Dict:
         summary = {}
-        for transaction in self.model.transactions:
+        for transaction in self._in_range(start_date, end_date, scan='category_summary'):
             if transaction.category not in summary:
                 summary[transaction.category] = {'income': 0, 'expense': 0}
             if transaction.type == 'income':
                 summary[transaction.category]['income'] += transaction.amount
             else:
                 summary[transaction.category]['expense'] += transaction.amount
+        return self._add_archived(summary, start_date, end_date, lambda month, category: category)
+    
+    def _add_archived(self, summary: Dict, start_date, end_date, group) -> Dict:
+        """Fold closed periods into a summary: rollups for whole months, cold rows for cut ones"""
+        archive = self.model.archive
+        if not archive:
+            return summary
+        whole, partial = archive.full_months(start_date, end_date)
+        whole = set(whole)
+        for (month, category, kind), (amount, _) in archive.rollups.items():
+            if month in whole:
+                entry = summary.setdefault(group(month, category), {'income': 0, 'expense': 0})
+                entry['income' if kind == 'income' else 'expense'] += amount
+        if partial:
+            partial = set(partial)
+            for transaction in self.model.iter_archived_transactions(start_date, end_date):
+                month = month_of(transaction.date)
+                if month in partial:
+                    entry = summary.setdefault(group(month, transaction.category), {'income': 0, 'expense': 0})
+                    entry['income' if transaction.type == 'income' else 'expense'] += transaction.amount
         return summary
     
+    def _in_range(self, start_date=None, end_date=None, scan: str = None):
+        """All transactions, or those from start_date up to (excluding) end_date"""
+        if metrics.enabled and scan:
+            metrics.observe(f'controller.{scan}.rows_scanned', self.model.count_transactions(start_date, end_date))
+        if start_date is None and end_date is None:
+            return self.model.transactions
+        return self.model.iter_transactions(start_date, end_date)
+    
     def get_recent_transactions(self, limit: int = 10):
         return self.model.get_recent_transactions(limit)
     
+    def get_transactions_page(self, limit: int = 50, after=None, before=None):
+        return self.model.get_transactions_page(limit, after=after, before=before)
+    
+    @memoized
+    @metrics.timed('controller.balance_history')
     def get_balance_history(self) -> List[Tuple[str, float]]:
         """Get balance history for charting"""
+        if metrics.enabled:
+            metrics.observe('controller.balance_history.rows_scanned', len(self.model.transactions))
         transactions = sorted(self.model.transactions, key=lambda x: x.date)
         balance_history = []
         running_balance = 0
         
+        # Closed periods only have monthly totals: one point per month end
+        archive = self.model.archive
+        if archive:
+            net = {}
+            for (month, _, kind), (amount, _) in archive.rollups.items():
+                net[month] = net.get(month, 0) + (amount if kind == 'income' else -amount)
+            for month in sorted(net):
+                running_balance += net[month]
+                balance_history.append((month_last_day(month), running_balance))
+        
         for transaction in transactions:
             if transaction.type == 'income':
                 running_balance += transaction.amount
@@ -67,11 +148,13 @@ class BudgetController:
         
         return balance_history
     
-    def get_monthly_summary(self) -> Dict:
+    @memoized
+    @metrics.timed('controller.monthly_summary')
+    def get_monthly_summary(self, start_date: str = None, end_date: str = None) -> Dict:
         """Get monthly income/expense summary"""
         monthly_data = {}
         
-        for transaction in self.model.transactions:
+        for transaction in self._in_range(start_date, end_date, scan='monthly_summary'):
             # Extract year-month from date
             date_obj = datetime.fromisoformat(transaction.date.replace('Z', '+00:00'))
             month_key = date_obj.strftime("%Y-%m")
@@ -84,8 +167,95 @@ class BudgetController:
             else:
                 monthly_data[month_key]['expense'] += transaction.amount
         
-        return monthly_data
+        return self._add_archived(monthly_data, start_date, end_date, lambda month, category: month)
 
+    @memoized
+    @metrics.timed('controller.period_summary')
+    def get_period_summary(self, resolution: str = 'month', start: str = None, end: str = None,
+                           prefix: str = None) -> Dict:
+        """{bucket: {category: {'income', 'expense'}}} at day, week, month or year resolution.
+        
+        start and end are buckets of that resolution (end exclusive). Closed
+        periods only have monthly rollups, so they show up at month and year
+        resolution but not per day or week.
+        """
+        summary = self.model.cube.query(resolution, start, end, prefix)
+        archive = self.model.archive
+        if archive and resolution in ('month', 'year'):
+            for (month, category, kind), (amount, _) in archive.rollups.items():
+                bucket = month if resolution == 'month' else month[:4]
+                if (start is not None and bucket < start) or (end is not None and bucket >= end):
+                    continue
+                if prefix is not None and not bucket.startswith(prefix):
+                    continue
+                totals = summary.setdefault(bucket, {}).setdefault(category, empty_totals())
+                totals['income' if kind == 'income' else 'expense'] += amount
+        return summary
+    
+    @memoized
+    def drill_down(self, bucket: str = None) -> Dict:
+        """Per-category totals one level below bucket: years, a year's months or a month's days"""
+        if bucket is None:
+            return self.get_period_summary('year')
+        if len(bucket) == 4:
+            return self.get_period_summary('month', prefix=bucket + '-')
+        if len(bucket) == 7:
+            days = self.get_period_summary('day', prefix=bucket + '-')
+            if self.model.archive and bucket + '-01' < (self.model.archive.closed_through or ''):
+                # Copied, as the summary is a cached result
+                days = {day: {category: dict(totals) for category, totals in categories.items()}
+                        for day, categories in days.items()}
+                # An archived month keeps no daily figures; aggregate its cold rows on the spot
+                cold = AggregateCube(self.model.iter_archived_transactions(bucket + '-01', period_end(bucket)))
+                for day, categories in cold.query('day').items():
+                    for category, totals in categories.items():
+                        merged = days.setdefault(day, {}).setdefault(category, empty_totals())
+                        merged['income'] += totals['income']
+                        merged['expense'] += totals['expense']
+            return days
+        raise ValueError(f"cannot drill below {bucket!r}; use get_day_transactions()")
+    
+    @memoized
+    def get_day_transactions(self, day: str) -> List[Transaction]:
+        """Rows of one YYYY-MM-DD day, archived ones included, oldest first"""
+        end = day + 'T99'
+        rows = list(self.model.iter_transactions(day, end))
+        archive = self.model.archive
+        if archive and day < (archive.closed_through or ''):
+            rows = sorted(list(self.model.iter_archived_transactions(day, end)) + rows,
+                          key=self.model.transaction_key)
+        return rows
+    
+    @memoized
+    def get_year_over_year(self, kind: str = 'expense', category: str = None) -> Dict[str, List[float]]:
+        """{year: twelve monthly totals of kind}, for one category or all of them"""
+        years: Dict[str, List[float]] = {}
+        for month, categories in self.get_period_summary('month').items():
+            values = years.setdefault(month[:4], [0.0] * 12)
+            for name, totals in categories.items():
+                if category is None or name == category:
+                    values[int(month[5:7]) - 1] += totals[kind]
+        return dict(sorted(years.items()))
+    
+    def get_forecast(self, months: int = 12, history: int = 36) -> Dict:
+        """Projected income, expense and month-end balance for this month and the next 3 to 24.
+        
+        Fitted on up to `history` months of the monthly summary; see
+        models/forecast. A monthly income set with set_monthly_income()
+        stands in for the projected income.
+        """
+        if not 3 <= months <= 24:
+            raise ValueError("Forecast must look 3 to 24 months ahead")
+        return self._forecast(months, history, self.monthly_income, datetime.now().strftime("%Y-%m"))
+    
+    @memoized
+    @metrics.timed('controller.forecast')
+    def _forecast(self, months: int, history: int, monthly_income: float, current: str) -> Dict:
+        first = add_months(current, -history)
+        summary = self.get_period_summary('month', start=first, end=add_months(current, 1))
+        return forecast(summary, self.model.iter_transactions, current, months, history,
+                        self.get_current_balance(), monthly_income)
+    
     def set_monthly_income(self, amount:float) ->None:
         if amount > 0:
             self.monthly_income = amount
@@ -1,16 +1,37 @@
 import sys
 import os
 from PyQt6.QtWidgets import QApplication, QStackedWidget
+from PyQt6.QtCore import QTimer
 
 from views.login_window import LoginWindow
-from views.main_window import MainWindow
 from models.auth import AuthModel
 from models.budget import BudgetModel
 from controllers.budget_controller import BudgetController
 from views.styles.styles import HyprlandStyles
+from utils.ledger_preloader import LedgerPreloader
+from utils.metrics import metrics
+from utils.memory_profile import memory_tracker
+from utils import diagnostics
 
 class BudgetManagerApp:
     def __init__(self):
+        # Opt-in telemetry, before anything worth measuring runs
+        metrics.configure_from_env()
+        memory_tracing = memory_tracker.configure_from_env()
+        
+        # One model for the app's lifetime; each user's ledger is loaded into it on sign-in
+        self.auth_model = AuthModel()
+        self.budget_model = BudgetModel(autoload=False)
+        self.controller = BudgetController(self.budget_model)
+        self.loaded_user = None
+        self.sync_service = None
+        
+        # Start loading the last user's ledger so it overlaps with Qt startup and login
+        self.preloader = None
+        self.preloading_user = None
+        if self.auth_model.last_user:
+            self.preload(self.auth_model.last_user)
+        
         self.app = QApplication(sys.argv)
         HyprlandStyles.setup_app_style(self.app)
         
@@ -18,32 +39,123 @@ class BudgetManagerApp:
         self.app.setApplicationName("Budget Manager")
         self.app.setApplicationVersion("1.0.0")
         self.app.setDesktopFileName("budget-manager")
-        
-        # Initialize models and controller
-        self.auth_model = AuthModel()
-        self.budget_model = BudgetModel()
-        self.controller = BudgetController(self.budget_model)
+        self.app.aboutToQuit.connect(self.stop_sync)
+        self.app.aboutToQuit.connect(self.budget_model.close)
+        if memory_tracing:
+            self.start_memory_tracing()
         
         # Create stacked widget for login/main window
         self.stacked_widget = QStackedWidget()
         self.stacked_widget.setWindowTitle("Budget Manager")
         
-        # Create windows
+        # Create windows - the main window is only built once login succeeds
         self.login_window = LoginWindow(self.auth_model)
-        self.main_window = MainWindow(self.controller)
+        self.main_window = None
         
         # Add to stacked widget
         self.stacked_widget.addWidget(self.login_window)
-        self.stacked_widget.addWidget(self.main_window)
         
         # Connect signals
         self.login_window.login_successful.connect(self.show_main_window)
         
+    def start_memory_tracing(self):
+        """Periodic snapshots for BUDGET_MEMTRACE, with a report at exit"""
+        from views.diagnostics_panel import count_qobjects
+        
+        memory_tracker.count_objects = count_qobjects
+        memory_tracker.sample()
+        self.memory_timer = QTimer()
+        self.memory_timer.timeout.connect(memory_tracker.sample)
+        self.memory_timer.start(int(memory_tracker.interval_from_env() * 1000))
+        self.app.aboutToQuit.connect(memory_tracker.write_report)
+        
+    def preload(self, username):
+        """Load a user's ledger into a fresh model on a background thread"""
+        partition = BudgetModel(self.auth_model.ledger_file(username), autoload=False)
+        self.preloader = LedgerPreloader(partition).start()
+        self.preloading_user = username
+        
     def show_main_window(self):
-        self.stacked_widget.setCurrentIndex(1)
+        user = self.auth_model.current_user
+        if self.preloading_user != user:
+            self.preload(user)
+        if not self.preloader.is_ready():
+            # Login beat the ledger load; poll until the model is warm
+            self.login_window.set_loading("Loading your ledger...")
+            QTimer.singleShot(50, self.show_main_window)
+            return
+        self.login_window.set_loading(None)
+        
+        if self.loaded_user != user:
+            self.stop_sync()
+            self.budget_model.adopt(self.preloader.model)
+            self.loaded_user = user
+        
+        if self.main_window is None:
+            from views.main_window import MainWindow
+            self.main_window = MainWindow(self.controller)
+            self.main_window.switch_user_requested.connect(self.show_login)
+            self.stacked_widget.addWidget(self.main_window)
+            self.start_api()
+        else:
+            self.main_window.refresh_data()
+        if self.sync_service is None:
+            self.start_sync()
+        self.stacked_widget.setWindowTitle(f"Budget Manager - {user}")
+        self.stacked_widget.setCurrentWidget(self.main_window)
         self.stacked_widget.setGeometry(100, 100, 1300, 800)
         self.stacked_widget.show()
         
+    def start_sync(self):
+        """Background sync with the Java app, enabled by BUDGET_SYNC_URL"""
+        base_url = os.environ.get("BUDGET_SYNC_URL")
+        if not base_url:
+            return
+        from utils.java_integration import JavaIntegration
+        from utils.sync_service import SyncService
+        from views.sync_status import QtDispatcher, SyncStatusBridge
+        
+        self.sync_dispatcher = QtDispatcher()
+        self.sync_status = SyncStatusBridge()
+        self.sync_status.status_changed.connect(
+            lambda state, detail: self.main_window.statusBar().showMessage(f"Sync {state}: {detail}"))
+        # Each user's sync position is kept with their ledger
+        checkpoint = self.auth_model.sync_checkpoint_file(self.loaded_user)
+        self.sync_service = SyncService(
+            self.budget_model, JavaIntegration(base_url, max_retries=0, checkpoint_file=checkpoint),
+            dispatch=self.sync_dispatcher, on_status=self.sync_status).start()
+        diagnostics.register('sync', self.sync_service.stats)
+    
+    def stop_sync(self):
+        if self.sync_service is not None:
+            self.sync_service.stop()
+            self.sync_service = None
+            diagnostics.unregister('sync')
+    
+    def show_login(self):
+        """Back to the sign-in screen; the current ledger stays loaded until someone else signs in"""
+        self.auth_model.logout()
+        self.login_window.password_input.clear()
+        self.stacked_widget.setWindowTitle("Budget Manager")
+        self.stacked_widget.setCurrentWidget(self.login_window)
+    
+    def start_api(self):
+        """Local JSON API for other tools, enabled by BUDGET_API_PORT"""
+        port = os.environ.get("BUDGET_API_PORT")
+        if not port:
+            return
+        from utils.api_server import start_api_server
+        from views.sync_status import QtDispatcher
+        
+        # Model calls run on the UI thread, like the GUI's own
+        self.api_dispatcher = QtDispatcher()
+        self.api_server, api, base_url = start_api_server(
+            self.controller, port=int(port), dispatch=self.api_dispatcher,
+            on_change=self.main_window.refresh_data)
+        self.app.aboutToQuit.connect(self.api_server.shutdown)
+        diagnostics.register('api', lambda: dict(api.counters))
+        self.main_window.statusBar().showMessage(f"API listening on {base_url}")
+    
     def run(self):
         self.stacked_widget.show()
         return self.app.exec()
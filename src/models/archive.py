@@ -0,0 +1,149 @@
+"""Cold storage for closed periods, and the rollups that stand in for them.
+
+Closing a period moves its rows out of the ledger into a gzipped NDJSON
+segment under <ledger>.archive/. In their place the ledger keeps one rollup
+per (month, category, type) - a total and a count - which is all the
+balance and the category and monthly summaries need. The segment list and
+the ids of the archived rows are saved in the ledger snapshot, so a
+segment written by a close that never reached the snapshot is simply
+ignored, and an archived row that comes back (a full sync, an old
+statement) is recognised without reading the segments.
+"""
+import gzip
+import json
+import os
+from datetime import date, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+RollupKey = Tuple[str, str, str]  # (YYYY-MM, category, type)
+
+
+def month_of(iso_date: str) -> str:
+    return iso_date[:7]
+
+
+def period_end(period: str) -> str:
+    """First day after a period: '2023' -> '2024-01-01', '2023-05' -> '2023-06-01'"""
+    if len(period) == 4 and period.isdigit():
+        return f"{int(period) + 1:04d}-01-01"
+    try:
+        year, month = (int(part) for part in period.split('-'))
+    except ValueError:
+        raise ValueError(f"period must be YYYY or YYYY-MM, not {period!r}")
+    if len(period) != 7 or not 1 <= month <= 12:
+        raise ValueError(f"period must be YYYY or YYYY-MM, not {period!r}")
+    return f"{year + month // 12:04d}-{month % 12 + 1:02d}-01"
+
+
+def month_last_day(month: str) -> str:
+    return (date.fromisoformat(period_end(month)) - timedelta(days=1)).isoformat()
+
+
+class Archive:
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.closed_through: Optional[str] = None  # rows dated before this were archived
+        self.segments: List[str] = []
+        self.rollups: Dict[RollupKey, List[float]] = {}  # key -> [amount, count]
+        self.ids: Set[str] = set()
+        self.rows = 0
+
+    def __bool__(self):
+        return bool(self.rollups)
+
+    def __contains__(self, transaction_id: str) -> bool:
+        return transaction_id in self.ids
+
+    def add(self, transactions: Iterable):
+        rollups = self.rollups
+        for t in transactions:
+            self.ids.add(t.id)
+            key = (month_of(t.date), t.category, t.type)
+            rollup = rollups.get(key)
+            if rollup is None:
+                rollups[key] = [t.amount, 1]
+            else:
+                rollup[0] += t.amount
+                rollup[1] += 1
+            self.rows += 1
+
+    def totals(self) -> Dict[str, float]:
+        totals = {'income': 0.0, 'expense': 0.0}
+        for (_, _, kind), (amount, _) in self.rollups.items():
+            totals[kind] = totals.get(kind, 0.0) + amount
+        return totals
+
+    def months(self) -> List[str]:
+        return sorted({month for month, _, _ in self.rollups})
+
+    def write_segment(self, name: str, transactions: List, durable: bool = False) -> str:
+        """Write rows to a new segment; it only counts once listed in self.segments"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, name)
+        with gzip.open(path, 'wt', encoding='utf-8') as out:
+            for t in transactions:
+                out.write(json.dumps(t.to_dict()) + '\n')
+        if durable:
+            with open(path, 'rb') as f:
+                os.fsync(f.fileno())
+        return path
+
+    def iter_rows(self, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                  segments: Optional[List[str]] = None) -> Iterator[Dict]:
+        """Archived rows as dicts, segment by segment, filtered to [start_date, end_date).
+
+        `segments` reads a copy of an earlier self.segments; listed segments
+        never change, so that is safe from any thread.
+        """
+        for name in self.segments if segments is None else segments:
+            with gzip.open(os.path.join(self.directory, name), 'rt', encoding='utf-8') as source:
+                for line in source:
+                    # Filter on the date before paying for a full parse; segments are written by write_segment
+                    at = line.find('"date": "') + 9
+                    row_date = line[at:line.find('"', at)] if at > 8 else json.loads(line)['date']
+                    if start_date is not None and row_date < start_date:
+                        continue
+                    if end_date is not None and row_date >= end_date:
+                        continue
+                    yield json.loads(line)
+
+    def full_months(self, start_date: Optional[str], end_date: Optional[str]):
+        """Rollups of months wholly inside [start_date, end_date), and the archived months cut by it"""
+        whole, partial = [], []
+        for month in self.months():
+            first, after = month + '-01', period_end(month)
+            if (end_date is not None and first >= end_date) or (start_date is not None and after <= start_date):
+                continue
+            if (start_date is None or start_date <= first) and (end_date is None or after <= end_date):
+                whole.append(month)
+            else:
+                partial.append(month)
+        return whole, partial
+
+    def to_dict(self) -> Dict:
+        return {
+            'closed_through': self.closed_through,
+            'segments': self.segments,
+            'rows': self.rows,
+            'ids': sorted(self.ids),
+            'rollups': [[month, category, kind, amount, count]
+                        for (month, category, kind), (amount, count) in sorted(self.rollups.items())],
+        }
+
+    @classmethod
+    def from_dict(cls, directory: str, data: Dict) -> "Archive":
+        archive = cls(directory)
+        archive.closed_through = data.get('closed_through')
+        archive.segments = list(data.get('segments', []))
+        archive.rows = data.get('rows', 0)
+        for month, category, kind, amount, count in data.get('rollups', []):
+            archive.rollups[(month, category, kind)] = [amount, count]
+        if 'ids' in data:
+            archive.ids = set(data['ids'])
+        elif archive.segments:
+            # Saved before ids were kept; read them back once
+            try:
+                archive.ids = {record['id'] for record in archive.iter_rows()}
+            except OSError as e:
+                print(f"Error reading archived ids: {e}")
+        return archive
@@ -1,9 +1,125 @@
+from typing import Dict, Optional
+import hashlib
+import hmac
+import json
+import os
+import re
+
+# Built-in account; its ledger is the original shared file, so existing data stays with it
+DEFAULT_USERS = {
+    'admin': {
+        'password': 'admin',
+        'ledger': 'data/budget_data.json',
+        'sync_checkpoint': 'data/java_sync_checkpoint.json',
+    }
+}
+
+HASH_ITERATIONS = 100_000
+
+
+def hash_password(password: str, salt: bytes) -> str:
+    return hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, HASH_ITERATIONS).hex()
+
+
 class AuthModel:
-    def __init__(self):
-        # Default credentials - in production, use proper authentication
-        self.valid_credentials = {
-            'admin': 'admin'
-        }
-    
+    """Accounts, and the ledger partition each one owns.
+
+    Every user has their own ledger file (data/ledgers/<user>.json unless
+    set explicitly) and Java sync checkpoint, so only the signed-in user's
+    data is ever loaded. last_user lets the app start loading a partition
+    before anyone has signed in.
+    """
+
+    def __init__(self, users_file="data/users.json", ledger_dir="data/ledgers"):
+        self.users_file = users_file
+        self.ledger_dir = ledger_dir
+        self.users: Dict[str, Dict] = {name: dict(record) for name, record in DEFAULT_USERS.items()}
+        self.last_user: Optional[str] = None
+        self.current_user: Optional[str] = None
+        self.load_users()
+
+    def load_users(self):
+        try:
+            if os.path.exists(self.users_file):
+                with open(self.users_file, 'r') as f:
+                    data = json.load(f)
+                    self.users.update(data.get('users', {}))
+                    self.last_user = data.get('last_user')
+        except Exception as e:
+            print(f"Error loading users: {e}")
+
+    def save_users(self):
+        try:
+            os.makedirs(os.path.dirname(self.users_file) or '.', exist_ok=True)
+            data = {
+                'last_user': self.last_user,
+                # The built-in account is not written out unless it was changed
+                'users': {name: record for name, record in self.users.items()
+                          if record != DEFAULT_USERS.get(name)},
+            }
+            with open(self.users_file, 'w') as f:
+                json.dump(data, f, indent=2)
+        except Exception as e:
+            print(f"Error saving users: {e}")
+
+    def add_user(self, username: str, password: str, ledger: Optional[str] = None):
+        """Create or re-password an account; its ledger starts empty unless given.
+
+        Raises ValueError if the ledger file is another account's, e.g. 'a b'
+        next to 'a_b', or 'Bob' next to 'bob' on a case-insensitive disk.
+        """
+        if ledger is not None or username not in self.users:
+            path = ledger or self.default_ledger_file(username)
+            owner = self.ledger_owner(path, excluding=username)
+            if owner is not None:
+                raise ValueError(f"ledger {path} already belongs to {owner}; choose another name or --ledger")
+        salt = os.urandom(16)
+        record = self.users.get(username, {})
+        record.pop('password', None)
+        record.update(salt=salt.hex(), hash=hash_password(password, salt))
+        if ledger is not None:
+            record['ledger'] = ledger
+        self.users[username] = record
+        self.save_users()
+
+    def has_default_password(self, username: str = 'admin') -> bool:
+        """True while a built-in account still signs in with its shipped password"""
+        return username in DEFAULT_USERS and self.users.get(username) == DEFAULT_USERS[username]
+
     def authenticate(self, username: str, password: str) -> bool:
-        return self.valid_credentials.get(username) == password
+        record = self.users.get(username)
+        if record is None:
+            return False
+        if 'hash' in record:
+            valid = hmac.compare_digest(hash_password(password, bytes.fromhex(record['salt'])), record['hash'])
+        else:
+            valid = hmac.compare_digest(record.get('password', ''), password)
+        if valid:
+            self.current_user = username
+            if self.last_user != username:
+                self.last_user = username
+                self.save_users()
+        return valid
+
+    def logout(self):
+        self.current_user = None
+
+    def default_ledger_file(self, username: str) -> str:
+        safe = re.sub(r'[^A-Za-z0-9_.-]', '_', username)
+        return os.path.join(self.ledger_dir, f"{safe}.json")
+
+    def ledger_file(self, username: str) -> str:
+        record = self.users.get(username, {})
+        return record.get('ledger') or self.default_ledger_file(username)
+
+    def ledger_owner(self, path: str, excluding: Optional[str] = None) -> Optional[str]:
+        """The account whose ledger is path, compared case-insensitively"""
+        key = os.path.normcase(os.path.abspath(path)).lower()
+        for name in self.users:
+            if name != excluding and os.path.normcase(os.path.abspath(self.ledger_file(name))).lower() == key:
+                return name
+        return None
+
+    def sync_checkpoint_file(self, username: str) -> str:
+        record = self.users.get(username, {})
+        return record.get('sync_checkpoint') or os.path.splitext(self.ledger_file(username))[0] + '.sync.json'
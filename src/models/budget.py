@@ -1,8 +1,44 @@
 from dataclasses import dataclass
-from typing import List, Dict, Optional
-from datetime import datetime
+from typing import List, Dict, Optional, Tuple
+from datetime import date, datetime
+from bisect import bisect_left, bisect_right, insort
+from functools import lru_cache
 import json
+import math
 import os
+import re
+import threading
+
+from models.archive import Archive, period_end
+from models.changelog import ChangeLog
+from models.cube import AggregateCube
+from models.journal import Journal, fsync_directory, parse_policy
+from utils.metrics import metrics
+
+TYPES = ('income', 'expense')
+ISO_DATE = re.compile(r'\d{4}-\d{2}-\d{2}(T.+)?\Z')
+
+
+def check_date(value) -> str:
+    """value if it is an ISO date (YYYY-MM-DD, optionally followed by a T and a time)"""
+    if isinstance(value, str) and ISO_DATE.match(value):
+        try:
+            (datetime.fromisoformat if len(value) > 10 else date.fromisoformat)(value)
+            return value
+        except ValueError:
+            pass
+    raise ValueError(f"date must be YYYY-MM-DD, not {value!r}")
+
+
+@lru_cache(maxsize=8192)
+def is_date(value: str) -> bool:
+    """check_date as a test; cached, as ledgers repeat dates a lot"""
+    try:
+        check_date(value)
+        return True
+    except ValueError:
+        return False
+
 
 @dataclass
 class Transaction:
@@ -12,36 +48,473 @@ class Transaction:
     description: str
     date: str
     type: str  # 'income' or 'expense'
+    
+    def to_dict(self) -> Dict:
+        return {
+            'id': self.id,
+            'amount': self.amount,
+            'category': self.category,
+            'description': self.description,
+            'date': self.date,
+            'type': self.type
+        }
 
 class BudgetModel:
-    def __init__(self, data_file="data/budget_data.json"):
+    """The ledger, its indexes and its persistence.
+    
+    Single changes are appended to a checksummed journal next to the ledger
+    file instead of rewriting it; once the journal passes compact_bytes it is
+    folded into a fresh snapshot on a background thread. save_data() writes
+    a snapshot directly. durability is the journal's policy (see
+    models/journal.py), by default $BUDGET_DURABILITY or group commit.
+    
+    Closed periods (close_period) live in cold storage; self.transactions
+    holds the open rows and self.archive the rollups that replace the rest.
+    Archived ids are never added again, and edits or deletes of them are
+    refused: the rollups already count them.
+    """
+    
+    def __init__(self, data_file="data/budget_data.json", autoload: bool = True,
+                 durability: Optional[str] = None, compact_bytes: int = 4 << 20):
         self.data_file = data_file
         self.transactions: List[Transaction] = []
         self.categories = {
             'income': ['Salary', 'Freelance', 'Investment', 'Other'],
             'expense': ['Food', 'Transport', 'Entertainment', 'Bills', 'Shopping', 'Healthcare']
         }
-        self.load_data()
+        # Derived state, rebuilt by build_indexes() and kept current by mutations
+        self._by_id: Dict[str, Transaction] = {}
+        self._keys: List[Tuple[str, str]] = []  # (date, id), ascending
+        self._totals = {'income': 0.0, 'expense': 0.0}
+        self._cube: Optional[AggregateCube] = None  # built on first use, then kept current
+        # Bumped on every change to the ledger, so readers can tell stale data
+        self.data_version = 0
+        # Persisted per-id change sequence, used for delta sync
+        self.changes = ChangeLog()
+        self.archive = Archive(self.archive_dir())
+        self._archived_totals = {'income': 0.0, 'expense': 0.0}
+        # Journal position: the snapshot on disk covers every record up to snapshot_lsn
+        self.durability = durability or os.environ.get('BUDGET_DURABILITY', 'group')
+        parse_policy(self.durability)
+        self.compact_bytes = compact_bytes
+        self.lsn = 0
+        self.snapshot_lsn = 0
+        self._journal: Optional[Journal] = None
+        self._snapshot_lock = threading.Lock()
+        self._compactor: Optional[threading.Thread] = None
+        if autoload:
+            self.load_data()
+    
+    @metrics.timed('model.build_indexes')
+    def build_indexes(self):
+        """Rebuild the id index and running totals from self.transactions"""
+        self._by_id = {t.id: t for t in self.transactions}
+        self._keys = sorted((t.date, t.id) for t in self.transactions)
+        self._totals = {'income': 0.0, 'expense': 0.0}
+        for t in self.transactions:
+            self._totals[t.type] = self._totals.get(t.type, 0.0) + t.amount
+        self._cube = None
+        self.data_version += 1
+    
+    def adopt(self, other: "BudgetModel"):
+        """Take over another, already loaded model's ledger, e.g. another user's.
+        
+        Callers keep their reference to this model, and its change-log
+        listeners stay attached. data_version moves past both models' so a
+        view of the old ledger never looks current.
+        """
+        listeners = self.changes.listeners
+        self.data_file = other.data_file
+        self.transactions = other.transactions
+        self.categories = other.categories
+        self._by_id, self._keys, self._totals = other._by_id, other._keys, other._totals
+        self._cube = other._cube
+        self.changes = other.changes
+        self.changes.listeners = listeners
+        self.archive, self._archived_totals = other.archive, other._archived_totals
+        self.close()
+        self.durability, self.compact_bytes = other.durability, other.compact_bytes
+        self.lsn, self.snapshot_lsn, self._journal = other.lsn, other.snapshot_lsn, other._journal
+        self.data_version = max(self.data_version, other.data_version) + 1
+    
+    @staticmethod
+    def _check(transaction: Transaction):
+        """Refuse rows the indexes, totals and summaries can't hold"""
+        if transaction.type not in TYPES:
+            raise ValueError(f"transaction {transaction.id}: type must be income or expense, "
+                             f"not {transaction.type!r}")
+        if type(transaction.date) is not str or not is_date(transaction.date):
+            raise ValueError(f"transaction {transaction.id}: date must be YYYY-MM-DD, not {transaction.date!r}")
+        amount = transaction.amount
+        if type(amount) not in (int, float) or not math.isfinite(amount):
+            raise ValueError(f"transaction {transaction.id}: amount must be a number, not {amount!r}")
+    
+    def _insert(self, transactions) -> List[Transaction]:
+        """Index and append transactions with unknown ids; returns the ones added"""
+        by_id, archive = self._by_id, self.archive
+        added, seen = [], set()
+        # Every row is checked before anything changes, so a bad one leaves the ledger as it was
+        for transaction in transactions:
+            transaction_id = transaction.id
+            if transaction_id in by_id or transaction_id in archive or transaction_id in seen:
+                continue
+            self._check(transaction)
+            seen.add(transaction_id)
+            added.append(transaction)
+        if not added:
+            return added
+        keys = sorted((t.date, t.id) for t in added)
+        totals, cube = self._totals, self._cube
+        for transaction in added:
+            self.transactions.append(transaction)
+            by_id[transaction.id] = transaction
+            totals[transaction.type] += transaction.amount
+            if cube is not None:
+                cube.add(transaction)
+        if len(keys) <= 32:
+            for key in keys:
+                insort(self._keys, key)
+        else:
+            # Two sorted runs merge in roughly linear time, unlike per-row insort
+            self._keys.extend(keys)
+            self._keys.sort()
+        self.data_version += 1
+        return added
+    
+    def _remove(self, transaction_ids) -> List[Transaction]:
+        """Drop the given ids in one pass; returns the transactions removed"""
+        doomed = {tid for tid in transaction_ids if tid in self._by_id}
+        if not doomed:
+            return []
+        self.transactions = [t for t in self.transactions if t.id not in doomed]
+        self._keys = [key for key in self._keys if key[1] not in doomed]
+        removed = []
+        for tid in doomed:
+            transaction = self._by_id.pop(tid)
+            self._totals[transaction.type] -= transaction.amount
+            removed.append(transaction)
+            if self._cube is not None:
+                self._cube.remove(transaction)
+        self.data_version += 1
+        return removed
+    
+    def _replace(self, transaction: Transaction) -> Optional[Transaction]:
+        """Swap in a new version of an existing transaction; returns the old one"""
+        old = self._by_id.get(transaction.id)
+        if old is None:
+            return None
+        self._check(transaction)
+        self.transactions[self.transactions.index(old)] = transaction
+        self._by_id[transaction.id] = transaction
+        old_key = (old.date, old.id)
+        pos = bisect_left(self._keys, old_key)
+        if pos < len(self._keys) and self._keys[pos] == old_key:
+            del self._keys[pos]
+        insort(self._keys, (transaction.date, transaction.id))
+        self._totals[old.type] -= old.amount
+        self._totals[transaction.type] = self._totals.get(transaction.type, 0.0) + transaction.amount
+        if self._cube is not None:
+            self._cube.remove(old)
+            self._cube.add(transaction)
+        self.data_version += 1
+        return old
     
     def add_transaction(self, transaction: Transaction):
-        self.transactions.append(transaction)
-        self.save_data()
+        self.add_transactions([transaction])
+    
+    def add_transactions(self, transactions, save: bool = True) -> int:
+        """Add many transactions at once, skipping ids already in the ledger"""
+        added = self._add(transactions)
+        if added and save:
+            self.commit('add', [t.to_dict() for t in added])
+        metrics.incr('model.rows_added', len(added))
+        return len(added)
+    
+    def _add(self, transactions) -> List[Transaction]:
+        added = self._insert(transactions)
+        for transaction in added:
+            self.changes.record('add', transaction.id)
+        return added
+    
+    def update_transaction(self, transaction: Transaction) -> bool:
+        """Replace the stored transaction with the same id"""
+        if not self._update(transaction):
+            return False
+        self.commit('edit', transaction.to_dict())
+        return True
+    
+    def _update(self, transaction: Transaction) -> bool:
+        if self._replace(transaction) is None:
+            return False
+        self.changes.record('edit', transaction.id)
+        return True
     
     def delete_transaction(self, transaction_id: str):
-        self.transactions = [t for t in self.transactions if t.id != transaction_id]
+        self.delete_transactions([transaction_id])
+    
+    def delete_transactions(self, transaction_ids) -> int:
+        """Delete many transactions with one pass over the ledger and one journal write"""
+        removed = self._delete(transaction_ids)
+        if not removed:
+            return 0
+        self.commit('delete', [t.id for t in removed])
+        metrics.incr('model.rows_deleted', len(removed))
+        return len(removed)
+    
+    def _delete(self, transaction_ids) -> List[Transaction]:
+        removed = self._remove(transaction_ids)
+        for transaction in removed:
+            self.changes.record('delete', transaction.id)
+        return removed
+    
+    def changes_since(self, seq: int) -> Optional[List[Dict]]:
+        """Change records newer than seq, oldest first; None if a full sync is needed"""
+        entries = self.changes.since(seq)
+        if entries is None:
+            return None
+        records = []
+        for entry_seq, op, transaction_id in entries:
+            record = {'seq': entry_seq, 'op': op, 'id': transaction_id}
+            if op != 'delete':
+                record['transaction'] = self._by_id[transaction_id].to_dict()
+            records.append(record)
+        return records
+    
+    def apply_changes(self, records, save: bool = True) -> int:
+        """Apply change records received from a peer.
+        
+        They are not re-logged (that would echo them back on the next sync),
+        and they win over any unsynced local change to the same id.
+        """
+        records = list(records)
+        applied = self._apply(records)
+        if applied and save:
+            self.commit('apply', records)
+        return applied
+    
+    def _apply(self, records) -> int:
+        applied = refused = 0
+        added, deleted = [], []
+        for record in records:
+            transaction_id = record['id']
+            self.changes.forget(transaction_id)
+            if transaction_id in self.archive:
+                # Closed periods only keep rollups; the change can't be applied to them
+                refused += 1
+                continue
+            if record['op'] == 'delete':
+                deleted.append(transaction_id)
+                continue
+            transaction = Transaction(**record['transaction'])
+            if self._replace(transaction) is not None:
+                applied += 1
+            else:
+                added.append(transaction)
+        applied += len(self._insert(added)) + len(self._remove(deleted))
+        if refused:
+            print(f"Ignored {refused} change(s) to rows in closed periods")
+            metrics.incr('model.closed_changes_refused', refused)
+        return applied
+    
+    def compact_changes(self, upto: Optional[int] = None) -> int:
+        """Drop change-log entries up to seq `upto` (all of them if None) and save.
+        
+        Entries a sync peer has not acknowledged are still needed; dropping
+        them means that peer's next sync is a full one.
+        """
+        before = len(self.changes)
+        self.changes.prune(self.changes.seq if upto is None else upto)
+        self.save_data()
+        return before - len(self.changes)
+    
+    @property
+    def cube(self) -> AggregateCube:
+        """Open rows aggregated by day, week, month and year (archived ones are in self.archive)"""
+        if self._cube is None:
+            with metrics.span('model.build_cube'):
+                self._cube = AggregateCube(self.transactions)
+        return self._cube
+    
+    def archive_dir(self) -> str:
+        return os.path.splitext(self.data_file)[0] + '.archive'
+    
+    def close_period(self, period: str, include_unsynced: bool = False) -> Tuple[int, int]:
+        """Archive every open row dated before the end of period ('YYYY' or 'YYYY-MM').
+        
+        The rows go to a cold-storage segment and are replaced by monthly
+        per-category rollups; the snapshot is saved. Rows with changes no
+        sync peer has acknowledged stay open unless include_unsynced, in
+        which case those changes are dropped from the log. Returns
+        (archived, kept open).
+        """
+        boundary = period_end(period)
+        rows = list(self.iter_transactions(None, boundary))
+        unsynced = [t for t in rows if t.id in self.changes]
+        if include_unsynced:
+            for t in unsynced:
+                self.changes.forget(t.id)
+            unsynced = []
+        elif unsynced:
+            rows = [t for t in rows if t.id not in self.changes]
+        if not rows:
+            return 0, len(unsynced)
+        name = f"before-{boundary}-{len(self.archive.segments):03d}.ndjson.gz"
+        try:
+            self.archive.write_segment(name, rows, durable=not self.durability.startswith('none'))
+        except OSError as e:
+            print(f"Error archiving {period}: {e}")
+            return 0, len(unsynced)
+        self._remove([t.id for t in rows])
+        self.archive.add(rows)
+        self.archive.segments.append(name)
+        self.archive.closed_through = max(self.archive.closed_through or boundary, boundary)
+        self._archived_totals = self.archive.totals()
         self.save_data()
+        metrics.incr('model.rows_archived', len(rows))
+        return len(rows), len(unsynced)
+    
+    def iter_archived_transactions(self, start_date: Optional[str] = None, end_date: Optional[str] = None):
+        """Rows of closed periods, read back from cold storage"""
+        for record in self.archive.iter_rows(start_date, end_date):
+            yield Transaction(**record)
+    
+    def iter_all_transactions(self, start_date: Optional[str] = None, end_date: Optional[str] = None):
+        """Archived rows, then the open ones - the whole history, for full exports"""
+        if self.archive and (start_date is None or start_date < (self.archive.closed_through or '')):
+            yield from self.iter_archived_transactions(start_date, end_date)
+        yield from self.iter_transactions(start_date, end_date)
+    
+    def is_archived(self, transaction_id: str) -> bool:
+        return transaction_id in self.archive
+    
+    def get_transaction(self, transaction_id: str) -> Optional[Transaction]:
+        return self._by_id.get(transaction_id)
     
     def get_balance(self) -> float:
-        income = sum(t.amount for t in self.transactions if t.type == 'income')
-        expenses = sum(t.amount for t in self.transactions if t.type == 'expense')
-        return income - expenses
+        totals, archived = self._totals, self._archived_totals
+        return (totals.get('income', 0.0) + archived.get('income', 0.0)
+                - totals.get('expense', 0.0) - archived.get('expense', 0.0))
     
     def get_transactions_by_category(self, category: str) -> List[Transaction]:
         return [t for t in self.transactions if t.category == category]
     
     def get_recent_transactions(self, limit: int = 10) -> List[Transaction]:
-        return sorted(self.transactions, key=lambda x: x.date, reverse=True)[:limit]
+        return self.get_transactions_page(limit)
+    
+    def get_transactions_page(self, limit: int = 50,
+                              after: Optional[Tuple[str, str]] = None,
+                              before: Optional[Tuple[str, str]] = None) -> List[Transaction]:
+        """Keyset pagination over (date, id), newest first.
+        
+        `after` returns the page of rows older than that key, `before` the page
+        of rows newer than it (the one just above it). Keys come from
+        transaction_key() of a row the caller already holds.
+        """
+        keys = self._keys
+        if before is not None:
+            start = bisect_right(keys, tuple(before))
+            end = min(len(keys), start + limit)
+        else:
+            end = len(keys) if after is None else bisect_left(keys, tuple(after))
+            start = max(0, end - limit)
+        return [self._by_id[key[1]] for key in reversed(keys[start:end])]
+    
+    def count_transactions(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> int:
+        """How many transactions iter_transactions() would yield for the same range"""
+        keys = self._keys
+        lo = 0 if start_date is None else bisect_left(keys, (start_date, ''))
+        hi = len(keys) if end_date is None else bisect_left(keys, (end_date, ''))
+        return max(0, hi - lo)
     
+    def iter_transactions(self, start_date: Optional[str] = None, end_date: Optional[str] = None):
+        """Yield transactions oldest first, in (date, id) order.
+        
+        start_date is inclusive and end_date exclusive (ISO strings, so
+        "2025-02-01" ends before February). The range is found by bisecting
+        the key list, and keys are walked in slices rather than copied whole.
+        """
+        keys = self._keys
+        lo = 0 if start_date is None else bisect_left(keys, (start_date, ''))
+        hi = len(keys) if end_date is None else bisect_left(keys, (end_date, ''))
+        by_id = self._by_id
+        for offset in range(lo, hi, 4096):
+            for key in keys[offset:min(offset + 4096, hi)]:
+                transaction = by_id.get(key[1])
+                if transaction is not None:
+                    yield transaction
+    
+    @staticmethod
+    def transaction_key(transaction: Transaction) -> Tuple[str, str]:
+        return (transaction.date, transaction.id)
+    
+    @property
+    def journal(self) -> Journal:
+        if self._journal is None or self._journal.path != self.data_file + '.journal':
+            if self._journal is not None:
+                self._journal.close()
+            self._journal = Journal(self.data_file + '.journal', self.durability)
+        return self._journal
+    
+    def commit(self, op: str, data):
+        """Make one change durable by appending it to the journal"""
+        try:
+            self.lsn += 1
+            self.journal.append([{'lsn': self.lsn, 'op': op, 'data': data}])
+            metrics.incr('model.journal_records')
+        except Exception as e:
+            # Without a journal the only way to keep the change is a full rewrite
+            print(f"Error writing journal: {e}")
+            metrics.incr('model.save_errors')
+            self.save_data()
+            return
+        if self.journal.size >= self.compact_bytes:
+            self.compact_journal()
+    
+    def replay(self, record: Dict):
+        op, data = record['op'], record['data']
+        if op == 'add':
+            self._add([Transaction(**t) for t in data])
+        elif op == 'edit':
+            self._update(Transaction(**data))
+        elif op == 'delete':
+            self._delete(data)
+        elif op == 'apply':
+            self._apply(data)
+        else:
+            raise ValueError(f"unknown journal op {op!r}")
+        self.lsn = record['lsn']
+    
+    def compact_journal(self, wait: bool = False):
+        """Fold the journal into a fresh snapshot, written on a background thread"""
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        if not self.journal.seal():
+            # A sealed segment is left over from an interrupted compaction; write in line
+            self.save_data()
+            return
+        # Rows are replaced rather than changed in place, so a shallow copy is a stable view
+        rows, changes, lsn = list(self.transactions), self.changes.to_dict(), self.lsn
+        archive, journal = self.archive.to_dict(), self.journal
+        
+        def compact():
+            if self._write_snapshot(rows, changes, archive, lsn):
+                journal.drop_sealed()
+                metrics.incr('model.compactions')
+        
+        self._compactor = threading.Thread(target=compact, name='journal-compact', daemon=True)
+        self._compactor.start()
+        if wait:
+            self._compactor.join()
+    
+    def close(self):
+        """Finish any compaction and fsync the journal"""
+        if self._compactor is not None:
+            self._compactor.join()
+            self._compactor = None
+        if self._journal is not None:
+            self._journal.close()
+    
+    @metrics.timed('model.load_data')
     def load_data(self):
         try:
             if os.path.exists(self.data_file):
@@ -50,25 +523,96 @@ class BudgetModel:
                     self.transactions = [
                         Transaction(**t) for t in data.get('transactions', [])
                     ]
+                    listeners = self.changes.listeners
+                    if 'changes' in data:
+                        self.changes = ChangeLog.from_dict(data['changes'])
+                    else:
+                        # Ledgers saved before the change log: every row is an unsynced add
+                        self.changes = ChangeLog()
+                        for t in self.transactions:
+                            self.changes.record('add', t.id)
+                    self.changes.listeners = listeners
+                    self.archive = Archive.from_dict(self.archive_dir(), data.get('archive', {}))
+                    self._archived_totals = self.archive.totals()
+                    self.lsn = self.snapshot_lsn = data.get('lsn', 0)
         except Exception as e:
             print(f"Error loading data: {e}")
+            metrics.incr('model.load_errors')
+        self.build_indexes()
+        self.recover()
     
-    def save_data(self):
+    def recover(self):
+        """Replay journal records newer than the snapshot, up to the first gap or damaged one"""
         try:
-            os.makedirs(os.path.dirname(self.data_file), exist_ok=True)
-            data = {
-                'transactions': [
-                    {
-                        'id': t.id,
-                        'amount': t.amount,
-                        'category': t.category,
-                        'description': t.description,
-                        'date': t.date,
-                        'type': t.type
-                    } for t in self.transactions
-                ]
-            }
-            with open(self.data_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            records, torn = self.journal.recover()
         except Exception as e:
-            print(f"Error saving data: {e}")
+            print(f"Error reading journal: {e}")
+            metrics.incr('model.load_errors')
+            return
+        replayed = 0
+        for record in records:
+            if record['lsn'] <= self.lsn:
+                continue  # already in the snapshot
+            if record['lsn'] != self.lsn + 1:
+                print(f"Journal gap after record {self.lsn}; ignoring {len(records) - replayed} later record(s)")
+                break
+            try:
+                self.replay(record)
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"Error replaying journal record {record.get('lsn')}: {e}")
+                break
+            replayed += 1
+        if torn:
+            print(f"Journal ended in a torn write; dropped {torn} byte(s)")
+            metrics.incr('model.journal_torn')
+        metrics.incr('model.journal_replayed', replayed)
+    
+    @metrics.timed('model.save_data')
+    def save_data(self):
+        """Write a full snapshot and drop the journal it supersedes"""
+        if self._compactor is not None:
+            self._compactor.join()
+        if self._write_snapshot(self.transactions, self.changes.to_dict(), self.archive.to_dict(), self.lsn):
+            try:
+                self.journal.reset()
+            except OSError as e:
+                print(f"Error resetting journal: {e}")
+    
+    def _write_snapshot(self, rows, changes: Dict, archive: Dict, lsn: int) -> bool:
+        """Atomically replace the ledger file (fsynced unless durability is none)"""
+        with self._snapshot_lock:
+            if lsn < self.snapshot_lsn:
+                return False
+            try:
+                os.makedirs(os.path.dirname(self.data_file) or '.', exist_ok=True)
+                data = {
+                    'transactions': [
+                        {
+                            'id': t.id,
+                            'amount': t.amount,
+                            'category': t.category,
+                            'description': t.description,
+                            'date': t.date,
+                            'type': t.type
+                        } for t in rows
+                    ],
+                    'changes': changes,
+                    'archive': archive,
+                    'lsn': lsn
+                }
+                durable = not self.durability.startswith('none')
+                temp_file = self.data_file + '.tmp'
+                with open(temp_file, 'w') as f:
+                    json.dump(data, f, indent=2)
+                    if durable:
+                        f.flush()
+                        os.fsync(f.fileno())
+                os.replace(temp_file, self.data_file)
+                if durable:
+                    fsync_directory(self.data_file)
+                self.snapshot_lsn = lsn
+                return True
+            except Exception as e:
+                print(f"Error saving data: {e}")
+                metrics.incr('model.save_errors')
+                return False
@@ -0,0 +1,177 @@
+from dataclasses import dataclass, field, asdict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+import json
+import os
+import re
+
+from models.budget import Transaction
+
+# Categories that mean "nobody has picked one yet"
+UNCATEGORIZED = ('', 'Other')
+
+DEFAULT_RULES = [
+    {'category': 'Salary', 'type': 'income', 'keywords': ['salary', 'payroll', 'wages']},
+    {'category': 'Investment', 'type': 'income', 'keywords': ['dividend', 'interest', 'brokerage']},
+    {'category': 'Freelance', 'type': 'income', 'keywords': ['invoice', 'upwork', 'fiverr']},
+    {'category': 'Food', 'type': 'expense',
+     'keywords': ['grocery', 'groceries', 'supermarket', 'restaurant', 'cafe', 'coffee', 'starbucks',
+                  'mcdonalds', 'bakery', 'tesco', 'lidl', 'aldi', 'whole foods', 'doordash', 'ubereats']},
+    {'category': 'Transport', 'type': 'expense',
+     'keywords': ['uber', 'lyft', 'taxi', 'fuel', 'petrol', 'gas station', 'shell', 'parking',
+                  'metro', 'train', 'bus', 'airline']},
+    {'category': 'Entertainment', 'type': 'expense',
+     'keywords': ['netflix', 'spotify', 'cinema', 'theatre', 'steam', 'playstation', 'concert']},
+    {'category': 'Bills', 'type': 'expense',
+     'keywords': ['rent', 'electric', 'electricity', 'water', 'internet', 'broadband', 'phone',
+                  'mobile', 'insurance', 'utility', 'council tax']},
+    {'category': 'Healthcare', 'type': 'expense',
+     'keywords': ['pharmacy', 'doctor', 'dental', 'dentist', 'hospital', 'clinic', 'optician']},
+    {'category': 'Shopping', 'type': 'expense',
+     'keywords': ['amazon', 'ebay', 'ikea', 'walmart', 'target', 'zara']},
+]
+
+_DIGITS = re.compile(r'\d+')
+_SPACES = re.compile(r'\s+')
+# Backreferences, group conditionals and leading global flags, which break or change meaning
+# inside the merged regex (a false hit on an escaped backslash only costs a separate search)
+_SOLO = re.compile(r'\\[1-9]|\(\?P=|\(\?\(|\(\?[aiLmsux]+\)')
+
+
+def normalize_description(description: str) -> str:
+    """Lower-case, digit runs folded to '0' and whitespace collapsed, so
+    'STARBUCKS #1234' and 'Starbucks #98' share a cache entry"""
+    return _SPACES.sub(' ', _DIGITS.sub('0', description.lower())).strip()
+
+
+@dataclass
+class CategoryRule:
+    category: str
+    keywords: List[str] = field(default_factory=list)  # whole words, case-insensitive
+    pattern: Optional[str] = None  # regex, matched against the normalized description
+    min_amount: Optional[float] = None
+    max_amount: Optional[float] = None
+    type: Optional[str] = None  # 'income', 'expense' or None for both
+
+    def accepts(self, amount: float, kind: str) -> bool:
+        if self.type is not None and self.type != kind:
+            return False
+        if self.min_amount is not None and amount < self.min_amount:
+            return False
+        if self.max_amount is not None and amount > self.max_amount:
+            return False
+        return True
+
+    def to_dict(self) -> Dict:
+        return {key: value for key, value in asdict(self).items() if value not in (None, [])}
+
+
+class Categorizer:
+    """Assigns categories from user rules; the first matching rule wins.
+
+    Every rule's keywords and regex are compiled into one lookahead that
+    finds the positions where any rule matches, so a description is scanned
+    once no matter how many rules there are; only at those positions is
+    each rule tried. Patterns that can't be merged (named groups,
+    backreferences, global flags) are searched on their own. The text part of a verdict (which rules matched)
+    is cached per normalized description; the cheap amount and type checks
+    run per row. Rules without keywords or a pattern match any description.
+    """
+
+    def __init__(self, rules_file="data/category_rules.json", rules: Optional[List[CategoryRule]] = None,
+                 cache_size: int = 65536):
+        self.rules_file = rules_file
+        self.cache_size = cache_size
+        self.rules: List[CategoryRule] = rules if rules is not None else self.load_rules()
+        self.compile()
+
+    def load_rules(self) -> List[CategoryRule]:
+        records = DEFAULT_RULES
+        if self.rules_file and os.path.exists(self.rules_file):
+            try:
+                with open(self.rules_file, 'r') as f:
+                    records = json.load(f)['rules']
+            except Exception as e:
+                print(f"Error loading category rules: {e}")
+        return [CategoryRule(**record) for record in records]
+
+    def save_rules(self):
+        try:
+            os.makedirs(os.path.dirname(self.rules_file) or '.', exist_ok=True)
+            with open(self.rules_file, 'w') as f:
+                json.dump({'rules': [rule.to_dict() for rule in self.rules]}, f, indent=2)
+        except Exception as e:
+            print(f"Error saving category rules: {e}")
+
+    def add_rule(self, rule: CategoryRule, position: Optional[int] = None):
+        self.rules.insert(len(self.rules) if position is None else position, rule)
+        self.compile()
+
+    def remove_rule(self, index: int):
+        del self.rules[index]
+        self.compile()
+
+    def compile(self):
+        """Rebuild the combined matcher; also drops cached verdicts"""
+        alternatives = []
+        self._always: Tuple[int, ...] = ()
+        self._solo: List[Tuple[re.Pattern, int]] = []
+        for index, rule in enumerate(self.rules):
+            parts = [r'\b' + re.escape(normalize_description(k)) + r'\b' for k in rule.keywords if k.strip()]
+            solo = False
+            if rule.pattern:
+                pattern = re.compile(rule.pattern)  # report a bad rule on its own, not as part of the merged regex
+                solo = bool(pattern.groupindex or _SOLO.search(rule.pattern))
+                if solo:
+                    self._solo.append((pattern, index))
+                else:
+                    parts.append(f"(?:{rule.pattern})")
+            if parts:
+                alternatives.append((index, '|'.join(parts)))
+            elif not solo:
+                self._always += (index,)
+        self._starts = self._matcher = None
+        if alternatives:
+            # Zero-width, so every position where some rule matches is found, overlapping or not
+            self._starts = re.compile('(?=' + '|'.join(f"(?:{body})" for _, body in alternatives) + ')')
+            # At such a position, one optional lookahead per rule records every rule that matches there;
+            # a plain alternation would stop at the first, and a rule that then fails on the amount or
+            # type would hide a lower one
+            self._matcher = re.compile(''.join(f"(?:(?=(?P<r{index}>{body}))|)" for index, body in alternatives))
+        self._groups = [(f"r{index}", index) for index, _ in alternatives]
+        self._hits = lru_cache(maxsize=self.cache_size)(self._scan)
+
+    def _scan(self, normalized: str) -> Tuple[int, ...]:
+        """Indexes of the rules whose text matches, in priority order"""
+        hits = set(self._always)
+        if self._matcher is not None:
+            for start in self._starts.finditer(normalized):
+                match = self._matcher.match(normalized, start.start())
+                hits.update(index for group, index in self._groups if match.start(group) != -1)
+        hits.update(index for pattern, index in self._solo if pattern.search(normalized))
+        return tuple(sorted(hits))
+
+    def classify(self, description: str, amount: float = 0.0, kind: str = 'expense') -> Optional[str]:
+        rules = self.rules
+        for index in self._hits(normalize_description(description)):
+            if rules[index].accepts(amount, kind):
+                return rules[index].category
+        return None
+
+    def categorize(self, transactions: Iterable[Transaction], overwrite: bool = False) -> int:
+        """Set the category of uncategorized rows (all rows with overwrite) in
+        one pass; returns how many changed. Meant for rows not yet in a model,
+        such as an import batch, as it edits them in place."""
+        changed = 0
+        classify = self.classify
+        for t in transactions:
+            if not overwrite and t.category not in UNCATEGORIZED:
+                continue
+            category = classify(t.description, t.amount, t.type)
+            if category is not None and category != t.category:
+                t.category = category
+                changed += 1
+        return changed
+
+    def cache_info(self):
+        return self._hits.cache_info()
@@ -0,0 +1,77 @@
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class ChangeLog:
+    """Latest change per transaction id, ordered by a monotonically increasing sequence.
+
+    Only the newest operation for an id is kept, so the log never grows past
+    one entry per transaction (plus delete tombstones), yet replaying
+    since(n) still brings a peer that has seen everything up to n current.
+    Entries at or below `floor` have been pruned; a peer older than that
+    needs a full sync.
+    """
+
+    def __init__(self, seq: int = 0, floor: int = 0):
+        self.seq = seq
+        self.floor = floor
+        self._entries: "OrderedDict[str, Tuple[int, str]]" = OrderedDict()
+        # Called as listener(seq, op, transaction_id) after each record()
+        self.listeners: List[Callable[[int, str, str], None]] = []
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, transaction_id: str) -> bool:
+        """Whether an id has a change no peer has acknowledged yet"""
+        return transaction_id in self._entries
+
+    def record(self, op: str, transaction_id: str) -> int:
+        """Log an 'add', 'edit' or 'delete' and return its sequence number"""
+        self.seq += 1
+        self._entries.pop(transaction_id, None)
+        self._entries[transaction_id] = (self.seq, op)
+        for listener in self.listeners:
+            listener(self.seq, op, transaction_id)
+        return self.seq
+
+    def forget(self, transaction_id: str):
+        """Drop the pending entry for an id, e.g. after a remote change replaced it"""
+        self._entries.pop(transaction_id, None)
+
+    def since(self, seq: int) -> Optional[List[Tuple[int, str, str]]]:
+        """(seq, op, id) entries newer than seq, oldest first; None if seq was pruned"""
+        if seq < self.floor:
+            return None
+        changes = []
+        for transaction_id in reversed(self._entries):
+            entry_seq, op = self._entries[transaction_id]
+            if entry_seq <= seq:
+                break
+            changes.append((entry_seq, op, transaction_id))
+        changes.reverse()
+        return changes
+
+    def prune(self, upto: int):
+        """Forget entries a peer has acknowledged"""
+        upto = min(upto, self.seq)
+        while self._entries:
+            transaction_id, (entry_seq, _) = next(iter(self._entries.items()))
+            if entry_seq > upto:
+                break
+            self._entries.popitem(last=False)
+        self.floor = max(self.floor, upto)
+
+    def to_dict(self) -> Dict:
+        return {
+            'seq': self.seq,
+            'floor': self.floor,
+            'entries': [[entry_seq, op, tid] for tid, (entry_seq, op) in self._entries.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ChangeLog":
+        log = cls(data.get('seq', 0), data.get('floor', 0))
+        for entry_seq, op, transaction_id in data.get('entries', []):
+            log._entries[transaction_id] = (entry_seq, op)
+        return log
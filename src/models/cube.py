@@ -0,0 +1,68 @@
+"""Amounts pre-aggregated by time bucket, category and type.
+
+One cell per (bucket, category, type) at each resolution - day
+('2024-05-17'), ISO week ('2024-W20'), month ('2024-05') and year
+('2024') - holding the total and the row count. BudgetModel keeps the cube
+current on every insert, removal and replacement, so period queries read
+a few hundred cells instead of scanning the ledger.
+"""
+from datetime import date
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple
+
+RESOLUTIONS = ('day', 'week', 'month', 'year')
+
+
+@lru_cache(maxsize=16384)
+def buckets(day: str) -> Tuple[str, str, str, str]:
+    """(day, week, month, year) buckets of a YYYY-MM-DD date"""
+    year, week, _ = date.fromisoformat(day).isocalendar()
+    return day, f"{year:04d}-W{week:02d}", day[:7], day[:4]
+
+
+def empty_totals() -> Dict[str, float]:
+    return {'income': 0, 'expense': 0}
+
+
+class AggregateCube:
+    def __init__(self, transactions: Iterable = ()):
+        # resolution -> {(bucket, category, type): [amount, count]}
+        self.cells: Dict[str, Dict[Tuple[str, str, str], list]] = {res: {} for res in RESOLUTIONS}
+        for transaction in transactions:
+            self.add(transaction)
+
+    def add(self, transaction, sign: int = 1):
+        amount = sign * transaction.amount
+        category, kind = transaction.category, transaction.type
+        for cells, bucket in zip(self.cells.values(), buckets(transaction.date[:10])):
+            key = (bucket, category, kind)
+            cell = cells.get(key)
+            if cell is None:
+                cells[key] = [amount, sign]
+                continue
+            cell[0] += amount
+            cell[1] += sign
+            if not cell[1]:
+                # Last row gone; drop the cell rather than keep float residue
+                del cells[key]
+
+    def remove(self, transaction):
+        self.add(transaction, -1)
+
+    def query(self, resolution: str, start: Optional[str] = None, end: Optional[str] = None,
+              prefix: Optional[str] = None) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """{bucket: {category: {'income', 'expense'}}} for buckets in [start, end) starting with prefix"""
+        if resolution not in self.cells:
+            raise ValueError(f"resolution must be one of {', '.join(RESOLUTIONS)}")
+        result: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for (bucket, category, kind), (amount, _) in self.cells[resolution].items():
+            if (start is not None and bucket < start) or (end is not None and bucket >= end):
+                continue
+            if prefix is not None and not bucket.startswith(prefix):
+                continue
+            totals = result.setdefault(bucket, {}).setdefault(category, empty_totals())
+            totals['income' if kind == 'income' else 'expense'] += amount
+        return result
+
+    def size(self) -> int:
+        return sum(len(cells) for cells in self.cells.values())
@@ -0,0 +1,213 @@
+"""Month-end balance projection from monthly history.
+
+Each (category, type) series of monthly totals is deseasonalized, given a
+level (the mean of its last twelve months) and a damped linear trend, and
+projected forward with its seasonal index put back. Seasonal indexes need
+two years of history; with less, every calendar month weighs the same.
+
+Items that recur once a month at a steady amount (rent, subscriptions,
+pay) are taken out of their category's history and projected flat at
+their typical amount, so a new price shows up at once instead of being
+smeared into a trend. They are looked for in the live rows of the last
+twelve months only; further back, an item already paid a year ago is
+assumed to have been paid every month.
+
+numpy isn't a dependency: matrices are lists of rows, one per series, and
+each step is a single comprehension over the whole series x months matrix.
+"""
+from dataclasses import dataclass
+from operator import mul
+from statistics import median
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from utils.dedupe import description_tokens
+
+DAMPING = 0.9  # each month ahead keeps 90% of the previous month's trend
+WINDOW = 12  # months behind the level and the trend
+SEASONAL_MIN = 24  # months of history before seasonal indexes are used
+
+Series = Tuple[str, str]  # (category, type)
+
+
+def add_months(month: str, count: int) -> str:
+    """'2024-11' plus 3 -> '2025-02'"""
+    index = int(month[:4]) * 12 + int(month[5:7]) - 1 + count
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def month_range(first: str, count: int) -> List[str]:
+    return [add_months(first, i) for i in range(count)]
+
+
+def description_key(description: str) -> str:
+    """Descriptions that differ only in card numbers, dates or punctuation share a key"""
+    return ' '.join(sorted(description_tokens(description)))
+
+
+@dataclass
+class RecurringItem:
+    category: str
+    type: str
+    description: str
+    amount: float  # typical monthly amount
+    months: int  # months it was seen in
+
+
+def find_recurring(transactions: Iterable, months: List[str], recent: int = 6, min_months: int = 3,
+                   tolerance: float = 0.2) -> Tuple[List[RecurringItem], Dict[Series, List[float]]]:
+    """Items seen once a month in at least min_months of the last `recent` months, lately, at a steady amount.
+
+    Returns the items and, per series, their monthly totals over `months`
+    so they can be taken out of the category history.
+    """
+    index = {month: i for i, month in enumerate(months)}
+    # Grouped on the raw description first, so each distinct one is normalised once
+    raw: Dict[Tuple[str, str, str], Dict[int, List[float]]] = {}
+    for t in transactions:
+        i = index.get(t.date[:7])
+        if i is not None:
+            raw.setdefault((t.category, t.type, t.description), {}).setdefault(i, []).append(t.amount)
+    seen: Dict[Tuple[str, str, str], Dict[int, List[float]]] = {}
+    names: Dict[Tuple[str, str, str], str] = {}
+    for (category, kind, description), per_month in raw.items():
+        key = (category, kind, description_key(description))
+        if not key[2]:
+            continue
+        merged = seen.setdefault(key, {})
+        for i, amounts in per_month.items():
+            merged.setdefault(i, []).extend(amounts)
+        names.setdefault(key, description)
+
+    last = len(months) - 1
+    items, totals = [], {}
+    for key, per_month in seen.items():
+        # Billing dates drift across month ends, so the latest month may be missed
+        if last not in per_month and last - 1 not in per_month:
+            continue
+        recent_amounts = [amounts for i, amounts in per_month.items() if i > last - recent]
+        if len(recent_amounts) < min_months or any(len(amounts) != 1 for amounts in recent_amounts):
+            continue
+        typical = median(amounts[0] for amounts in recent_amounts)
+        if typical <= 0 or any(abs(amounts[0] - typical) > tolerance * typical for amounts in recent_amounts):
+            continue
+        items.append(RecurringItem(key[0], key[1], names[key], typical, len(per_month)))
+        row = totals.setdefault(key[:2], [0.0] * len(months))
+        for i, amounts in per_month.items():
+            row[i] += sum(amounts)
+    items.sort(key=lambda item: (item.type, -item.amount))
+    return items, totals
+
+
+def seasonal_indexes(history: List[List[float]], months: List[str]) -> List[List[float]]:
+    """Per series, twelve calendar-month averages relative to the series mean"""
+    if len(months) < SEASONAL_MIN:
+        return [[1.0] * 12 for _ in history]
+    columns = [[j for j, month in enumerate(months) if int(month[5:7]) == m] for m in range(1, 13)]
+    means = [sum(row) / len(row) for row in history]
+    return [[sum(row[j] for j in cols) / len(cols) / mean if cols and mean > 0 else 1.0 for cols in columns]
+            for row, mean in zip(history, means)]
+
+
+def project(history: List[List[float]], months: List[str], horizon: int) -> List[List[float]]:
+    """Series x horizon matrix of projected monthly totals, for the months after months[-1]"""
+    if not history or not months:
+        return [[0.0] * horizon for _ in history]
+    calendar = [int(month[5:7]) - 1 for month in months]
+    ahead = [int(month[5:7]) - 1 for month in month_range(add_months(months[-1], 1), horizon)]
+    seasons = seasonal_indexes(history, months)
+    # A zero index means nothing was ever spent in that calendar month, so x is 0 there too
+    deseasoned = [[x / season[c] if season[c] else 0.0 for x, c in zip(row, calendar)]
+                  for row, season in zip(history, seasons)]
+
+    window = min(WINDOW, len(months))
+    tails = [row[-window:] for row in deseasoned]
+    levels = [sum(tail) / window for tail in tails]
+    # Least-squares slope: weights sum to zero, so the tail needs no centring
+    centre = (window - 1) / 2
+    spread = sum((i - centre) ** 2 for i in range(window)) or 1.0
+    weights = [(i - centre) / spread for i in range(window)]
+    slopes = [sum(map(mul, tail, weights)) for tail in tails]
+
+    # Distance from the middle of the window to each month ahead, with the trend damped
+    steps, reach = [], centre
+    for h in range(1, horizon + 1):
+        reach += DAMPING ** h
+        steps.append(reach)
+    return [[max(0.0, (level + slope * step) * season[c]) for step, c in zip(steps, ahead)]
+            for level, slope, season in zip(levels, slopes, seasons)]
+
+
+def column_sums(rows: List[List[float]], width: int) -> List[float]:
+    return [sum(column) for column in zip(*rows)] if rows else [0.0] * width
+
+
+def forecast(summary: Dict, rows: Callable[[str, str], Iterable], current: str, horizon: int, history: int,
+             balance: float, monthly_income: float = 0) -> Dict:
+    """Projected totals and month-end balances for the current month and the `horizon` after it.
+
+    summary is the month-resolution period summary from `history` months
+    before current through current; rows(start, end) returns the live rows
+    dated in [start, end), such as BudgetModel.iter_transactions. The
+    current month's actuals so far are already in balance, so only what is
+    projected beyond them is added. A monthly_income above zero replaces
+    the projected income.
+    """
+    past = month_range(add_months(current, -history), history)
+    series: List[Series] = sorted({(category, kind) for month in past + [current]
+                                   for category, totals in summary.get(month, {}).items()
+                                   for kind in ('income', 'expense') if totals[kind]})
+    scanned = past[-WINDOW:]
+    items, recurring = find_recurring(rows(scanned[0] + '-01', current + '-01'), scanned)
+    older = len(past) - len(scanned)
+    for key, row in recurring.items():
+        # Paid a year ago: assume it was paid before that too
+        before = sum(item.amount for item in items if (item.category, item.type) == key) if row[0] else 0.0
+        recurring[key] = [before] * older + row
+    matrix = [[summary.get(month, {}).get(category, {}).get(kind, 0.0) for month in past]
+              for category, kind in series]
+    matrix = [[max(0.0, x - r) for x, r in zip(row, recurring[key])] if key in recurring else row
+              for key, row in zip(series, matrix)]
+    # A young ledger is projected from the months it has, not from years of zeros
+    used = next((j for j in range(history) if any(row[j] for row in matrix)), history)
+    months = past[used:]
+    ahead = horizon + 1
+
+    projected = project([row[used:] for row in matrix], months, ahead)
+    flat = {}
+    for item in items:
+        flat[(item.category, item.type)] = flat.get((item.category, item.type), 0.0) + item.amount
+    projected = [[x + flat.get(key, 0.0) for x in row] for key, row in zip(series, projected)]
+    # This month: only what is still to come on top of what already happened
+    for key, row in zip(series, projected):
+        row[0] = max(0.0, row[0] - summary.get(current, {}).get(key[0], {}).get(key[1], 0.0))
+
+    expense_rows = [row for (_, kind), row in zip(series, projected) if kind != 'income']
+    income_rows = [row for (_, kind), row in zip(series, projected) if kind == 'income']
+    expense = column_sums(expense_rows, ahead)
+    if monthly_income > 0:
+        earned = sum(summary.get(current, {}).get(category, {}).get('income', 0.0)
+                     for category in summary.get(current, {}))
+        income = [max(0.0, monthly_income - earned)] + [float(monthly_income)] * horizon
+    else:
+        income = column_sums(income_rows, ahead)
+    net = [i - e for i, e in zip(income, expense)]
+    balances, running = [], balance
+    for change in net:
+        running += change
+        balances.append(running)
+
+    categories: Dict[str, List[float]] = {}
+    for (category, kind), row in zip(series, projected):
+        if kind != 'income':
+            categories[category] = row
+    return {
+        'months': month_range(current, ahead),
+        'start_balance': balance,
+        'history_months': len(months),
+        'income': income,
+        'expense': expense,
+        'net': net,
+        'balance': balances,
+        'categories': categories,
+        'recurring': items,
+    }
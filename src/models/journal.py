@@ -0,0 +1,189 @@
+"""Append-only, checksummed journal of ledger changes.
+
+Each line is `<crc32 hex> <json record>`, so a write torn by a crash is
+detected and everything before it is still usable. The journal lives next
+to the ledger snapshot (<ledger>.journal); when it is folded into a new
+snapshot it is first sealed (renamed to <ledger>.journal.sealed) so that
+new writes can go on while the snapshot is written.
+
+How hard each write is pushed to disk is the durability policy:
+
+    none        flushed to the OS, never fsynced; a power cut can lose recent writes
+    group[:ms]  fsynced at most every ms milliseconds (default 100) by a committer thread
+    fsync       fsynced before every append returns
+"""
+import json
+import os
+import threading
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+POLICIES = ('none', 'group', 'fsync')
+DEFAULT_GROUP_MS = 100
+
+
+def parse_policy(policy: str) -> Tuple[str, int]:
+    """'group:50' -> ('group', 50)"""
+    name, _, interval = (policy or 'none').partition(':')
+    if name not in POLICIES:
+        raise ValueError(f"unknown durability policy {policy!r} (expected none, group[:ms] or fsync)")
+    return name, int(interval) if interval else DEFAULT_GROUP_MS
+
+
+def encode(record: Dict) -> bytes:
+    body = json.dumps(record, separators=(',', ':')).encode('utf-8')
+    return b'%08x ' % zlib.crc32(body) + body + b'\n'
+
+
+def decode(line: bytes) -> Optional[Dict]:
+    """The record, or None if the line is torn or its checksum does not match"""
+    if len(line) < 10 or not line.endswith(b'\n') or line[8:9] != b' ':
+        return None
+    body = line[9:-1]
+    try:
+        if int(line[:8], 16) != zlib.crc32(body):
+            return None
+        return json.loads(body)
+    except ValueError:
+        return None
+
+
+def read_segment(path: str) -> Tuple[List[Dict], int, int]:
+    """(intact records, bytes they span, file size); reading stops at the first bad line"""
+    records, intact = [], 0
+    if not os.path.exists(path):
+        return records, 0, 0
+    with open(path, 'rb') as f:
+        for line in f:
+            record = decode(line)
+            if record is None:
+                break
+            records.append(record)
+            intact += len(line)
+        size = f.seek(0, os.SEEK_END)
+    return records, intact, size
+
+
+def fsync_directory(path: str):
+    """Make a rename or unlink in path's directory durable (a no-op where unsupported)"""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class Journal:
+    def __init__(self, path: str, policy: str = 'none'):
+        self.path = path
+        self.sealed_path = path + '.sealed'
+        self.policy, self.group_ms = parse_policy(policy)
+        self.size = os.path.getsize(path) if os.path.exists(path) else 0
+        self.records = 0  # appended since the last reset
+        self.unsynced = 0  # appended but not yet fsynced
+        self._file = None
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._committer: Optional[threading.Thread] = None
+
+    def append(self, records: List[Dict]):
+        data = b''.join(encode(record) for record in records)
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                self._file = open(self.path, 'ab')
+            self._file.write(data)
+            self._file.flush()
+            self.size += len(data)
+            self.records += len(records)
+            if self.policy == 'fsync':
+                os.fsync(self._file.fileno())
+            elif self.policy == 'group':
+                self.unsynced += len(records)
+                if self._committer is None:
+                    self._committer = threading.Thread(target=self._commit_loop, name='journal-commit',
+                                                       daemon=True)
+                    self._committer.start()
+
+    def sync(self):
+        """fsync whatever has been appended since the last sync"""
+        with self._lock:
+            if self._file is not None and self.unsynced:
+                os.fsync(self._file.fileno())
+                self.unsynced = 0
+
+    def _commit_loop(self):
+        while not self._closed.wait(self.group_ms / 1000):
+            try:
+                self.sync()
+            except OSError as e:
+                print(f"Error syncing journal: {e}")
+
+    def _close_file(self):
+        if self._file is not None:
+            if self.unsynced:
+                os.fsync(self._file.fileno())
+                self.unsynced = 0
+            self._file.close()
+            self._file = None
+
+    def seal(self) -> bool:
+        """Move the current segment aside so it can be compacted; False if one already is"""
+        with self._lock:
+            if os.path.exists(self.sealed_path):
+                return False
+            self._close_file()
+            if os.path.exists(self.path):
+                os.replace(self.path, self.sealed_path)
+            self.size = 0
+            self.records = 0
+            return True
+
+    def drop_sealed(self):
+        with self._lock:
+            if os.path.exists(self.sealed_path):
+                os.remove(self.sealed_path)
+
+    def reset(self):
+        """Forget every segment; the caller has just written a snapshot that covers them"""
+        with self._lock:
+            self._close_file()
+            for path in (self.path, self.sealed_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self.size = 0
+            self.records = 0
+
+    def recover(self) -> Tuple[List[Dict], int]:
+        """Records of the sealed then the current segment, and how many torn bytes were cut off.
+
+        A torn tail of the current segment is truncated away, so later
+        appends do not land behind it.
+        """
+        with self._lock:
+            self._close_file()
+            sealed, _, _ = read_segment(self.sealed_path)
+            current, intact, size = read_segment(self.path)
+            if intact < size:
+                with open(self.path, 'r+b') as f:
+                    f.truncate(intact)
+            self.size = intact
+            self.records = len(current)
+            return sealed + current, size - intact
+
+    def close(self):
+        self._closed.set()
+        with self._lock:
+            self._close_file()
+        if self._committer is not None:
+            self._committer.join()
+            self._committer = None
+        self._closed.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {'journal bytes': self.size, 'journal records': self.records, 'awaiting fsync': self.unsynced}
@@ -0,0 +1,274 @@
+"""Local JSON HTTP API over BudgetController, for other tools on this machine.
+
+    GET    /api/balance
+    GET    /api/transactions?limit=50&after=<date>,<id>
+    GET    /api/transactions/<id>
+    GET    /api/summary/categories?from=YYYY-MM-DD&to=YYYY-MM-DD
+    GET    /api/summary/monthly?from=YYYY-MM-DD&to=YYYY-MM-DD
+    POST   /api/transactions        one JSON object or a list of them
+    DELETE /api/transactions/<id>
+
+Requests are served by a fixed pool of worker threads. Every GET answer
+carries an ETag made of the model's data_version (plus a per-process
+token), so a client polling with If-None-Match gets a 304 without anything
+being recomputed, and unchanged answers are cached per version.
+
+Headless (python src/cli.py serve), reads run concurrently under a shared
+lock and writes take it exclusively. In the GUI, pass a dispatch such as
+views.sync_status.QtDispatcher and every model call runs on the UI thread.
+"""
+import json
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+
+from controllers.budget_controller import BudgetController
+from utils.metrics import metrics
+
+
+class ReadWriteLock:
+    """Many readers or one writer"""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writer = False
+
+    @contextmanager
+    def reading(self):
+        with self._condition:
+            while self._writer:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def writing(self):
+        with self._condition:
+            while self._writer or self._readers:
+                self._condition.wait()
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writer = False
+                self._condition.notify_all()
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class BudgetApi:
+    """Routes and the per-version response cache; shared by all handler threads"""
+
+    def __init__(self, controller: BudgetController,
+                 dispatch: Optional[Callable[[Callable], Future]] = None,
+                 on_change: Optional[Callable[[], None]] = None,
+                 cache_size: int = 256):
+        self.controller = controller
+        self.dispatch = dispatch
+        self.on_change = on_change
+        self.lock = ReadWriteLock()
+        # data_version restarts with the process; the token keeps old ETags from matching
+        self.token = uuid.uuid4().hex[:8]
+        self.cache: "OrderedDict[str, Tuple[int, bytes]]" = OrderedDict()
+        self.cache_size = cache_size
+        self.cache_lock = threading.Lock()
+        self.counters = {'requests': 0, 'not_modified': 0, 'cache_hits': 0}
+
+    @property
+    def version(self) -> int:
+        return self.controller.model.data_version
+
+    def etag(self, version: int) -> str:
+        return f'"{self.token}-{version}"'
+
+    def call(self, fn, write: bool = False):
+        """Run fn where the model may be touched"""
+        if self.dispatch is not None:
+            return self.dispatch(fn).result()
+        with self.lock.writing() if write else self.lock.reading():
+            return fn()
+
+    def get(self, target: str) -> Tuple[int, bytes]:
+        """(version, JSON body) for a GET, from the cache while the version holds"""
+        with self.cache_lock:
+            cached = self.cache.get(target)
+            if cached is not None and cached[0] == self.version:
+                self.cache.move_to_end(target)
+                self.counters['cache_hits'] += 1
+                return cached
+        url = urlparse(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        version, payload = self.call(lambda: (self.version, self.read(url.path, query)))
+        result = (version, json.dumps(payload).encode('utf-8'))
+        with self.cache_lock:
+            self.cache[target] = result
+            self.cache.move_to_end(target)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return result
+
+    def read(self, path: str, query: Dict[str, str]):
+        controller = self.controller
+        parts = [unquote(p) for p in path.strip('/').split('/')]
+        if parts[:1] != ['api']:
+            raise ApiError(404, "not found")
+        parts = parts[1:]
+        if parts == ['balance']:
+            return {'balance': round(controller.get_current_balance(), 2),
+                    'transactions': len(controller.model.transactions)}
+        if parts == ['transactions']:
+            limit = int(query.get('limit', 50))
+            if not 1 <= limit <= 1000:
+                raise ApiError(400, f"limit must be between 1 and 1000, not {limit}")
+            after = tuple(query['after'].split(',', 1)) if query.get('after') else None
+            page = controller.get_transactions_page(limit, after=after)
+            last = page[-1] if page and len(page) == limit else None
+            return {'transactions': [t.to_dict() for t in page],
+                    'next': ",".join(controller.model.transaction_key(last)) if last else None}
+        if len(parts) == 2 and parts[0] == 'transactions':
+            transaction = controller.model.get_transaction(parts[1])
+            if transaction is None:
+                raise ApiError(404, f"no transaction {parts[1]}")
+            return transaction.to_dict()
+        if parts == ['summary', 'categories']:
+            return controller.get_category_summary(query.get('from'), query.get('to'))
+        if parts == ['summary', 'monthly']:
+            return dict(sorted(controller.get_monthly_summary(query.get('from'), query.get('to')).items()))
+        raise ApiError(404, "not found")
+
+    def write(self, method: str, path: str, body: bytes):
+        from utils.ledger_io import to_transaction
+
+        parts = [unquote(p) for p in path.strip('/').split('/')]
+        if method == 'POST' and parts == ['api', 'transactions']:
+            records = json.loads(body or b'null')
+            records = records if isinstance(records, list) else [records]
+            transactions = [to_transaction(record) for record in records]
+            added = self.call(lambda: self.controller.add_transactions(transactions), write=True)
+            result = {'added': added, 'ids': [t.id for t in transactions]}
+        elif method == 'DELETE' and len(parts) == 3 and parts[:2] == ['api', 'transactions']:
+            deleted = self.call(lambda: self.controller.delete_transactions([parts[2]]), write=True)
+            if not deleted:
+                raise ApiError(404, f"no transaction {parts[2]}")
+            result = {'deleted': deleted}
+        else:
+            raise ApiError(404, "not found")
+        if self.on_change is not None:
+            self.call(self.on_change, write=True)
+        return result
+
+
+class BudgetApiHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    timeout = 5  # an idle keep-alive connection gives its worker back
+    api: BudgetApi = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status: int, body: bytes, headers: Dict = None):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_error_json(self, status: int, message: str):
+        self.send_json(status, json.dumps({'error': message}).encode('utf-8'))
+
+    def do_GET(self):
+        with metrics.span('api.get'):
+            self.handle_get()
+
+    def handle_get(self):
+        api = self.api
+        api.counters['requests'] += 1
+        # Answered from the version alone - no lock, no controller call
+        if self.headers.get('If-None-Match') == api.etag(api.version):
+            api.counters['not_modified'] += 1
+            metrics.incr('api.not_modified')
+            self.send_response(304)
+            self.send_header('ETag', api.etag(api.version))
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        try:
+            version, body = api.get(self.path)
+        except ApiError as e:
+            self.send_error_json(e.status, str(e))
+        except (KeyError, ValueError) as e:
+            self.send_error_json(400, f"bad request: {e}")
+        else:
+            self.send_json(200, body, {'ETag': api.etag(version), 'Cache-Control': 'no-cache'})
+
+    def do_POST(self):
+        self.handle_write('POST')
+
+    def do_DELETE(self):
+        self.handle_write('DELETE')
+
+    @metrics.timed('api.write')
+    def handle_write(self, method: str):
+        self.api.counters['requests'] += 1
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        try:
+            result = self.api.write(method, urlparse(self.path).path, body)
+        except ApiError as e:
+            self.send_error_json(e.status, str(e))
+        except (KeyError, TypeError, ValueError) as e:
+            self.send_error_json(400, f"bad request: {e}")
+        else:
+            self.send_json(200, json.dumps(result).encode('utf-8'),
+                           {'ETag': self.api.etag(self.api.version)})
+
+
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer handing each connection to a fixed-size thread pool"""
+
+    def __init__(self, address, handler, workers: int = 4):
+        super().__init__(address, handler)
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='budget-api')
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self.process_request_worker, request, client_address)
+
+    def process_request_worker(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=False)
+
+
+def start_api_server(controller: BudgetController, host: str = '127.0.0.1', port: int = 0,
+                     workers: int = 4, dispatch=None, on_change=None):
+    """Serve on a background thread; returns (server, api, base_url)"""
+    api = BudgetApi(controller, dispatch, on_change)
+    handler = type('BoundBudgetApiHandler', (BudgetApiHandler,), {'api': api})
+    server = PooledHTTPServer((host, port), handler, workers)
+    threading.Thread(target=server.serve_forever, name='budget-api', daemon=True).start()
+    return server, api, f"http://{host}:{server.server_address[1]}/api"
@@ -0,0 +1,136 @@
+"""Duplicate detection for imported transactions.
+
+Transactions are fingerprinted by (amount in cents, type, day) into a hash
+index of buckets; each bucket holds the description token sets seen for
+that fingerprint. An incoming row probes the buckets of the days within
+`window_days` of its own and matches the most similar description, so a
+lookup costs a fixed number of dict probes regardless of ledger size.
+
+Each stored row can absorb at most one incoming row per merge, so two
+genuine identical purchases are only dropped if the ledger already has two.
+"""
+import gc
+import re
+from datetime import date
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from models.budget import BudgetModel, Transaction
+
+# Words that say how a card was used rather than where
+NOISE_TOKENS = frozenset({
+    'pos', 'card', 'purchase', 'debit', 'credit', 'payment', 'visa', 'mastercard',
+    'contactless', 'transaction', 'ref', 'the', 'and', 'www', 'com',
+})
+
+_TOKEN = re.compile(r'[a-z]{2,}')
+
+Fingerprint = Tuple[int, str, int]  # (amount in cents, type, day ordinal)
+
+
+@lru_cache(maxsize=65536)
+def description_tokens(description: str) -> frozenset:
+    """Lower-cased word tokens without card/terminal noise, digits or punctuation"""
+    return frozenset(t for t in _TOKEN.findall(description.lower()) if t not in NOISE_TOKENS)
+
+
+@lru_cache(maxsize=16384)
+def day_ordinal(iso_date: str) -> int:
+    return date.fromisoformat(iso_date[:10]).toordinal()
+
+
+def fingerprint(transaction: Transaction) -> Fingerprint:
+    return (round(transaction.amount * 100), transaction.type, day_ordinal(transaction.date))
+
+
+def similarity(a: frozenset, b: frozenset) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class DuplicateIndex:
+    def __init__(self, window_days: int = 2, min_similarity: float = 0.5):
+        self.window_days = window_days
+        self.min_similarity = min_similarity
+        self._buckets: Dict[Fingerprint, List[Tuple[frozenset, str]]] = {}
+        # Probe the same day first, then spread outwards
+        self._offsets = [0] + [d for step in range(1, window_days + 1) for d in (-step, step)]
+
+    @classmethod
+    def for_model(cls, model: BudgetModel, archived_since: Optional[str] = None,
+                  **options) -> "DuplicateIndex":
+        """Index of the open rows, and of archived ones dated from archived_since on (all if None)"""
+        index = cls(**options)
+        index.add_all(model.transactions)
+        archive = model.archive
+        if archive and (archived_since is None or archived_since < (archive.closed_through or '')):
+            index.add_all(model.iter_archived_transactions(archived_since))
+        return index
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._buckets.values())
+
+    def add(self, transaction: Transaction):
+        self._buckets.setdefault(fingerprint(transaction), []).append(
+            (description_tokens(transaction.description), transaction.id))
+
+    def add_all(self, transactions: Iterable[Transaction]):
+        # add() inlined; this runs over the whole ledger before every merge. The
+        # cyclic GC is paused meanwhile: it would rescan the growing index
+        # again and again (2.6x slower at a million rows) and finds nothing.
+        buckets, tokens, ordinal = self._buckets, description_tokens, day_ordinal
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            for t in transactions:
+                key = (round(t.amount * 100), t.type, ordinal(t.date))
+                entry = (tokens(t.description), t.id)
+                entries = buckets.get(key)
+                if entries is None:
+                    buckets[key] = [entry]
+                else:
+                    entries.append(entry)
+        finally:
+            if collecting:
+                gc.enable()
+
+    def find(self, transaction: Transaction, used: Optional[Set[str]] = None) -> Optional[str]:
+        """Id of the stored row this one duplicates, if any"""
+        cents, kind, day = fingerprint(transaction)
+        tokens = description_tokens(transaction.description)
+        best_id, best_score = None, self.min_similarity
+        for offset in self._offsets:
+            for stored_tokens, stored_id in self._buckets.get((cents, kind, day + offset), ()):
+                if stored_id == transaction.id:
+                    return stored_id
+                if used is not None and stored_id in used:
+                    continue
+                score = similarity(tokens, stored_tokens)
+                if score >= best_score and (best_id is None or score > best_score):
+                    best_id, best_score = stored_id, score
+            if best_id is not None and offset == 0 and best_score == 1.0:
+                break
+        return best_id
+
+    def split(self, transactions: Iterable[Transaction], used: Optional[Set[str]] = None,
+              remember: bool = True) -> Tuple[List[Transaction], List[Transaction]]:
+        """Partition one source's rows into (new, duplicates), then index the new ones.
+
+        Rows of the same call are never matched against each other: a single
+        statement listing two identical coffees means two coffees. A source
+        that arrives in pages passes the same `used` set for every page and
+        remember=False, so its pages are only checked against what was there.
+        """
+        used = set() if used is None else used
+        fresh, duplicates = [], []
+        for transaction in transactions:
+            match = self.find(transaction, used)
+            if match is None:
+                fresh.append(transaction)
+            else:
+                used.add(match)
+                duplicates.append(transaction)
+        if remember:
+            self.add_all(fresh)
+        return fresh, duplicates
@@ -0,0 +1,115 @@
+"""Point-in-time diagnostics of a running app, without any Qt dependency.
+
+collect() gathers ledger size, estimated memory per subsystem, cache hit
+rates, pending writes and the recorded timings into one plain dict, for
+the diagnostics panel or anything else that wants to show it. Parts of the
+app that own more state (the sync service, the API server) add to it with
+register().
+"""
+import os
+import sys
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+from models.budget import BudgetModel
+from utils.metrics import metrics
+
+# name -> callable returning a dict of extra figures, e.g. the sync queue
+_providers: Dict[str, Callable[[], Dict]] = {}
+
+
+def register(name: str, provider: Callable[[], Dict]):
+    _providers[name] = provider
+
+
+def unregister(name: str):
+    _providers.pop(name, None)
+
+
+def resident_memory() -> int:
+    """Resident set size of this process in bytes (peak RSS where /proc is missing)"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except (ImportError, OSError):
+        return 0
+
+
+def _transaction_size(transaction) -> int:
+    size = sys.getsizeof(transaction) + sys.getsizeof(transaction.__dict__)
+    return size + sum(sys.getsizeof(value) for value in transaction.__dict__.values())
+
+
+def estimate_memory(model: BudgetModel, sample: int = 256) -> Dict[str, int]:
+    """Approximate bytes held per subsystem, extrapolated from a sample of rows"""
+    transactions = model.transactions
+    count = len(transactions)
+    step = max(1, count // sample)
+    sampled = transactions[::step][:sample]
+    per_row = sum(map(_transaction_size, sampled)) / len(sampled) if sampled else 0
+    key_size = sys.getsizeof(model._keys[0]) if model._keys else 0
+    entries = len(model.changes)
+    return {
+        'ledger rows': int(per_row * count) + sys.getsizeof(transactions),
+        'indexes': sys.getsizeof(model._by_id) + sys.getsizeof(model._keys) + key_size * len(model._keys),
+        # One (seq, op) tuple and an ordered-dict slot per entry
+        'change log': entries * (sys.getsizeof((0, 'add')) + 100),
+    }
+
+
+def cache_stats() -> List[Tuple[str, int, int, int]]:
+    """(cache, hits, misses, entries) for the process-wide caches that exist so far"""
+    stats = []
+    styles = sys.modules.get('views.styles.styles')
+    if styles is not None:
+        infos = styles.HyprlandStyles.cache_info().values()
+        stats.append(('stylesheets', sum(i.hits for i in infos), sum(i.misses for i in infos),
+                      sum(i.currsize for i in infos)))
+    for module, function, label in (('utils.dedupe', 'description_tokens', 'dedupe tokens'),
+                                    ('utils.statement_importer', 'parse_date', 'statement dates')):
+        loaded = sys.modules.get(module)
+        if loaded is not None:
+            info = getattr(loaded, function).cache_info()
+            stats.append((label, info.hits, info.misses, info.currsize))
+    return stats
+
+
+def collect(model: BudgetModel, categorizer=None, query_cache=None) -> Dict:
+    caches = cache_stats()
+    if categorizer is not None:
+        info = categorizer.cache_info()
+        caches.append(('category rules', info.hits, info.misses, info.currsize))
+    if query_cache is not None:
+        stats = query_cache.stats()
+        caches.append(('controller reads', stats['hits'], stats['misses'], stats['entries']))
+    data_file = model.data_file
+    snapshot = {
+        'ledger': {
+            'transactions': len(model.transactions),
+            'data version': model.data_version,
+            'file bytes': os.path.getsize(data_file) if data_file and os.path.exists(data_file) else 0,
+        },
+        'memory': dict(estimate_memory(model), **{'process resident': resident_memory()}),
+        'caches': caches,
+        'pending writes': dict(model.journal.stats(), **{
+            # Changes logged but not yet acknowledged by the Java side
+            'unsynced changes': len(model.changes),
+        }),
+        'timings': metrics.snapshot()['histograms'] if metrics.enabled else {},
+    }
+    if query_cache is not None:
+        snapshot['memory']['cached reads'] = query_cache.bytes
+    if tracemalloc.is_tracing():
+        snapshot['memory']['python traced'] = tracemalloc.get_traced_memory()[0]
+    for name, provider in list(_providers.items()):
+        try:
+            snapshot[name] = provider()
+        except Exception as e:
+            snapshot[name] = {'error': str(e)}
+    return snapshot
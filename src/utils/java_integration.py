@@ -1,50 +1,331 @@
+import gzip
+import hashlib
 import json
+import os
+import threading
+from itertools import chain, islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
 import requests
-from models.budget import BudgetModel
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from models.budget import BudgetModel, Transaction
+from utils.dedupe import DuplicateIndex
+
+NDJSON = 'application/x-ndjson'
+
+
+def encode_chunk(transactions: Iterable[Transaction]) -> bytes:
+    """Gzip-compressed NDJSON, one transaction per line"""
+    return encode_records(t.to_dict() for t in transactions)
+
+
+def encode_records(records: Iterable[Dict]) -> bytes:
+    lines = "".join(json.dumps(r, separators=(',', ':')) + "\n" for r in records)
+    return gzip.compress(lines.encode('utf-8'), compresslevel=6)
+
+
+def run_here(fn):
+    """Default `run` for exports and imports: the caller's thread owns the model"""
+    return fn()
+
+
+def decode_lines(lines: Iterable[bytes]) -> Iterator[Transaction]:
+    for line in lines:
+        if line.strip():
+            yield Transaction(**json.loads(line))
+
+
+class CheckpointError(ValueError):
+    """The sync checkpoint file exists but can't be read"""
+
 
 class JavaIntegration:
-    def __init__(self, base_url: str = "http://localhost:8080/api"):
-        self.base_url = base_url
-    
-    def export_to_java(self, model: BudgetModel):
-        """Export budget data to Java application"""
-        data = {
-            'transactions': [
-                {
-                    'id': t.id,
-                    'amount': t.amount,
-                    'category': t.category,
-                    'description': t.description,
-                    'date': t.date,
-                    'type': t.type
-                } for t in model.transactions
-            ]
-        }
-        
+    """Client for the Java application's budget endpoints.
+
+    Transfers go over one pooled requests.Session as gzip-compressed NDJSON
+    chunks of at most chunk_size transactions, so memory stays bounded by
+    the chunk rather than the ledger. Progress is checkpointed per chunk,
+    and a failed export or import resumes from the last acknowledged chunk
+    on the next call.
+
+    sync() only moves changes: BudgetModel's change log since the last
+    sequence Java acknowledged, and Java's changes since the last one we
+    applied. Both high-water marks live in the checkpoint file; a full
+    export/import is only used when a side's log no longer reaches back.
+    """
+
+    def __init__(self, base_url: str = "http://localhost:8080/api",
+                 chunk_size: int = 1000,
+                 timeout=(3.05, 30),
+                 max_retries: int = 3,
+                 pool_size: int = 4,
+                 checkpoint_file: str = "data/java_sync_checkpoint.json"):
+        self.base_url = base_url.rstrip('/')
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.checkpoint_file = checkpoint_file
+        # The sync thread and its executor both update the checkpoint
+        self._checkpoint_lock = threading.RLock()
+
+        retry = Retry(total=max_retries, backoff_factor=0.5,
+                      status_forcelist=(500, 502, 503, 504),
+                      allowed_methods=None)  # chunk POSTs are idempotent by (export id, index)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({'Accept-Encoding': 'gzip'})
+
+    def close(self):
+        self.session.close()
+
+    def export_to_java(self, model: BudgetModel, run: Callable = run_here) -> bool:
+        """Export budget data to Java application.
+
+        The model is only read inside run(fn), which must call fn on the
+        thread owning it; there the open rows and the archive's segment
+        list are copied, and the export works from the copies.
+        """
+        # Rows are replaced, never changed in place, so the copied list stays a consistent snapshot
+        archive, segments, archived, rows = run(lambda: (
+            model.archive, list(model.archive.segments), model.archive.rows, list(model.iter_transactions())))
+        export_id = self.snapshot_id(segments, rows)
+        # Closed periods are exported too; the Java side holds the whole history
+        chunk_count = -(-(archived + len(rows)) // self.chunk_size)
+        history = chain((Transaction(**record) for record in archive.iter_rows(segments=segments)), rows)
+        checkpoint = self.load_checkpoint().get('export', {})
+        acknowledged = checkpoint.get('acknowledged', -1) if checkpoint.get('id') == export_id else -1
+
         try:
-            response = requests.post(
-                f"{self.base_url}/budget/import",
-                json=data,
-                headers={'Content-Type': 'application/json'}
-            )
-            return response.status_code == 200
+            for index, chunk in enumerate(self.chunks(history)):
+                if index <= acknowledged:
+                    continue
+                response = self.session.post(
+                    f"{self.base_url}/budget/import/chunk",
+                    data=encode_chunk(chunk),
+                    headers={
+                        'Content-Type': NDJSON,
+                        'Content-Encoding': 'gzip',
+                        'X-Export-Id': export_id,
+                        'X-Chunk-Index': str(index),
+                        'X-Chunk-Count': str(chunk_count),
+                    },
+                    timeout=self.timeout,
+                )
+                response.raise_for_status()
+                acknowledged = response.json().get('acknowledged', index)
+                self.save_checkpoint('export', {'id': export_id, 'acknowledged': acknowledged})
         except Exception as e:
-            print(f"Export failed: {e}")
+            print(f"Export failed after chunk {acknowledged}: {e}")
             return False
-    
-    def import_from_java(self, model: BudgetModel):
-        """Import budget data from Java application"""
+
+        self.save_checkpoint('export', None)
+        return True
+
+    def import_from_java(self, model: BudgetModel, run: Callable = run_here) -> bool:
+        """Import budget data from Java application.
+
+        Pages are fetched and decoded on the calling thread; the model is
+        only touched inside run(fn), which must call fn on the thread
+        owning it.
+        """
+        cursor = self.load_checkpoint().get('import', {}).get('cursor', '')
+        added = 0
+        # Java may hold rows we already have under other ids (e.g. both sides imported a statement)
+        index = run(lambda: DuplicateIndex.for_model(model))
+        matched = set()
+
         try:
-            response = requests.get(f"{self.base_url}/budget/export")
-            if response.status_code == 200:
-                data = response.json()
-                # Merge with existing data
-                for transaction_data in data.get('transactions', []):
-                    # Avoid duplicates based on ID
-                    if not any(t.id == transaction_data['id'] for t in model.transactions):
-                        model.transactions.append(transaction_data)
-                model.save_data()
-                return True
+            while True:
+                response = self.session.get(
+                    f"{self.base_url}/budget/export/chunk",
+                    params={'cursor': cursor, 'limit': self.chunk_size},
+                    headers={'Accept': NDJSON},
+                    timeout=self.timeout,
+                    stream=True,
+                )
+                response.raise_for_status()
+                # Merge with existing data, dropping rows that duplicate local ones
+                fresh, _ = index.split(decode_lines(response.iter_lines()), matched, remember=False)
+                added += run(lambda: model.add_transactions(fresh, save=False))
+                cursor = response.headers.get('X-Next-Cursor', '')
+                if not cursor:
+                    break
         except Exception as e:
-            print(f"Import failed: {e}")
-        return False
+            print(f"Import failed at cursor {cursor!r}: {e}")
+            if added:
+                run(model.save_data)
+            # Only pages already applied (and now saved) are skipped next time
+            self.save_checkpoint('import', {'cursor': cursor})
+            return False
+
+        if added:
+            run(model.save_data)
+        self.save_checkpoint('import', None)
+        return True
+
+    def sync(self, model: BudgetModel) -> bool:
+        """Exchange only what changed since the last successful sync"""
+        return self.push_changes(model) and self.pull_changes(model)
+
+    def push_changes(self, model: BudgetModel) -> bool:
+        """Send local changes newer than the sequence Java last acknowledged"""
+        exported = self.delta_mark('exported_seq')
+        records = model.changes_since(exported)
+
+        if records is None:
+            # Our log was pruned past Java's mark (e.g. a lost checkpoint): send everything
+            through = model.changes.seq
+            if not self.export_to_java(model):
+                return False
+            self.save_delta_mark(exported_seq=through)
+            model.changes.prune(through)
+            return True
+
+        try:
+            self.post_changes(records, exported)
+        except Exception as e:
+            print(f"Pushing changes failed: {e}")
+            return False
+        finally:
+            model.changes.prune(self.delta_mark('exported_seq'))
+        return True
+
+    def post_changes(self, records: List[Dict], since: int) -> int:
+        """POST change records in chunks, persisting each acknowledgement.
+
+        Returns the highest acknowledged sequence; raises on failure, with
+        the mark left at the last acknowledged chunk.
+        """
+        acknowledged = since
+        for chunk in self.chunks(records):
+            response = self.session.post(
+                f"{self.base_url}/budget/changes",
+                data=encode_records(chunk),
+                headers={
+                    'Content-Type': NDJSON,
+                    'Content-Encoding': 'gzip',
+                    'X-Since': str(acknowledged),
+                    'X-Through': str(chunk[-1]['seq']),
+                },
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+            acknowledged = response.json().get('acknowledged', chunk[-1]['seq'])
+            self.save_delta_mark(exported_seq=acknowledged)
+        return acknowledged
+
+    def pull_changes(self, model: BudgetModel) -> bool:
+        """Apply Java's changes newer than the last remote sequence applied here"""
+        imported = self.delta_mark('imported_seq')
+        applied = 0
+
+        try:
+            while True:
+                records, has_more, remote_seq = self.fetch_changes(imported)
+                if records is None:
+                    # Java pruned its log past our mark: fall back to a full import
+                    if not self.import_from_java(model):
+                        return False
+                    imported = remote_seq
+                    return True
+                if records:
+                    applied += model.apply_changes(records, save=False)
+                    imported = records[-1]['seq']
+                if not has_more:
+                    break
+        except Exception as e:
+            print(f"Pulling changes failed after remote seq {imported}: {e}")
+            return False
+        finally:
+            # Save before moving the mark, so it never points past durable data
+            if applied:
+                model.save_data()
+            self.save_delta_mark(imported_seq=imported)
+        return True
+
+    def fetch_changes(self, since: int):
+        """One page of Java's changes newer than since.
+
+        Returns (records, has_more, remote_seq); records is None when Java
+        no longer has changes that old and a full import is needed.
+        """
+        response = self.session.get(
+            f"{self.base_url}/budget/changes",
+            params={'since': since, 'limit': self.chunk_size},
+            headers={'Accept': NDJSON},
+            timeout=self.timeout,
+            stream=True,
+        )
+        if response.status_code == 410:
+            return None, False, int(response.headers.get('X-Change-Seq', 0))
+        response.raise_for_status()
+        records = [json.loads(line) for line in response.iter_lines() if line.strip()]
+        remote_seq = records[-1]['seq'] if records else since
+        return records, response.headers.get('X-Has-More') == 'true', remote_seq
+
+    def delta_mark(self, name: str) -> int:
+        return self.load_checkpoint().get('delta', {}).get(name, 0)
+
+    def save_delta_mark(self, **marks):
+        with self._checkpoint_lock:
+            delta = self.load_checkpoint().get('delta', {})
+            delta.update(marks)
+            self.save_checkpoint('delta', delta)
+
+    def chunks(self, items: Iterable) -> Iterator[List]:
+        iterator = iter(items)
+        while True:
+            chunk = list(islice(iterator, self.chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    @staticmethod
+    def snapshot_id(segments: List[str], rows: Iterable[Transaction]) -> str:
+        """Identifies the ledger contents, so a resumed export sends the same chunks"""
+        digest = hashlib.sha1()
+        # Archived rows never change once written; their segment names stand for them
+        digest.update(",".join(segments).encode('utf-8'))
+        for t in rows:
+            digest.update(f"{t.id}:{t.amount!r}\n".encode('utf-8'))
+        return digest.hexdigest()
+
+    def load_checkpoint(self) -> Dict:
+        """The saved checkpoint, {} if there is none yet.
+
+        Raises CheckpointError if the file is unreadable: starting over
+        from empty marks would resend or skip changes without a word.
+        """
+        with self._checkpoint_lock:
+            try:
+                with open(self.checkpoint_file, 'r') as f:
+                    checkpoint = json.load(f)
+            except FileNotFoundError:
+                return {}
+            except (OSError, ValueError) as e:
+                raise CheckpointError(f"sync checkpoint {self.checkpoint_file} is unreadable: {e}") from e
+        if not isinstance(checkpoint, dict):
+            raise CheckpointError(f"sync checkpoint {self.checkpoint_file} is not a JSON object")
+        return checkpoint
+
+    def save_checkpoint(self, direction: str, state: Optional[Dict]):
+        with self._checkpoint_lock:
+            checkpoint = self.load_checkpoint()
+            if state is None:
+                if direction not in checkpoint:
+                    return
+                checkpoint.pop(direction)
+            else:
+                checkpoint[direction] = state
+            # Written aside and renamed over, so a crash never leaves half a file
+            temp = self.checkpoint_file + '.tmp'
+            try:
+                os.makedirs(os.path.dirname(self.checkpoint_file) or '.', exist_ok=True)
+                with open(temp, 'w') as f:
+                    json.dump(checkpoint, f, indent=2)
+                os.replace(temp, self.checkpoint_file)
+            except Exception as e:
+                print(f"Error saving sync checkpoint: {e}")
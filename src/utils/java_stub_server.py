@@ -0,0 +1,163 @@
+"""Local stand-in for the Java application's budget endpoints.
+
+Speaks the same chunked, gzip-compressed NDJSON protocol as JavaIntegration
+and can inject failures, so exports, imports and resume can be exercised
+without the Java side:
+
+    python -m utils.java_stub_server --port 8080 --fail-every 7
+"""
+import argparse
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import parse_qs, urlparse
+
+
+class JavaStubState:
+    def __init__(self, transactions: List[Dict] = None, fail_every: int = 0):
+        self.lock = threading.Lock()
+        # Rows served by GET /budget/export/chunk
+        self.transactions = list(transactions or [])
+        # Rows received by POST /budget/import/chunk, per export id and chunk
+        self.received: Dict[str, Dict[int, List[Dict]]] = {}
+        # Delta sync: Java's own change log, and the client changes it has applied
+        self.changes: List[Dict] = []
+        self.change_floor = 0
+        self.received_changes: List[Dict] = []
+        self.acknowledged_seq = 0
+        self.fail_every = fail_every
+        self.requests = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def should_fail(self) -> bool:
+        with self.lock:
+            self.requests += 1
+            return bool(self.fail_every) and self.requests % self.fail_every == 0
+
+    def record_change(self, op: str, transaction: Dict) -> int:
+        """Make a change on the 'Java side' for the client to pull"""
+        with self.lock:
+            seq = (self.changes[-1]['seq'] if self.changes else self.change_floor) + 1
+            record = {'seq': seq, 'op': op, 'id': transaction['id']}
+            if op != 'delete':
+                record['transaction'] = transaction
+            self.changes.append(record)
+            return seq
+
+    def imported(self, export_id: str) -> List[Dict]:
+        chunks = self.received.get(export_id, {})
+        return [row for index in sorted(chunks) for row in chunks[index]]
+
+
+class JavaStubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, so pooled sessions are exercised
+    state: JavaStubState = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, status: int, body: bytes, content_type: str, headers: Dict = None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        self.state.bytes_out += len(body)
+
+    def send_json(self, status: int, payload: Dict):
+        self.send_body(status, json.dumps(payload).encode('utf-8'), 'application/json')
+
+    def read_body(self) -> bytes:
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.state.bytes_in += len(body)
+        if self.headers.get('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+        return body
+
+    def do_POST(self):
+        body = self.read_body()
+        if self.state.should_fail():
+            self.send_json(503, {'error': 'injected failure'})
+            return
+        if urlparse(self.path).path.endswith('/budget/import/chunk'):
+            export_id = self.headers.get('X-Export-Id', '')
+            index = int(self.headers.get('X-Chunk-Index', 0))
+            rows = [json.loads(line) for line in body.splitlines() if line.strip()]
+            with self.state.lock:
+                self.state.received.setdefault(export_id, {})[index] = rows
+            self.send_json(200, {'acknowledged': index})
+        elif urlparse(self.path).path.endswith('/budget/changes'):
+            rows = [json.loads(line) for line in body.splitlines() if line.strip()]
+            with self.state.lock:
+                self.state.received_changes.extend(rows)
+                self.state.acknowledged_seq = int(self.headers.get('X-Through', 0))
+            self.send_json(200, {'acknowledged': self.state.acknowledged_seq})
+        else:
+            self.send_json(404, {'error': 'not found'})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if self.state.should_fail():
+            self.send_json(503, {'error': 'injected failure'})
+            return
+        if url.path.endswith('/budget/export/chunk'):
+            query = parse_qs(url.query)
+            start = int((query.get('cursor') or ['0'])[0] or 0)
+            limit = int((query.get('limit') or ['1000'])[0])
+            rows = self.state.transactions[start:start + limit]
+            end = start + len(rows)
+            next_cursor = str(end) if end < len(self.state.transactions) else ''
+            lines = "".join(json.dumps(row) + "\n" for row in rows).encode('utf-8')
+            self.send_body(200, gzip.compress(lines), 'application/x-ndjson',
+                           {'Content-Encoding': 'gzip', 'X-Next-Cursor': next_cursor})
+        elif url.path.endswith('/budget/changes'):
+            query = parse_qs(url.query)
+            since = int((query.get('since') or ['0'])[0])
+            limit = int((query.get('limit') or ['1000'])[0])
+            with self.state.lock:
+                latest = self.state.changes[-1]['seq'] if self.state.changes else self.state.change_floor
+                if since < self.state.change_floor:
+                    self.send_body(410, b'', 'application/x-ndjson', {'X-Change-Seq': str(latest)})
+                    return
+                newer = [r for r in self.state.changes if r['seq'] > since]
+            page = newer[:limit]
+            lines = "".join(json.dumps(row) + "\n" for row in page).encode('utf-8')
+            self.send_body(200, gzip.compress(lines), 'application/x-ndjson',
+                           {'Content-Encoding': 'gzip',
+                            'X-Has-More': 'true' if len(newer) > limit else 'false'})
+        else:
+            self.send_json(404, {'error': 'not found'})
+
+
+def start_stub_server(port: int = 0, state: JavaStubState = None):
+    """Serve on a background thread; returns (server, state, base_url)"""
+    state = state or JavaStubState()
+    handler = type('BoundJavaStubHandler', (JavaStubHandler,), {'state': state})
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='java-stub', daemon=True).start()
+    return server, state, f"http://127.0.0.1:{server.server_address[1]}/api"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--fail-every', type=int, default=0,
+                        help='answer every Nth request with 503')
+    args = parser.parse_args()
+
+    server, _, base_url = start_stub_server(args.port, JavaStubState(fail_every=args.fail_every))
+    print(f"Java stub listening on {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
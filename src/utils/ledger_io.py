@@ -0,0 +1,205 @@
+"""Streaming CSV / NDJSON export and import of the ledger.
+
+Rows are produced and consumed one at a time through generators, so the
+file is never held in memory and the ledger is never copied. Paths ending
+in .gz are transparently gzip-compressed.
+"""
+import csv
+import gzip
+import json
+import math
+import uuid
+from itertools import islice
+from json.encoder import encode_basestring
+from operator import attrgetter
+from typing import Dict, IO, Iterable, Iterator, List, Optional, Sequence
+
+from models.budget import TYPES, BudgetModel, Transaction, check_date, is_date
+from models.categorizer import Categorizer
+
+COLUMNS = ('id', 'amount', 'category', 'description', 'date', 'type')
+FORMATS = ('csv', 'ndjson')
+_s = encode_basestring
+
+
+def detect_format(path: str) -> str:
+    name = path[:-3] if path.endswith('.gz') else path
+    if name.endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    if name.endswith('.csv'):
+        return 'csv'
+    raise ValueError(f"Cannot tell the format of {path!r}; use .csv or .ndjson")
+
+
+def open_text(path: str, mode: str) -> IO[str]:
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8', newline='')
+    return open(path, mode, encoding='utf-8', newline='')
+
+
+def iter_rows(model: BudgetModel, columns: Sequence[str] = COLUMNS,
+              start_date: Optional[str] = None, end_date: Optional[str] = None) -> Iterator[tuple]:
+    """Selected columns of each transaction, archived ones included, filtered by the model.
+
+    Rows come oldest first, except that archived rows all come before the
+    open ones.
+    """
+    unknown = set(columns) - set(COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown column(s): {', '.join(sorted(unknown))}")
+    getter = attrgetter(*columns)
+    transactions = model.iter_all_transactions(start_date, end_date)
+    if len(columns) == 1:
+        return ((value,) for value in map(getter, transactions))
+    return map(getter, transactions)
+
+
+def write_csv(rows: Iterable[tuple], out: IO[str], columns: Sequence[str] = COLUMNS) -> int:
+    writer = csv.writer(out)
+    writer.writerow(columns)
+    count = 0
+    for chunk in _chunks(rows, 8192):
+        writer.writerows(chunk)
+        count += len(chunk)
+    return count
+
+
+def write_ndjson(rows: Iterable[tuple], out: IO[str], columns: Sequence[str] = COLUMNS) -> int:
+    # Formatting lines directly runs ~3x faster than json-encoding a dict per row
+    encoders = [repr if column == 'amount' else encode_basestring for column in columns]
+    keys = [encode_basestring(column) + ':' for column in columns]
+    count = 0
+    for chunk in _chunks(rows, 8192):
+        if tuple(columns) == COLUMNS:
+            out.write("".join(
+                f'{{"id":{_s(a)},"amount":{b!r},"category":{_s(c)},'
+                f'"description":{_s(d)},"date":{_s(e)},"type":{_s(f)}}}\n'
+                for a, b, c, d, e, f in chunk))
+        else:
+            out.write("".join(
+                "{" + ",".join(k + enc(v) for k, enc, v in zip(keys, encoders, row)) + "}\n"
+                for row in chunk))
+        count += len(chunk)
+    return count
+
+
+def export_ledger(model: BudgetModel, path: str, fmt: Optional[str] = None,
+                  columns: Sequence[str] = COLUMNS,
+                  start_date: Optional[str] = None, end_date: Optional[str] = None) -> int:
+    """Write the ledger (or a date range of it) to path; returns the row count"""
+    fmt = fmt or detect_format(path)
+    columns = tuple(columns)
+    rows = iter_rows(model, columns, start_date, end_date)
+    with open_text(path, 'w') as out:
+        if fmt == 'csv':
+            return write_csv(rows, out, columns)
+        if fmt == 'ndjson':
+            return write_ndjson(rows, out, columns)
+    raise ValueError(f"Unsupported format {fmt!r}; expected one of {FORMATS}")
+
+
+def to_transaction(record: Dict) -> Transaction:
+    """Build a Transaction from a possibly partial record, or raise ValueError.
+
+    Only amount and date are required. A missing id gets a fresh uuid, and
+    a missing type is taken from the sign of the amount.
+    """
+    missing = [name for name in ('amount', 'date') if name not in record]
+    if missing:
+        raise ValueError(f"{' and '.join(missing)} missing")
+    value = record['amount']
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError(f"amount must be a number, not {value!r}")
+    amount = float(value)
+    if not math.isfinite(amount):
+        raise ValueError(f"amount must be a number, not {value!r}")
+    kind = record.get('type') or ('expense' if amount < 0 else 'income')
+    if kind not in TYPES:
+        raise ValueError(f"type must be income or expense, not {kind!r}")
+    return Transaction(
+        id=str(record.get('id') or uuid.uuid4()),
+        amount=abs(amount),
+        category=str(record.get('category') or 'Other'),
+        description=str(record.get('description') or ''),
+        date=check_date(record['date']),
+        type=kind,
+    )
+
+
+def _is_clean(id_, amount, category, description, day, kind) -> bool:
+    """True if the fields are what to_transaction would make of them, so they can be used as they are"""
+    return (type(amount) in (int, float) and 0 <= amount < math.inf and kind in TYPES
+            and type(id_) is str and id_ != '' and type(category) is str and category != ''
+            and type(description) is str and type(day) is str and is_date(day))
+
+
+def read_csv(source: IO[str]) -> Iterator[Transaction]:
+    reader = csv.reader(source)
+    header = next(reader, None)
+    if header is None:
+        return
+    header = [h.strip().lower() for h in header]
+    if tuple(header) == COLUMNS:
+        # Fast path for files this module wrote; anything else is checked by to_transaction
+        for values in reader:
+            if len(values) == len(COLUMNS):
+                id_, amount, category, description, day, kind = values
+                try:
+                    amount = float(amount)
+                except ValueError:
+                    pass
+                if _is_clean(id_, amount, category, description, day, kind):
+                    yield Transaction(id_, amount, category, description, day, kind)
+                    continue
+            yield to_transaction(dict(zip(header, values)))
+    else:
+        for values in reader:
+            yield to_transaction(dict(zip(header, values)))
+
+
+def read_ndjson(source: IO[str]) -> Iterator[Transaction]:
+    decode = json.JSONDecoder().decode
+    full = set(COLUMNS)
+    for line in source:
+        if line.strip():
+            record = decode(line)
+            if record.keys() == full and _is_clean(record['id'], record['amount'], record['category'],
+                                                   record['description'], record['date'], record['type']):
+                record['amount'] = float(record['amount'])
+                yield Transaction(**record)
+            else:
+                yield to_transaction(record)
+
+
+def read_ledger(path: str, fmt: Optional[str] = None) -> Iterator[Transaction]:
+    """Lazily parse a CSV or NDJSON file into Transactions"""
+    fmt = fmt or detect_format(path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format {fmt!r}; expected one of {FORMATS}")
+    with open_text(path, 'r') as source:
+        yield from (read_csv(source) if fmt == 'csv' else read_ndjson(source))
+
+
+def import_ledger(model: BudgetModel, path: str, fmt: Optional[str] = None,
+                  batch_size: int = 50000, categorizer: Optional[Categorizer] = None) -> int:
+    """Add the rows of path to the model in bounded batches and save once.
+
+    A categorizer fills in rows that arrive without a category.
+    """
+    added = 0
+    for batch in _chunks(read_ledger(path, fmt), batch_size):
+        if categorizer is not None:
+            categorizer.categorize(batch)
+        added += model.add_transactions(batch, save=False)
+    if added:
+        model.save_data()
+    return added
+
+
+def _chunks(items: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
@@ -0,0 +1,45 @@
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+from models.budget import BudgetModel
+
+
+class LedgerPreloader:
+    """Loads a BudgetModel on a background thread.
+
+    load_data() also builds the id index and running totals, so once
+    is_ready() the model can be handed to the UI without further work.
+    Extra warmers (e.g. controller queries) run on the same thread after.
+    """
+
+    def __init__(self, model: BudgetModel, warmers: Iterable[Callable[[], object]] = ()):
+        self.model = model
+        self.warmers = list(warmers)
+        self.error: Optional[Exception] = None
+        self.load_seconds = 0.0
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="ledger-preload", daemon=True)
+
+    def start(self) -> "LedgerPreloader":
+        self._thread.start()
+        return self
+
+    def _run(self):
+        start = time.perf_counter()
+        try:
+            self.model.load_data()
+            for warm in self.warmers:
+                warm()
+        except Exception as e:
+            self.error = e
+            print(f"Error preloading ledger: {e}")
+        finally:
+            self.load_seconds = time.perf_counter() - start
+            self._done.set()
+
+    def is_ready(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
@@ -0,0 +1,178 @@
+"""tracemalloc-based memory tracking for long sessions.
+
+    BUDGET_MEMTRACE=data/memory_report.txt python src/main.py
+
+With BUDGET_MEMTRACE set, allocations are traced from startup, a snapshot
+is taken every BUDGET_MEMTRACE_INTERVAL seconds (default 300) and a report
+of the growth since the first snapshot is written there at exit, or on
+demand from the Diagnostics tab. Growth is attributed to the innermost
+frame of this app's own code (models, controllers, views, utils), so a
+leak shows up at the call site that keeps allocating rather than inside
+Qt or the standard library.
+
+Live Qt objects can't be seen by tracemalloc; the GUI passes a
+count_objects callable that returns live QObjects by type, and the report
+diffs those counts too.
+"""
+import gc
+import os
+import time
+import tracemalloc
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Top-level source packages, reported as subsystems
+SUBSYSTEMS = ('models', 'controllers', 'views', 'utils', 'benchmarks')
+SOURCE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def subsystem(filename: str) -> Optional[str]:
+    """'models' for .../src/models/budget.py; None for code outside this app"""
+    if not filename.startswith(SOURCE_ROOT):
+        return None
+    relative = os.path.relpath(filename, SOURCE_ROOT).split(os.sep)
+    return relative[0] if len(relative) > 1 and relative[0] in SUBSYSTEMS else 'app'
+
+
+def app_frame(traceback: tracemalloc.Traceback) -> Optional[tracemalloc.Frame]:
+    """Innermost frame that belongs to this app"""
+    # Frames are stored oldest first
+    for frame in reversed(traceback):
+        if subsystem(frame.filename) is not None:
+            return frame
+    return None
+
+
+class Sample:
+    __slots__ = ('taken', 'snapshot', 'objects')
+
+    def __init__(self, snapshot: tracemalloc.Snapshot, objects: Dict[str, int]):
+        self.taken = time.time()
+        self.snapshot = snapshot
+        self.objects = objects
+
+
+class MemoryTracker:
+    """Periodic tracemalloc snapshots and diff reports between them"""
+
+    def __init__(self, frames: int = 10, keep: int = 2,
+                 count_objects: Optional[Callable[[], Dict[str, int]]] = None):
+        self.frames = frames
+        self.keep = keep
+        self.count_objects = count_objects
+        self.baseline: Optional[Sample] = None
+        self.samples: List[Sample] = []
+        self.report_path: Optional[str] = None
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self) -> "MemoryTracker":
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        return self
+
+    def stop(self):
+        tracemalloc.stop()
+        self.baseline = None
+        self.samples.clear()
+
+    def sample(self) -> Sample:
+        """Snapshot now; the first one becomes the baseline everything is diffed against"""
+        # Counted first: walking the Qt tree creates Python wrappers, which belong in this snapshot
+        objects = self.count_objects() if self.count_objects else {}
+        # A full collection also empties the interpreter's free lists, which would read as growth
+        gc.collect()
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+        ))
+        taken = Sample(snapshot, objects)
+        if self.baseline is None:
+            self.baseline = taken
+        else:
+            # The baseline plus the newest few; older snapshots are the bulk of the overhead
+            self.samples = (self.samples + [taken])[-self.keep:]
+        return taken
+
+    def growth(self, since: Optional[Sample] = None, until: Optional[Sample] = None):
+        """(bytes by subsystem, [(size_diff, count_diff, site)] by call site, object count diff)"""
+        since = since or self.baseline
+        until = until or self.sample()
+        by_site: Dict[Tuple[str, int], List[int]] = {}
+        for stat in until.snapshot.compare_to(since.snapshot, 'traceback'):
+            if not stat.size_diff:
+                continue
+            frame = app_frame(stat.traceback)
+            site = (frame.filename, frame.lineno) if frame else ('<outside app code>', 0)
+            totals = by_site.setdefault(site, [0, 0])
+            totals[0] += stat.size_diff
+            totals[1] += stat.count_diff
+        by_subsystem: Counter = Counter()
+        for (filename, _), (size, _) in by_site.items():
+            by_subsystem[subsystem(filename) or 'other'] += size
+        sites = sorted(((size, count, site) for site, (size, count) in by_site.items()),
+                       key=lambda item: -abs(item[0]))
+        objects = Counter(until.objects)
+        objects.subtract(since.objects)
+        return dict(by_subsystem), sites, {name: diff for name, diff in objects.items() if diff}
+
+    def report(self, limit: int = 25) -> str:
+        if self.baseline is None:
+            return "No baseline snapshot; memory tracing is not running.\n"
+        by_subsystem, sites, objects = self.growth()
+        until = self.samples[-1]
+        current, peak = tracemalloc.get_traced_memory()
+        lines = [
+            f"Memory growth over {until.taken - self.baseline.taken:.0f} s "
+            f"(traced now {current / 1024:,.0f} KB, peak {peak / 1024:,.0f} KB)",
+            "",
+            "By subsystem (KB):",
+        ]
+        lines += [f"  {name:<12}{size / 1024:>+12,.1f}"
+                  for name, size in sorted(by_subsystem.items(), key=lambda item: -abs(item[1]))]
+        lines += ["", f"Top {limit} call sites (KB, blocks):"]
+        for size, count, (filename, lineno) in sites[:limit]:
+            where = f"{os.path.relpath(filename, SOURCE_ROOT)}:{lineno}" if lineno else filename
+            lines.append(f"  {size / 1024:>+10,.1f} {count:>+8,}  {where}")
+        lines += ["", "Live Qt objects by type:"]
+        if objects:
+            lines += [f"  {name:<28}{diff:>+8,}  (now {until.objects.get(name, 0):,})"
+                      for name, diff in sorted(objects.items(), key=lambda item: -abs(item[1]))]
+        elif until.objects:
+            lines.append(f"  unchanged ({sum(until.objects.values()):,} live)")
+        else:
+            lines.append("  not counted")
+        return "\n".join(lines) + "\n"
+
+    def write_report(self, path: Optional[str] = None) -> Optional[str]:
+        path = path or self.report_path
+        if not path:
+            return None
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with open(path, 'w') as f:
+                f.write(self.report())
+            return path
+        except Exception as e:
+            print(f"Error writing memory report: {e}")
+            return None
+
+    def configure_from_env(self) -> bool:
+        """Start tracing if BUDGET_MEMTRACE names a report file; the caller schedules sample()"""
+        path = os.environ.get('BUDGET_MEMTRACE')
+        if not path:
+            return False
+        self.report_path = path
+        self.start()
+        return True
+
+    @staticmethod
+    def interval_from_env() -> float:
+        return float(os.environ.get('BUDGET_MEMTRACE_INTERVAL', 300))
+
+
+# The process-wide tracker
+memory_tracker = MemoryTracker()
@@ -0,0 +1,189 @@
+"""Opt-in timing spans, counters and histograms for the hot paths.
+
+Off by default. When off, @timed functions pay one flag check and span()
+hands back a shared no-op, so instrumented code can stay in place.
+
+    BUDGET_METRICS=data/metrics.jsonl python src/main.py     # JSON lines
+    BUDGET_METRICS=data/metrics.prom python src/main.py      # Prometheus text
+
+With BUDGET_METRICS set, a snapshot is written every BUDGET_METRICS_INTERVAL
+seconds (default 60) and at exit; JSON lines are appended, a .prom file is
+rewritten. Span durations are in seconds.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+from functools import wraps
+from typing import Dict, Optional
+
+
+class Histogram:
+    """Count and sum of every value, plus the most recent ones for quantiles"""
+
+    def __init__(self, window: int = 2048):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, value: float):
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+        self.recent.append(value)
+
+    def quantile(self, q: float) -> float:
+        values = sorted(self.recent)
+        return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+    def summary(self) -> Dict[str, float]:
+        return {'count': self.count, 'sum': self.total, 'max': self.max,
+                'last': self.recent[-1] if self.recent else 0.0,
+                'p50': self.quantile(0.5), 'p95': self.quantile(0.95), 'p99': self.quantile(0.99)}
+
+
+class _NoSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+class _Span:
+    __slots__ = ('metrics', 'name', 'start')
+
+    def __init__(self, metrics: "Metrics", name: str):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.observe(self.name, time.perf_counter() - self.start)
+        if exc_type is not None:
+            self.metrics.incr(self.name + '.errors')
+        return False
+
+
+class Metrics:
+    def __init__(self):
+        self.enabled = False
+        self.counters: Dict[str, float] = {}
+        self.histograms: Dict[str, Histogram] = {}
+        self.lock = threading.Lock()
+        self.export_path: Optional[str] = None
+        self._exporter: Optional[threading.Thread] = None
+
+    def enable(self, enabled: bool = True):
+        self.enabled = enabled
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def incr(self, name: str, value: float = 1):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float):
+        if not self.enabled:
+            return
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(value)
+
+    def span(self, name: str):
+        """`with metrics.span('x'):` records the block's duration under x"""
+        return _Span(self, name) if self.enabled else _NO_SPAN
+
+    def timed(self, name: str):
+        """Decorator recording each call's duration under name"""
+        def decorate(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with _Span(self, name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            return {
+                'timestamp': time.time(),
+                'counters': dict(self.counters),
+                'histograms': {name: h.summary() for name, h in self.histograms.items()},
+            }
+
+    def export(self, path: Optional[str] = None):
+        """Append a JSON line to path, or rewrite it as Prometheus text if it ends in .prom"""
+        path = path or self.export_path
+        if not path:
+            return
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            snapshot = self.snapshot()
+            if path.endswith('.prom'):
+                with open(path, 'w') as f:
+                    f.write(prometheus_text(snapshot))
+            else:
+                with open(path, 'a') as f:
+                    f.write(json.dumps(snapshot) + '\n')
+        except Exception as e:
+            print(f"Error exporting metrics: {e}")
+
+    def configure_from_env(self):
+        """Enable and export periodically if BUDGET_METRICS names a file"""
+        path = os.environ.get('BUDGET_METRICS')
+        if not path or self.export_path:
+            return
+        self.export_path = path
+        self.enable()
+        interval = float(os.environ.get('BUDGET_METRICS_INTERVAL', 60))
+        self._exporter = threading.Thread(target=self._export_loop, args=(interval,),
+                                          name='metrics-export', daemon=True)
+        self._exporter.start()
+        atexit.register(self.export)
+
+    def _export_loop(self, interval: float):
+        while True:
+            time.sleep(interval)
+            self.export()
+
+
+def _prometheus_name(name: str) -> str:
+    return 'budget_' + ''.join(c if c.isalnum() else '_' for c in name)
+
+
+def prometheus_text(snapshot: Dict) -> str:
+    lines = []
+    for name, value in sorted(snapshot['counters'].items()):
+        metric = _prometheus_name(name) + '_total'
+        lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+    for name, summary in sorted(snapshot['histograms'].items()):
+        metric = _prometheus_name(name)
+        lines.append(f"# TYPE {metric} summary")
+        for q in ('p50', 'p95', 'p99'):
+            lines.append(f'{metric}{{quantile="0.{q[1:]}"}} {summary[q]}')
+        lines += [f"{metric}_sum {summary['sum']}", f"{metric}_count {summary['count']}"]
+    return "\n".join(lines) + "\n"
+
+
+# The process-wide registry
+metrics = Metrics()
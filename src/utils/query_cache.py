@@ -0,0 +1,112 @@
+"""Memoized controller reads, valid for one data_version of the ledger.
+
+BudgetController's summaries are pure functions of the ledger, and the
+model bumps data_version on every change, so a result computed at one
+version can be handed out again until the next change. @memoized keys
+each call on (method, args) and stamps it with the version it was
+computed at; the first call after a change finds a newer version, drops
+every entry and recomputes.
+
+The cache is a bounded LRU that evicts by estimated size as well as by
+count, so a few balance histories of a large ledger can't crowd out
+memory. Cached results are shared between callers and must not be
+modified.
+"""
+import functools
+import sys
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+
+def estimate_size(value, sample: int = 8) -> int:
+    """Approximate deep size in bytes; containers are extrapolated from their first few items"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        if value:
+            items = list(value.items())[:sample]
+            size += sum(estimate_size(k, sample) + estimate_size(v, sample) for k, v in items) \
+                * len(value) // len(items)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        if value:
+            items = list(value)[:sample] if not isinstance(value, (list, tuple)) else value[:sample]
+            size += sum(estimate_size(item, sample) for item in items) * len(value) // len(items)
+    elif hasattr(value, '__dict__'):
+        size += sum(sys.getsizeof(v) for v in vars(value).values())
+    return size
+
+
+class QueryCache:
+    def __init__(self, max_bytes: int = 32 << 20, max_entries: int = 256):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.version: Optional[int] = None  # data_version every entry was computed at
+        self.entries: "OrderedDict[Hashable, Tuple[int, object]]" = OrderedDict()  # key -> (bytes, value)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, version: int) -> Tuple[bool, object]:
+        """(True, value) if key was computed at this version, else (False, None)"""
+        with self._lock:
+            if version == self.version:
+                entry = self.entries.get(key)
+                if entry is not None:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return True, entry[1]
+            self.misses += 1
+            return False, None
+
+    def put(self, key: Hashable, version: int, value):
+        size = estimate_size(value)
+        with self._lock:
+            if self.version is not None and version < self.version:
+                # Computed before a change another caller has already seen
+                return
+            if version != self.version:
+                self._drop()
+                self.version = version
+            if size > self.max_bytes:
+                return
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[0]
+            self.entries[key] = (size, value)
+            self.bytes += size
+            while len(self.entries) > self.max_entries or self.bytes > self.max_bytes:
+                evicted, _ = self.entries.popitem(last=False)[1]
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def _drop(self):
+        self.entries.clear()
+        self.bytes = 0
+
+    def clear(self):
+        with self._lock:
+            self._drop()
+            self.version = None
+
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.entries),
+                'bytes': self.bytes, 'evictions': self.evictions}
+
+
+def memoized(fn: Callable) -> Callable:
+    """Cache a read method of an object with .cache (a QueryCache) and .model (with data_version)"""
+    name = fn.__qualname__
+
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        key = (name, args, tuple(sorted(kwargs.items()))) if kwargs else (name, args)
+        version = self.model.data_version
+        found, value = self.cache.get(key, version)
+        if found:
+            return value
+        value = fn(self, *args, **kwargs)
+        self.cache.put(key, version, value)
+        return value
+    return wrapper
@@ -0,0 +1,279 @@
+"""Bank statement importer for CSV exports and OFX/QFX files.
+
+Each file is parsed in its own worker process into plain tuples, which
+are turned into Transactions and handed to the model in one bulk insert.
+Ids are derived from the statement contents (the OFX FITID where there is
+one), so importing the same statement twice adds nothing the second time;
+overlapping statements from different sources are caught by utils.dedupe.
+"""
+import csv
+import hashlib
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from models.budget import BudgetModel, Transaction
+from models.categorizer import Categorizer
+from utils.dedupe import DuplicateIndex
+from utils.metrics import metrics
+
+# (id, amount, category, description, date, type) - cheap to pickle back from workers
+Row = Tuple[str, float, str, str, str, str]
+
+DEFAULT_CATEGORY = 'Other'
+
+DATE_FORMATS = ('%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%d.%m.%Y', '%Y/%m/%d',
+                '%m/%d/%y', '%d/%m/%y', '%d-%m-%Y', '%Y%m%d', '%d %b %Y', '%b %d, %Y')
+
+# Header names seen in common bank CSV exports, lower-cased
+DATE_COLUMNS = ('date', 'transaction date', 'posted date', 'posting date', 'booking date',
+                'value date', 'trans. date', 'txn date')
+AMOUNT_COLUMNS = ('amount', 'transaction amount', 'amount (eur)', 'amount (usd)', 'value')
+DEBIT_COLUMNS = ('debit', 'withdrawal', 'withdrawals', 'money out', 'paid out', 'debit amount')
+CREDIT_COLUMNS = ('credit', 'deposit', 'deposits', 'money in', 'paid in', 'credit amount')
+DESCRIPTION_COLUMNS = ('description', 'memo', 'payee', 'details', 'narrative', 'name',
+                       'merchant', 'reference', 'transaction description')
+CATEGORY_COLUMNS = ('category',)
+
+_OFX_TRANSACTION = re.compile(r'<STMTTRN>(.*?)(?:</STMTTRN>|(?=<STMTTRN>)|(?=</BANKTRANLIST>))',
+                              re.IGNORECASE | re.DOTALL)
+_OFX_FIELD = re.compile(r'<(TRNTYPE|DTPOSTED|TRNAMT|FITID|NAME|MEMO|PAYEE)>([^<\r\n]*)', re.IGNORECASE)
+_OFX_ACCOUNT = re.compile(r'<ACCTID>([^<\r\n]*)', re.IGNORECASE)
+
+
+@dataclass
+class ImportResult:
+    files: int = 0
+    parsed: int = 0
+    added: int = 0
+    duplicates: int = 0
+    errors: Dict[str, str] = field(default_factory=dict)
+
+
+@lru_cache(maxsize=8192)
+def parse_date(value: str, formats: Tuple[str, ...] = DATE_FORMATS) -> str:
+    """Normalise a statement date to ISO; cached, as statements repeat dates a lot"""
+    value = value.strip()
+    for fmt in formats:
+        try:
+            return datetime.strptime(value, fmt).isoformat()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognised date {value!r}")
+
+
+def parse_amount(value: str) -> float:
+    """Parse '1,234.56', '1.234,56', '(12.00)', '-$5', '12.00 CR' and the like"""
+    text = value.strip()
+    if not text:
+        return 0.0
+    negative = text.startswith('(') and text.endswith(')') or text.startswith('-') or text.endswith('-')
+    if text.upper().endswith(' DR'):
+        negative = True
+    text = re.sub(r'[^0-9.,]', '', text)
+    if ',' in text and '.' in text:
+        # Whichever separator comes last is the decimal point
+        if text.rfind(',') > text.rfind('.'):
+            text = text.replace('.', '').replace(',', '.')
+        else:
+            text = text.replace(',', '')
+    elif ',' in text:
+        head, _, tail = text.rpartition(',')
+        text = head.replace(',', '') + ('.' if len(tail) != 3 else '') + tail
+    amount = float(text or 0)
+    return -amount if negative else amount
+
+
+def make_id(source: str, *parts) -> str:
+    digest = hashlib.sha1("\x1f".join([source, *map(str, parts)]).encode('utf-8')).hexdigest()
+    return f"{digest[:8]}-{digest[8:12]}-{digest[12:16]}-{digest[16:20]}-{digest[20:32]}"
+
+
+def _row(source: str, index: int, amount: float, description: str, date: str,
+         category: str = DEFAULT_CATEGORY, external_id: Optional[str] = None) -> Row:
+    kind = 'expense' if amount < 0 else 'income'
+    tid = make_id(source, external_id) if external_id else make_id(source, date, amount, description, index)
+    return (tid, abs(amount), category or DEFAULT_CATEGORY, description.strip(), date, kind)
+
+
+def _pick(header: List[str], names: Sequence[str]) -> Optional[int]:
+    for name in names:
+        if name in header:
+            return header.index(name)
+    return None
+
+
+def parse_csv_statement(text: str, source: str) -> List[Row]:
+    sample = text[:4096]
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=',;\t|')
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.reader(text.splitlines(), dialect)
+
+    # Some banks put account details above the header; find the first row naming a date column
+    header = None
+    for values in reader:
+        lowered = [v.strip().lower() for v in values]
+        if _pick(lowered, DATE_COLUMNS) is not None:
+            header = lowered
+            break
+    if header is None:
+        raise ValueError("no header row with a date column")
+
+    date_col = _pick(header, DATE_COLUMNS)
+    amount_col = _pick(header, AMOUNT_COLUMNS)
+    debit_col = _pick(header, DEBIT_COLUMNS)
+    credit_col = _pick(header, CREDIT_COLUMNS)
+    description_col = _pick(header, DESCRIPTION_COLUMNS)
+    category_col = _pick(header, CATEGORY_COLUMNS)
+    if amount_col is None and debit_col is None and credit_col is None:
+        raise ValueError("no amount, debit or credit column")
+
+    # Row numbers count skipped rows too; they are part of the ids
+    records = [(index, values) for index, values in enumerate(reader)
+               if len(values) > date_col and values[date_col].strip()]
+    formats = (_date_format(values[date_col] for _, values in records),) if records else DATE_FORMATS
+    rows = []
+    for index, values in records:
+        if amount_col is not None:
+            amount = parse_amount(values[amount_col])
+        else:
+            debit = parse_amount(values[debit_col]) if debit_col is not None and debit_col < len(values) else 0.0
+            credit = parse_amount(values[credit_col]) if credit_col is not None and credit_col < len(values) else 0.0
+            amount = credit - abs(debit)
+        try:
+            date = parse_date(values[date_col], formats)
+        except ValueError:
+            raise ValueError(f"dates mix formats: {values[date_col].strip()!r} "
+                             f"doesn't fit the format of other rows") from None
+        description = values[description_col] if description_col is not None and description_col < len(values) else ''
+        category = values[category_col] if category_col is not None and category_col < len(values) else DEFAULT_CATEGORY
+        rows.append(_row(source, index, amount, description, date, category))
+    return rows
+
+
+def _date_format(dates: Iterable[str]) -> str:
+    """The format for a file's dates, the earliest in DATE_FORMATS that all of them could fit.
+
+    Decided over the whole file, so 03/02/2024 isn't read as March when a
+    later 15/02/2024 shows the file is day-first. Dates are only checked
+    until one format is left; parsing the rows with it checks the rest,
+    and a file no single format fits is refused there.
+    """
+    formats = DATE_FORMATS
+    for text in dict.fromkeys(dates):
+        fitting = tuple(fmt for fmt in formats if _matches(text, fmt))
+        if not fitting:
+            if formats is DATE_FORMATS:
+                raise ValueError(f"Unrecognised date {text.strip()!r}")
+            raise ValueError(f"dates mix formats: {text.strip()!r} doesn't fit the format of other rows")
+        formats = fitting
+        if len(formats) == 1:
+            break
+    return formats[0]
+
+
+def _matches(value: str, fmt: str) -> bool:
+    try:
+        datetime.strptime(value.strip(), fmt)
+        return True
+    except ValueError:
+        return False
+
+
+def parse_ofx_statement(text: str, source: str) -> List[Row]:
+    """OFX 1.x (SGML) and 2.x (XML) bank and card statements; QFX is the same format"""
+    account = _OFX_ACCOUNT.search(text)
+    source = account.group(1).strip() if account else source
+    rows = []
+    for index, match in enumerate(_OFX_TRANSACTION.finditer(text)):
+        fields = {name.upper(): value.strip() for name, value in _OFX_FIELD.findall(match.group(1))}
+        if 'DTPOSTED' not in fields or 'TRNAMT' not in fields:
+            continue
+        date = parse_date(fields['DTPOSTED'][:8], ('%Y%m%d',))
+        description = fields.get('NAME') or fields.get('PAYEE') or ''
+        if fields.get('MEMO') and fields['MEMO'] != description:
+            description = f"{description} {fields['MEMO']}".strip()
+        rows.append(_row(source, index, parse_amount(fields['TRNAMT']), description, date,
+                         external_id=fields.get('FITID')))
+    return rows
+
+
+def parse_statement(path: str) -> Tuple[str, List[Row], Optional[str]]:
+    """Worker entry point: (path, rows, error message)"""
+    try:
+        with open(path, 'r', encoding='utf-8-sig', errors='replace') as f:
+            text = f.read()
+        source = os.path.basename(path)
+        extension = os.path.splitext(path)[1].lower()
+        if extension in ('.ofx', '.qfx') or '<OFX>' in text[:4096].upper():
+            return path, parse_ofx_statement(text, source), None
+        return path, parse_csv_statement(text, source), None
+    except Exception as e:
+        return path, [], str(e)
+
+
+def parse_statements(paths: Sequence[str],
+                     max_workers: Optional[int] = None) -> Tuple[Dict[str, List[Row]], Dict[str, str]]:
+    """Parse many files, in parallel processes when there is more than one.
+
+    Returns the rows of each file, in the order given, and the errors by path.
+    """
+    rows: Dict[str, List[Row]] = {}
+    errors: Dict[str, str] = {}
+    if len(paths) <= 1 or max_workers == 1:
+        results = map(parse_statement, paths)
+        for path, parsed, error in results:
+            rows[path] = parsed
+            if error:
+                errors[path] = error
+        return rows, errors
+
+    workers = min(len(paths), max_workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for path, parsed, error in pool.map(parse_statement, paths):
+            rows[path] = parsed
+            if error:
+                errors[path] = error
+    return rows, errors
+
+
+@metrics.timed('import.statements')
+def import_statements(model: BudgetModel, paths: Sequence[str],
+                      max_workers: Optional[int] = None, dedupe: bool = True,
+                      categorizer: Optional[Categorizer] = None) -> ImportResult:
+    """Parse statement files and add them to the model with one bulk insert.
+
+    With dedupe, rows matching one already in the ledger, or in an earlier
+    file of the same import, are dropped (see utils.dedupe). A categorizer
+    fills in categories the statements did not provide.
+    """
+    rows, errors = parse_statements(paths, max_workers)
+    index = None
+    if dedupe:
+        # Old statements can overlap closed periods: index the archived rows they could match,
+        # from the earliest parsed date less the index's default two-day window
+        first = min((row[4] for parsed in rows.values() for row in parsed), default=None)
+        since = (datetime.strptime(first[:10], '%Y-%m-%d') - timedelta(days=2)).strftime('%Y-%m-%d') \
+            if first else '9999'
+        index = DuplicateIndex.for_model(model, archived_since=since)
+    transactions: List[Transaction] = []
+    parsed = duplicates = 0
+    for path in paths:
+        batch = [Transaction(*row) for row in rows.get(path, ())]
+        parsed += len(batch)
+        if index is not None:
+            batch, dropped = index.split(batch)
+            duplicates += len(dropped)
+        transactions.extend(batch)
+    if categorizer is not None:
+        categorizer.categorize(transactions)
+    added = model.add_transactions(transactions)
+    metrics.incr('import.duplicates', duplicates)
+    return ImportResult(files=len(paths), parsed=parsed, added=added,
+                        duplicates=duplicates, errors=errors)
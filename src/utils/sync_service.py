@@ -0,0 +1,245 @@
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Callable, Dict, List, Optional, Tuple
+
+from models.budget import BudgetModel
+from utils.java_integration import JavaIntegration
+
+
+_inline_lock = threading.RLock()
+
+
+def run_inline(fn) -> Future:
+    """Default dispatcher: runs fn right away on the calling thread (headless use).
+
+    Calls come from the sync thread and its executor, so they take turns.
+    """
+    future = Future()
+    try:
+        with _inline_lock:
+            future.set_result(fn())
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+class SyncService:
+    """Background delta sync with the Java application.
+
+    Runs its own asyncio loop on a daemon thread. Local changes reach it
+    through the model's change-log listener, are queued with a snapshot of
+    the row, and are pushed in batches of up to batch_size, or whatever
+    arrived within batch_window seconds of the first queued change. Java's
+    changes are polled every poll_interval seconds (or on sync_now()) and
+    applied with BudgetModel.apply_changes, the bulk path.
+
+    Everything that touches the model goes through `dispatch`, which must
+    run the call on the thread owning the model and return a Future; the
+    GUI passes views.sync_status.QtDispatcher. Failed transfers are retried
+    forever with exponential backoff and full jitter; unsent changes stay
+    in the persisted change log either way. The integration should be
+    built with max_retries=0 so retries are not stacked. An unreadable
+    checkpoint is retried the same way, with the error in the status,
+    until the file is fixed or removed.
+    """
+
+    def __init__(self, model: BudgetModel, integration: JavaIntegration,
+                 batch_size: int = 500,
+                 batch_window: float = 1.0,
+                 poll_interval: float = 30.0,
+                 base_delay: float = 0.5,
+                 max_delay: float = 60.0,
+                 dispatch: Callable[[Callable], Future] = run_inline,
+                 on_status: Optional[Callable[[str, str], None]] = None):
+        self.model = model
+        self.integration = integration
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.poll_interval = poll_interval
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.dispatch = dispatch
+        self.on_status = on_status
+
+        self.counters = {'pushed': 0, 'pulled': 0, 'batches': 0, 'retries': 0}
+        self.latencies = deque(maxlen=2000)  # seconds from local change to acknowledgement
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ready = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "SyncService":
+        self._thread = threading.Thread(target=lambda: asyncio.run(self._main()),
+                                        name="java-sync", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        self.model.changes.listeners.append(self._on_change)
+        return self
+
+    def stop(self, timeout: float = 5.0):
+        self._stopped.set()
+        if self._on_change in self.model.changes.listeners:
+            self.model.changes.listeners.remove(self._on_change)
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._stopping.set)
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def sync_now(self):
+        """Poll Java right away instead of waiting for the next interval"""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._poll_now.set)
+
+    def pending(self) -> int:
+        return self._queue.qsize() if self._loop is not None else 0
+
+    def stats(self) -> Dict:
+        latencies = sorted(self.latencies)
+
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] if latencies else 0.0
+
+        return dict(self.counters, pending=self.pending(),
+                    latency_p50=percentile(0.5), latency_p95=percentile(0.95))
+
+    def _status(self, state: str, detail: str = ""):
+        if self.on_status is not None:
+            self.on_status(state, detail)
+
+    def _on_change(self, seq: int, op: str, transaction_id: str):
+        """Change-log listener; runs on the model's thread right after the mutation"""
+        record = {'seq': seq, 'op': op, 'id': transaction_id}
+        if op != 'delete':
+            record['transaction'] = self.model.get_transaction(transaction_id).to_dict()
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, (time.perf_counter(), record))
+
+    async def _main(self):
+        self._loop = asyncio.get_running_loop()
+        self._queue: "asyncio.Queue[Tuple[float, Dict]]" = asyncio.Queue()
+        self._stopping = asyncio.Event()
+        self._poll_now = asyncio.Event()
+        self._ready.set()
+
+        tasks = [asyncio.create_task(self._push_loop()), asyncio.create_task(self._pull_loop())]
+        await self._stopping.wait()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._status('stopped')
+
+    async def _on_owner(self, fn):
+        return await asyncio.wrap_future(self.dispatch(fn))
+
+    def _call_owner(self, fn):
+        """Blocking _on_owner for executor threads; gives up once the service is stopping"""
+        future = self.dispatch(fn)
+        while True:
+            try:
+                return future.result(timeout=0.5)
+            except FutureTimeout:
+                if self._stopped.is_set():
+                    raise RuntimeError("sync service stopped")
+
+    async def _retry(self, what: str, fn):
+        """Run blocking fn in the executor until it succeeds"""
+        attempt = 0
+        while True:
+            try:
+                return await self._loop.run_in_executor(None, fn)
+            except Exception as e:
+                attempt += 1
+                self.counters['retries'] += 1
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                self._status('retrying', f"{what} failed ({e}); retry {attempt} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def _push_loop(self):
+        # Changes logged while the service wasn't running
+        exported = await self._retry('checkpoint', lambda: self.integration.delta_mark('exported_seq'))
+        backlog = await self._on_owner(lambda: self.model.changes_since(exported))
+        if backlog is None:
+            await self._retry('export', self._full_export)
+        else:
+            now = time.perf_counter()
+            for record in backlog:
+                self._queue.put_nowait((now, record))
+
+        while True:
+            batch = [await self._queue.get()]
+            deadline = self._loop.time() + self.batch_window
+            while len(batch) < self.batch_size:
+                remaining = deadline - self._loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            await self._push_batch(batch)
+
+    def _full_export(self):
+        """Runs in the executor; the model is only read on its owner, to copy the rows"""
+        through = self._call_owner(lambda: self.model.changes.seq)
+        if not self.integration.export_to_java(self.model, run=self._call_owner):
+            raise RuntimeError("full export failed")
+        self.integration.save_delta_mark(exported_seq=through)
+
+    async def _push_batch(self, batch: List[Tuple[float, Dict]]):
+        since = await self._retry('checkpoint', lambda: self.integration.delta_mark('exported_seq'))
+        # The backlog and the listener can both deliver a change; send it once
+        fresh = {}
+        for queued, record in batch:
+            if record['seq'] > since:
+                fresh.setdefault(record['seq'], (queued, record))
+        batch = list(fresh.values())
+        if not batch:
+            return
+        self._status('syncing', f"pushing {len(batch)} change(s)")
+        records = [record for _, record in batch]
+        acknowledged = await self._retry('push', lambda: self.integration.post_changes(records, since))
+        await self._on_owner(lambda: self.model.changes.prune(acknowledged))
+
+        done = time.perf_counter()
+        self.latencies.extend(done - queued for queued, _ in batch)
+        self.counters['pushed'] += len(batch)
+        self.counters['batches'] += 1
+        self._status('idle', f"pushed {len(batch)} change(s)")
+
+    async def _pull_loop(self):
+        while True:
+            await self._pull()
+            try:
+                await asyncio.wait_for(self._poll_now.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._poll_now.clear()
+
+    async def _pull(self):
+        since = await self._retry('checkpoint', lambda: self.integration.delta_mark('imported_seq'))
+        while True:
+            records, has_more, remote_seq = await self._retry(
+                'pull', lambda since=since: self.integration.fetch_changes(since))
+            if records is None:
+                # Java's log no longer reaches our mark: pages are fetched in the executor,
+                # and only adding and saving them runs on the owner
+                self._status('syncing', "full import")
+                if not await self._loop.run_in_executor(
+                        None, lambda: self.integration.import_from_java(self.model, run=self._call_owner)):
+                    self._status('retrying', "full import failed")
+                    return
+                await self._retry('checkpoint',
+                                  lambda: self.integration.save_delta_mark(imported_seq=remote_seq))
+                return
+            if records:
+                applied = await self._on_owner(lambda: self.model.apply_changes(records))
+                since = records[-1]['seq']
+                await self._retry('checkpoint',
+                                  lambda since=since: self.integration.save_delta_mark(imported_seq=since))
+                self.counters['pulled'] += applied
+                self._status('idle', f"applied {applied} change(s) from Java")
+            if not has_more:
+                return
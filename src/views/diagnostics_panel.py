@@ -0,0 +1,192 @@
+from collections import Counter, deque
+from html import escape
+from typing import Dict
+
+from PyQt6.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, QGridLayout,
+                            QLabel, QGroupBox, QPushButton)
+from PyQt6.QtCore import Qt, QTimer, QElapsedTimer, QObject
+
+from controllers.budget_controller import BudgetController
+from views.styles.styles import HyprlandStyles
+from utils import diagnostics
+from utils.memory_profile import memory_tracker
+from utils.metrics import metrics
+
+# refresh_data phases, in the order they run, and the span each one is recorded under
+REFRESH_PHASES = (
+    ("Whole refresh", 'view.refresh_data'),
+    ("Balance label", 'view.balance_label'),
+    ("Transactions table", 'view.transactions_table'),
+    ("\u00a0\u00a0table reload", 'view.transactions_table.reset'),
+    ("Analytics", 'view.refresh_analytics'),
+    ("\u00a0\u00a0summary table", 'view.summary_table'),
+    ("\u00a0\u00a0bar chart", 'view.income_expense_chart'),
+    ("\u00a0\u00a0line chart", 'view.balance_chart'),
+    ("Trends", 'view.period_analytics'),
+    ("Forecast", 'view.forecast'),
+)
+
+HEARTBEAT_MS = 50
+
+
+def format_bytes(size: float) -> str:
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:,.0f} {unit}"
+        size /= 1024
+    return f"{size:,.1f} GB"
+
+
+def count_qobjects() -> Dict[str, int]:
+    """Live QObjects by class name, across every top-level widget"""
+    counts = Counter()
+    for widget in QApplication.topLevelWidgets():
+        counts[type(widget).__name__] += 1
+        counts.update(type(child).__name__ for child in widget.findChildren(QObject))
+    return dict(counts)
+
+
+def html_table(rows) -> str:
+    cells = "".join(
+        "<tr>" + "".join(f"<td style='padding: 1px 12px 1px 0'>{escape(str(cell))}</td>" for cell in row) + "</tr>"
+        for row in rows)
+    return f"<table>{cells}</table>"
+
+
+class DiagnosticsPanel(QWidget):
+    """Live view of where the app spends time and memory on the loaded ledger.
+
+    Opening it turns metrics on, so refresh phases are recorded from then on.
+    Its timers only run while it is visible.
+    """
+
+    def __init__(self, controller: BudgetController):
+        super().__init__()
+        self.controller = controller
+        self.lag = deque(maxlen=200)  # event-loop delay past each heartbeat, ms
+        self.clock = QElapsedTimer()
+        self.heartbeat = QTimer(self)
+        self.heartbeat.setInterval(HEARTBEAT_MS)
+        self.heartbeat.timeout.connect(self.beat)
+        self.update_timer = QTimer(self)
+        self.update_timer.setInterval(1000)
+        self.update_timer.timeout.connect(self.update_view)
+        self.setup_ui()
+        self.apply_styles()
+
+    def setup_ui(self):
+        """Setup the diagnostics UI"""
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(24, 24, 24, 24)
+        layout.setSpacing(16)
+
+        title = QLabel("Diagnostics")
+        title.setStyleSheet(HyprlandStyles.get_label_style(heading=True, size="xl"))
+        layout.addWidget(title)
+
+        grid = QGridLayout()
+        grid.setSpacing(16)
+        self.sections = {}
+        for index, name in enumerate(("Ledger & memory", "Refresh phases (ms)",
+                                      "Cache hit rates", "Pending writes & event loop")):
+            group = QGroupBox(name)
+            group_layout = QVBoxLayout(group)
+            label = QLabel()
+            label.setTextFormat(Qt.TextFormat.RichText)
+            label.setAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft)
+            label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+            label.setStyleSheet(HyprlandStyles.get_label_style(size="medium"))
+            group_layout.addWidget(label)
+            grid.addWidget(group, index // 2, index % 2)
+            self.sections[name] = label
+        layout.addLayout(grid)
+
+        actions = QHBoxLayout()
+        self.memory_btn = QPushButton()
+        self.memory_btn.setStyleSheet(HyprlandStyles.get_button_style(primary=False, size="small"))
+        self.memory_btn.clicked.connect(self.memory_action)
+        actions.addWidget(self.memory_btn)
+        self.memory_status = QLabel()
+        self.memory_status.setStyleSheet(HyprlandStyles.get_label_style(size="small"))
+        actions.addWidget(self.memory_status, 1)
+        layout.addLayout(actions)
+        self.update_memory_button()
+        layout.addStretch()
+
+    def apply_styles(self):
+        self.setStyleSheet(f"""
+            QWidget {{
+                background-color: {HyprlandStyles.BACKGROUND_CARD};
+            }}
+        """)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        metrics.enable()
+        self.lag.clear()
+        self.clock.start()
+        self.heartbeat.start()
+        self.update_timer.start()
+        self.update_view()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.heartbeat.stop()
+        self.update_timer.stop()
+
+    def beat(self):
+        elapsed = self.clock.restart()
+        self.lag.append(max(0, elapsed - HEARTBEAT_MS))
+
+    def update_memory_button(self):
+        self.memory_btn.setText("Write Memory Report" if memory_tracker.tracing else "Start Memory Tracing")
+
+    def memory_action(self):
+        """Start tracing (taking the baseline), or write the growth since then"""
+        if memory_tracker.count_objects is None:
+            memory_tracker.count_objects = count_qobjects
+        if not memory_tracker.tracing:
+            memory_tracker.start().sample()
+            self.memory_status.setText("Tracing allocations from now on.")
+        else:
+            path = memory_tracker.write_report(memory_tracker.report_path or "data/memory_report.txt")
+            if path:
+                self.memory_status.setText(f"Report written to {path}")
+        self.update_memory_button()
+
+    def update_view(self):
+        snapshot = diagnostics.collect(self.controller.model, self.controller.categorizer, self.controller.cache)
+
+        ledger = snapshot['ledger']
+        rows = [("Transactions", f"{ledger['transactions']:,}"),
+                ("Data version", ledger['data version']),
+                ("Ledger file", format_bytes(ledger['file bytes']))]
+        rows += [(name.capitalize(), format_bytes(size)) for name, size in snapshot['memory'].items()]
+        self.sections["Ledger & memory"].setText(html_table(rows))
+
+        timings = snapshot['timings']
+        rows = [("", "last", "p95", "calls")]
+        for label, name in REFRESH_PHASES:
+            timing = timings.get(name)
+            if timing:
+                rows.append((label, f"{timing['last'] * 1000:.1f}", f"{timing['p95'] * 1000:.1f}", timing['count']))
+            else:
+                rows.append((label, "-", "-", 0))
+        self.sections["Refresh phases (ms)"].setText(html_table(rows))
+
+        rows = [("", "hit rate", "hits", "entries")]
+        for name, hits, misses, entries in snapshot['caches']:
+            rate = f"{hits / (hits + misses):.0%}" if hits + misses else "-"
+            rows.append((name, rate, f"{hits:,}", f"{entries:,}"))
+        self.sections["Cache hit rates"].setText(html_table(rows))
+
+        rows = [(name.capitalize(), f"{value:,}") for name, value in snapshot['pending writes'].items()]
+        for provider in ('sync', 'api'):
+            for name, value in snapshot.get(provider, {}).items():
+                value = f"{value:,.3f}" if isinstance(value, float) else f"{value:,}" if isinstance(value, int) else value
+                rows.append((f"{provider} {name.replace('_', ' ')}", value))
+        lag = sorted(self.lag)
+        if lag:
+            rows.append(("Event-loop lag p95", f"{lag[int(0.95 * (len(lag) - 1))]} ms"))
+            rows.append(("Event-loop lag max", f"{lag[-1]} ms"))
+        self.sections["Pending writes & event loop"].setText(html_table(rows))
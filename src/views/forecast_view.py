@@ -0,0 +1,165 @@
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QFrame, QSpinBox,
+                            QTableWidget, QTableWidgetItem, QHeaderView)
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QColor, QPainter, QPen
+from PyQt6.QtCharts import QChart, QChartView, QLineSeries, QValueAxis, QCategoryAxis
+
+from controllers.budget_controller import BudgetController
+from views.styles.styles import HyprlandStyles
+from utils.metrics import metrics
+
+MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+
+def month_label(month: str) -> str:
+    return f"{MONTHS[int(month[5:7]) - 1]} {month[2:4]}"
+
+
+class ForecastView(QWidget):
+    """Forecast tab: month-end balances, the last year's actual and the projection after it.
+
+    The projection comes from controller.get_forecast(), cached until the
+    ledger or the monthly income changes, so switching horizons is instant.
+    """
+
+    def __init__(self, controller: BudgetController, months: int = 12, actual_months: int = 12):
+        super().__init__()
+        self.controller = controller
+        self.actual_months = actual_months
+        self.loaded = None
+        self.setup_ui(months)
+
+    def setup_ui(self, months: int):
+        layout = QVBoxLayout(self)
+        layout.setSpacing(16)
+
+        header = QHBoxLayout()
+        title = QLabel("Forecast")
+        title.setStyleSheet(HyprlandStyles.get_label_style(heading=True, size="xl"))
+        header.addWidget(title)
+        header.addStretch()
+        header.addWidget(QLabel("Months ahead"))
+        self.months_spin = QSpinBox()
+        self.months_spin.setRange(3, 24)
+        self.months_spin.setValue(months)
+        self.months_spin.setStyleSheet(HyprlandStyles.get_input_style())
+        self.months_spin.valueChanged.connect(lambda _: self.refresh())
+        header.addWidget(self.months_spin)
+        layout.addLayout(header)
+
+        frame = QFrame()
+        frame.setProperty("card", "true")
+        frame_layout = QVBoxLayout(frame)
+        self.chart = QChart()
+        self.chart.setBackgroundBrush(QColor(HyprlandStyles.BACKGROUND_CARD))
+        self.chart.legend().setLabelColor(QColor(HyprlandStyles.TEXT_PRIMARY))
+        view = QChartView(self.chart)
+        view.setRenderHint(QPainter.RenderHint.Antialiasing)
+        view.setMinimumHeight(320)
+        frame_layout.addWidget(view)
+        layout.addWidget(frame, 3)
+
+        self.recurring_label = QLabel()
+        self.recurring_label.setWordWrap(True)
+        self.recurring_label.setStyleSheet(HyprlandStyles.get_label_style(size="small"))
+        layout.addWidget(self.recurring_label)
+
+        self.table = QTableWidget()
+        self.table.setColumnCount(5)
+        self.table.setHorizontalHeaderLabels(["Month", "Income", "Expense", "Net", "Balance"])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setStyleSheet(HyprlandStyles.get_table_style())
+        layout.addWidget(self.table, 2)
+
+    @metrics.timed('view.forecast')
+    def refresh(self):
+        """Redraw if the ledger, the monthly income or the horizon changed since the last time"""
+        months = self.months_spin.value()
+        state = (self.controller.model.data_version, self.controller.monthly_income, months)
+        if state == self.loaded:
+            return
+        self.loaded = state
+        forecast = self.controller.get_forecast(months)
+        self.update_chart(forecast)
+        self.update_table(forecast)
+        recurring = forecast['recurring']
+        self.recurring_label.setText(
+            "Recurring: " + ", ".join(f"{item.description} ${item.amount:,.2f}" for item in recurring)
+            if recurring else "No recurring items found in the last year")
+
+    def actual_balances(self, before: str):
+        """[(month, month-end balance)] for the last actual_months months before `before`"""
+        ends = {}
+        for day, balance in reversed(self.controller.get_balance_history()):
+            month = day[:7]
+            if month >= before or month in ends:
+                continue
+            if len(ends) == self.actual_months:
+                break
+            ends[month] = balance
+        return sorted(ends.items())
+
+    def update_chart(self, forecast):
+        chart = self.chart
+        chart.removeAllSeries()
+        for axis in list(chart.axes()):
+            chart.removeAxis(axis)
+
+        actual = self.actual_balances(forecast['months'][0])
+        projected = list(zip(forecast['months'], forecast['balance']))
+        points = actual + projected
+
+        axis_x = QCategoryAxis()
+        axis_x.setLabelsPosition(QCategoryAxis.AxisLabelsPosition.AxisLabelsPositionOnValue)
+        step = max(1, len(points) // 12)
+        for index, (month, _) in enumerate(points):
+            if index % step == 0:
+                axis_x.append(month_label(month), index)
+        axis_x.setRange(0, max(1, len(points) - 1))
+        axis_y = QValueAxis()
+        axis_y.setLabelFormat("%.0f")
+        axis_y.setTitleText("Balance ($)")
+        axis_y.setTitleBrush(QColor(HyprlandStyles.TEXT_PRIMARY))
+        values = [balance for _, balance in points]
+        low, high = min(values), max(values)
+        margin = (high - low) * 0.05 or 1
+        axis_y.setRange(low - margin, high + margin)
+        for axis, alignment in ((axis_x, Qt.AlignmentFlag.AlignBottom), (axis_y, Qt.AlignmentFlag.AlignLeft)):
+            axis.setLabelsColor(QColor(HyprlandStyles.TEXT_PRIMARY))
+            chart.addAxis(axis, alignment)
+
+        actual_series = QLineSeries()
+        actual_series.setName("Actual")
+        actual_series.setColor(QColor(HyprlandStyles.ACCENT_PRIMARY))
+        for index, (_, balance) in enumerate(actual):
+            actual_series.append(index, balance)
+
+        projected_series = QLineSeries()
+        projected_series.setName("Projected")
+        pen = QPen(QColor(HyprlandStyles.ACCENT_SECONDARY))
+        pen.setWidth(2)
+        pen.setStyle(Qt.PenStyle.DashLine)
+        projected_series.setPen(pen)
+        # Start from the last actual point so the two lines join
+        if actual:
+            projected_series.append(len(actual) - 1, actual[-1][1])
+        for index, (_, balance) in enumerate(projected, start=len(actual)):
+            projected_series.append(index, balance)
+
+        for series in (actual_series, projected_series):
+            chart.addSeries(series)
+            series.attachAxis(axis_x)
+            series.attachAxis(axis_y)
+
+    def update_table(self, forecast):
+        columns = ('income', 'expense', 'net', 'balance')
+        colors = (HyprlandStyles.ACCENT_SUCCESS, HyprlandStyles.ACCENT_ERROR, None, None)
+        self.table.setRowCount(len(forecast['months']))
+        for row, month in enumerate(forecast['months']):
+            self.table.setItem(row, 0, QTableWidgetItem(month_label(month)))
+            for column, (name, color) in enumerate(zip(columns, colors), start=1):
+                item = QTableWidgetItem(f"${forecast[name][row]:,.2f}")
+                if color is not None:
+                    item.setForeground(QColor(color))
+                self.table.setItem(row, column, item)
@@ -139,7 +139,7 @@ class LoginWindow(QWidget):
         
         self.username_input = QLineEdit()
         self.username_input.setPlaceholderText("Enter your username")
-        self.username_input.setText("admin")
+        self.username_input.setText(self.auth_model.last_user or "admin")
         self.username_input.setMinimumHeight(48)
         self.username_input.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
         
@@ -160,7 +160,8 @@ class LoginWindow(QWidget):
         self.password_input = QLineEdit()
         self.password_input.setPlaceholderText("Enter your password")
         self.password_input.setEchoMode(QLineEdit.EchoMode.Password)
-        self.password_input.setText("admin")
+        if self.auth_model.has_default_password():
+            self.password_input.setText("admin")
         self.password_input.setMinimumHeight(48)
         self.password_input.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
         
@@ -206,7 +207,11 @@ class LoginWindow(QWidget):
         footer_layout.setSpacing(8)
         footer_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
         
-        help_text = QLabel("Use: <b>admin</b> / <b>admin</b>")
+        add_user = "add accounts with <b>python src/cli.py user add NAME</b>"
+        if self.auth_model.has_default_password():
+            help_text = QLabel(f"First run: sign in as <b>admin</b> / <b>admin</b>, then {add_user}")
+        else:
+            help_text = QLabel(add_user[0].upper() + add_user[1:])
         help_text.setAlignment(Qt.AlignmentFlag.AlignCenter)
         help_text.setStyleSheet(f"""
             QLabel {{
@@ -288,23 +293,22 @@ class LoginWindow(QWidget):
         
         # Clear any previous errors
         self.clear_error()
-        
-        # Simulate loading
-        original_text = self.login_button.text()
-        self.login_button.setText("Signing in...")
-        self.login_button.setEnabled(False)
-        
-        from PyQt6.QtCore import QTimer
-        QTimer.singleShot(500, lambda: self.process_login(username, password, original_text))
+        self.process_login(username, password)
     
-    def process_login(self, username: str, password: str, original_text: str):
+    def process_login(self, username: str, password: str):
         if self.auth_model.authenticate(username, password):
             self.login_successful.emit()
         else:
-            self.show_error("Invalid credentials. Please use username: admin and password: admin")
-        
-        self.login_button.setText(original_text)
-        self.login_button.setEnabled(True)
+            self.show_error("Invalid username or password")
+    
+    def set_loading(self, message):
+        """Show a busy message on the sign-in button, or restore it with None"""
+        if message:
+            self.login_button.setText(message)
+            self.login_button.setEnabled(False)
+        else:
+            self.login_button.setText("Sign In")
+            self.login_button.setEnabled(True)
     
     def show_error(self, message):
         self.error_label.setText(message)
@@ -3,18 +3,22 @@ from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                             QTableWidget, QTableWidgetItem, QTabWidget,
                             QMessageBox, QHeaderView, QFormLayout, QGroupBox,
                             QFrame, QScrollArea, QSizePolicy, QSpacerItem,
-                            QSplitter)
-from PyQt6.QtCore import Qt, QTimer, QPropertyAnimation, QEasingCurve, QDate
+                            QSplitter, QFileDialog)
+from PyQt6.QtCore import Qt, QTimer, QPropertyAnimation, QEasingCurve, QDate, pyqtSignal
 from PyQt6.QtGui import QPainter, QColor, QLinearGradient, QFont
-from PyQt6.QtCharts import QChart, QChartView, QBarSeries, QBarSet, QLineSeries, QBarCategoryAxis, QValueAxis
 from PyQt6.QtCore import QDateTime
 
 from controllers.budget_controller import BudgetController
 from views.styles.styles import HyprlandStyles
+from views.transaction_history import TransactionHistoryTable
+from utils.metrics import metrics
 
-from views.empty_window import EmptyWindow
+# PyQt6.QtCharts, views.period_analytics, views.forecast_view and views.diagnostics_panel are
+# imported by the tab builders, the first time their tab is shown.
 
 class MainWindow(QMainWindow):
+    switch_user_requested = pyqtSignal()
+    
     def __init__(self, controller: BudgetController):
         super().__init__()
         self.controller = controller
@@ -49,9 +53,10 @@ class MainWindow(QMainWindow):
         header_frame = self.create_header()
         content_layout.addWidget(header_frame)
         
-        # Tabs
+        # Tabs - all but Transactions are built on first show
         self.tabs = QTabWidget()
         self.tabs.setDocumentMode(True)
+        self.lazy_tabs = {}
         content_layout.addWidget(self.tabs)
         
         # Transaction Tab
@@ -62,17 +67,39 @@ class MainWindow(QMainWindow):
         self.tabs.addTab(transaction_tab, "Transactions")
         
         # Analytics Tab
-        analytics_tab = QWidget()
-        analytics_layout = QVBoxLayout(analytics_tab)
-        analytics_layout.addWidget(self.create_analytics_widget())
-        self.tabs.addTab(analytics_tab, "Analytics")
+        self.add_lazy_tab("Analytics", self.create_analytics_widget)
+        
+        # Trends Tab
+        self.add_lazy_tab("Trends", self.create_period_analytics)
         
-        # Empty View Tab
-        empty_view_tab = self.create_empty_view()
-        self.tabs.addTab(empty_view_tab, "Empty View")
+        # Forecast Tab
+        self.add_lazy_tab("Forecast", self.create_forecast_view)
         
+        # Diagnostics Tab
+        self.add_lazy_tab("Diagnostics", self.create_diagnostics_panel)
+        
+        self.tabs.currentChanged.connect(self.ensure_tab_built)
         main_layout.addWidget(content_frame, 1)
     
+    def add_lazy_tab(self, title: str, builder):
+        """Add a placeholder tab whose content is built the first time it is shown"""
+        placeholder = QWidget()
+        layout = QVBoxLayout(placeholder)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.lazy_tabs[self.tabs.addTab(placeholder, title)] = builder
+    
+    def ensure_tab_built(self, index: int):
+        builder = self.lazy_tabs.pop(index, None)
+        if builder is None:
+            return
+        self.tabs.widget(index).layout().addWidget(builder())
+        self.apply_styles()
+        if self.analytics_built():
+            self.refresh_analytics()
+    
+    def analytics_built(self) -> bool:
+        return hasattr(self, 'summary_table')
+    
     def create_sidebar(self):
         sidebar = QFrame()
         sidebar.setProperty("card", "true")
@@ -116,6 +143,11 @@ class MainWindow(QMainWindow):
         layout.addWidget(quick_income_btn)
         layout.addWidget(quick_expense_btn)
         
+        import_btn = QPushButton("Import Statements...")
+        import_btn.setStyleSheet(HyprlandStyles.get_button_style(primary=False, size="small"))
+        import_btn.clicked.connect(self.import_statements)
+        layout.addWidget(import_btn)
+        
         layout.addStretch()
         
         # Navigation section
@@ -123,10 +155,15 @@ class MainWindow(QMainWindow):
         nav_title.setStyleSheet(HyprlandStyles.get_label_style(heading=True, size="large"))
         layout.addWidget(nav_title)
         
-        empty_view_btn = QPushButton("Empty View")
-        empty_view_btn.setStyleSheet(HyprlandStyles.get_button_style(size="medium"))
-        empty_view_btn.clicked.connect(self.show_empty_view)
-        layout.addWidget(empty_view_btn)
+        diagnostics_btn = QPushButton("Diagnostics")
+        diagnostics_btn.setStyleSheet(HyprlandStyles.get_button_style(size="medium"))
+        diagnostics_btn.clicked.connect(self.show_diagnostics)
+        layout.addWidget(diagnostics_btn)
+        
+        switch_user_btn = QPushButton("Switch User")
+        switch_user_btn.setStyleSheet(HyprlandStyles.get_button_style(primary=False, size="medium"))
+        switch_user_btn.clicked.connect(self.switch_user_requested.emit)
+        layout.addWidget(switch_user_btn)
         
         return sidebar
     
@@ -139,14 +176,7 @@ class MainWindow(QMainWindow):
         layout.setContentsMargins(16, 12, 16, 12)
         
         value_label = QLabel(f"${value}")
-        value_label.setStyleSheet(f"""
-            QLabel {{
-                color: {color};
-                font-size: 18px;
-                font-weight: bold;
-                font-family: {HyprlandStyles.FONT_FAMILY};
-            }}
-        """)
+        value_label.setStyleSheet(HyprlandStyles.get_stat_value_style(color))
         
         title_label = QLabel(title)
         title_label.setStyleSheet(HyprlandStyles.get_label_style(size="small"))
@@ -171,13 +201,7 @@ class MainWindow(QMainWindow):
         balance_title.setStyleSheet(HyprlandStyles.get_label_style(size="medium"))
         
         self.balance_label = QLabel("$0.00")
-        self.balance_label.setStyleSheet(f"""
-            QLabel {{
-                font-size: 28px;
-                font-weight: bold;
-                font-family: {HyprlandStyles.FONT_FAMILY};
-            }}
-        """)
+        self.balance_label.setStyleSheet(HyprlandStyles.get_balance_label_style())
         
         balance_info.addWidget(balance_title)
         balance_info.addWidget(self.balance_label)
@@ -188,7 +212,8 @@ class MainWindow(QMainWindow):
         # Refresh button
         refresh_btn = QPushButton("Refresh")
         refresh_btn.setStyleSheet(HyprlandStyles.get_button_style(size="medium"))
-        refresh_btn.clicked.connect(self.refresh_data)
+        # Through a lambda: clicked passes `checked`, which the timed wrapper would forward
+        refresh_btn.clicked.connect(lambda: self.refresh_data())
         
         layout.addWidget(refresh_btn)
         
@@ -217,6 +242,9 @@ class MainWindow(QMainWindow):
         category_label.setStyleSheet(HyprlandStyles.get_label_style(size="small"))
         self.category_combo = QComboBox()
         self.update_categories()
+        # Rule suggestions never override a category the user chose themselves
+        self.category_picked = False
+        self.category_combo.activated.connect(lambda _: setattr(self, 'category_picked', True))
         category_layout.addWidget(category_label)
         category_layout.addWidget(self.category_combo)
         
@@ -241,6 +269,7 @@ class MainWindow(QMainWindow):
         desc_label.setStyleSheet(HyprlandStyles.get_label_style(size="small"))
         self.description_input = QLineEdit()
         self.description_input.setPlaceholderText("Transaction description")
+        self.description_input.editingFinished.connect(self.suggest_category)
         desc_layout.addWidget(desc_label)
         desc_layout.addWidget(self.description_input)
         
@@ -265,19 +294,20 @@ class MainWindow(QMainWindow):
         frame.setProperty("card", "true")
         layout = QVBoxLayout(frame)
         
-        table_title = QLabel("Recent Transactions")
+        title_layout = QHBoxLayout()
+        table_title = QLabel("Transaction History")
         table_title.setStyleSheet(HyprlandStyles.get_label_style(heading=True, size="large"))
-        layout.addWidget(table_title)
-        
-        self.transactions_table = QTableWidget()
-        self.transactions_table.setColumnCount(6)
-        self.transactions_table.setHorizontalHeaderLabels([
-            "Date", "Type", "Category", "Description", "Amount", "Actions"
-        ])
-        header = self.transactions_table.horizontalHeader()
-        header.setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        header.setSectionResizeMode(5, QHeaderView.ResizeMode.Fixed)
-        self.transactions_table.setColumnWidth(5, 100)
+        title_layout.addWidget(table_title)
+        title_layout.addStretch()
+        
+        delete_selected_btn = QPushButton("Delete Selected")
+        delete_selected_btn.setStyleSheet(HyprlandStyles.get_button_style(primary=False, size="small"))
+        delete_selected_btn.clicked.connect(self.delete_selected_transactions)
+        title_layout.addWidget(delete_selected_btn)
+        layout.addLayout(title_layout)
+        
+        self.transactions_table = TransactionHistoryTable(self.controller)
+        self.transactions_table.delete_requested.connect(self.delete_transaction)
         
         layout.addWidget(self.transactions_table)
         return frame
@@ -326,6 +356,8 @@ class MainWindow(QMainWindow):
     
     def create_income_expense_chart(self):
         """Create bar chart showing income vs expenses by category"""
+        from PyQt6.QtCharts import QChart, QChartView
+        
         chart_frame = QFrame()
         chart_frame.setProperty("card", "true")
         layout = QVBoxLayout(chart_frame)
@@ -351,6 +383,8 @@ class MainWindow(QMainWindow):
     
     def create_balance_chart(self):
         """Create line chart showing balance over time"""
+        from PyQt6.QtCharts import QChart, QChartView
+        
         chart_frame = QFrame()
         chart_frame.setProperty("card", "true")
         layout = QVBoxLayout(chart_frame)
@@ -374,16 +408,33 @@ class MainWindow(QMainWindow):
         
         return chart_frame
     
-    def create_empty_view(self):
-        """Create an empty view widget"""
-        empty_window = EmptyWindow()
-        return empty_window
+    def create_period_analytics(self):
+        """Create the trends and drill-down view"""
+        from views.period_analytics import PeriodAnalytics
+        
+        self.period_analytics = PeriodAnalytics(self.controller)
+        self.period_analytics.refresh()
+        return self.period_analytics
+    
+    def create_forecast_view(self):
+        """Create the balance forecast view"""
+        from views.forecast_view import ForecastView
+        
+        self.forecast_view = ForecastView(self.controller)
+        self.forecast_view.refresh()
+        return self.forecast_view
     
-    def show_empty_view(self):
-        """Switch to the empty view tab"""
-        # Find the index of the empty view tab
+    def create_diagnostics_panel(self):
+        """Create the live diagnostics panel"""
+        from views.diagnostics_panel import DiagnosticsPanel
+        
+        return DiagnosticsPanel(self.controller)
+    
+    def show_diagnostics(self):
+        """Switch to the diagnostics tab"""
+        # Find the index of the diagnostics tab
         for i in range(self.tabs.count()):
-            if self.tabs.tabText(i) == "Empty View":
+            if self.tabs.tabText(i) == "Diagnostics":
                 self.tabs.setCurrentIndex(i)
                 break
     
@@ -392,8 +443,11 @@ class MainWindow(QMainWindow):
         self.update_income_expense_chart()
         self.update_balance_chart()
     
+    @metrics.timed('view.income_expense_chart')
     def update_income_expense_chart(self):
         """Update income vs expense bar chart"""
+        from PyQt6.QtCharts import QChart, QBarSeries, QBarSet, QBarCategoryAxis, QValueAxis
+        
         # Clear existing series and axes
         self.income_expense_chart.removeAllSeries()
         axes = list(self.income_expense_chart.axes())
@@ -450,42 +504,30 @@ class MainWindow(QMainWindow):
         self.income_expense_chart.legend().setLabelColor(QColor(HyprlandStyles.TEXT_PRIMARY))
         self.income_expense_chart.setAnimationOptions(QChart.AnimationOption.SeriesAnimations)
     
+    @metrics.timed('view.balance_chart')
     def update_balance_chart(self):
         """Update balance over time line chart"""
+        from PyQt6.QtCharts import QChart, QLineSeries, QValueAxis
+        
         # Clear existing series and axes
         self.balance_chart.removeAllSeries()
         axes = list(self.balance_chart.axes())
         for axis in axes:
             self.balance_chart.removeAxis(axis)
         
-        transactions = self.controller.model.transactions
+        # Running balance, starting from the totals of any closed periods
+        history = self.controller.get_balance_history()
         
-        if not transactions:
+        if not history:
             return
         
-        # Sort transactions by date
-        sorted_transactions = sorted(transactions, key=lambda x: x.date)
-        
         # Create line series for balance
         balance_series = QLineSeries()
         balance_series.setName("Balance")
         balance_series.setColor(QColor(HyprlandStyles.ACCENT_PRIMARY))
         
-        # Calculate running balance
-        running_balance = 0
-        dates = []
-        balances = []
-        
-        for transaction in sorted_transactions:
-            if transaction.type == 'income':
-                running_balance += transaction.amount
-            else:
-                running_balance -= transaction.amount
-            
-            # Use simplified date for demonstration
-            date_str = transaction.date.split('T')[0]
-            dates.append(date_str)
-            balances.append(running_balance)
+        dates = [date_str for date_str, _ in history]
+        balances = [balance for _, balance in history]
         
         # Add points to series (limit to last 30 points for readability)
         max_points = min(30, len(dates))
@@ -538,7 +580,7 @@ class MainWindow(QMainWindow):
         
         # Style tables
         if hasattr(self, 'transactions_table'):
-            self.transactions_table.setStyleSheet(HyprlandStyles.get_table_style())
+            self.transactions_table.setStyleSheet(HyprlandStyles.get_table_style(row_actions=True))
         if hasattr(self, 'summary_table'):
             self.summary_table.setStyleSheet(HyprlandStyles.get_table_style())
     
@@ -566,49 +608,52 @@ class MainWindow(QMainWindow):
         except ValueError:
             self.show_error("Please enter a valid amount!")
     
+    def suggest_category(self):
+        if self.category_picked:
+            return
+        try:
+            amount = float(self.amount_input.text())
+        except ValueError:
+            amount = 0.0
+        category = self.controller.suggest_category(
+            self.description_input.text(), self.type_combo.currentText().lower(), amount)
+        if category is not None and self.category_combo.findText(category) >= 0:
+            self.category_combo.setCurrentText(category)
+    
     def clear_form(self):
         self.amount_input.clear()
         self.description_input.clear()
+        self.category_picked = False
     
+    @metrics.timed('view.refresh_data')
     def refresh_data(self):
-        # Update balance
+        self.refresh_balance()
+        
+        # Update transactions table - reloads from the top only if the ledger changed
+        self.transactions_table.refresh()
+        
+        # Analytics, Trends and Forecast only exist once their tab has been opened
+        if self.analytics_built():
+            self.refresh_analytics()
+        if hasattr(self, 'period_analytics'):
+            self.period_analytics.refresh()
+        if hasattr(self, 'forecast_view'):
+            self.forecast_view.refresh()
+    
+    @metrics.timed('view.balance_label')
+    def refresh_balance(self):
         balance = self.controller.get_current_balance()
-        balance_color = HyprlandStyles.ACCENT_SUCCESS if balance >= 0 else HyprlandStyles.ACCENT_ERROR
         self.balance_label.setText(f"${balance:,.2f}")
-        self.balance_label.setStyleSheet(f"""
-            QLabel {{
-                color: {balance_color};
-                font-size: 28px;
-                font-weight: bold;
-                font-family: {HyprlandStyles.FONT_FAMILY};
-            }}
-        """)
-        
-        # Update transactions table
-        transactions = self.controller.get_recent_transactions(20)
-        self.transactions_table.setRowCount(len(transactions))
-        
-        for row, transaction in enumerate(transactions):
-            date = transaction.date.split('T')[0]
-            self.transactions_table.setItem(row, 0, QTableWidgetItem(date))
-            self.transactions_table.setItem(row, 1, QTableWidgetItem(transaction.type.title()))
-            self.transactions_table.setItem(row, 2, QTableWidgetItem(transaction.category))
-            self.transactions_table.setItem(row, 3, QTableWidgetItem(transaction.description))
-            
-            amount_item = QTableWidgetItem(f"${transaction.amount:,.2f}")
-            if transaction.type == 'income':
-                amount_item.setForeground(QColor(HyprlandStyles.ACCENT_SUCCESS))
-            else:
-                amount_item.setForeground(QColor(HyprlandStyles.ACCENT_ERROR))
-            self.transactions_table.setItem(row, 4, amount_item)
-            
-            # Delete button
-            delete_btn = QPushButton("Delete")
-            delete_btn.setStyleSheet(HyprlandStyles.get_button_style(primary=False, size="small"))
-            delete_btn.clicked.connect(lambda checked, tid=transaction.id: self.delete_transaction(tid))
-            self.transactions_table.setCellWidget(row, 5, delete_btn)
-        
-        # Update summary table
+        HyprlandStyles.set_dynamic_property(
+            self.balance_label, "balance_state", "positive" if balance >= 0 else "negative")
+    
+    @metrics.timed('view.refresh_analytics')
+    def refresh_analytics(self):
+        self.refresh_summary_table()
+        self.update_charts()
+    
+    @metrics.timed('view.summary_table')
+    def refresh_summary_table(self):
         summary = self.controller.get_category_summary()
         self.summary_table.setRowCount(len(summary))
         
@@ -622,9 +667,6 @@ class MainWindow(QMainWindow):
             expense_item = QTableWidgetItem(f"${amounts['expense']:,.2f}")
             expense_item.setForeground(QColor(HyprlandStyles.ACCENT_ERROR))
             self.summary_table.setItem(row, 2, expense_item)
-        
-        # Update charts
-        self.update_charts()
     
     def delete_transaction(self, transaction_id: str):
         reply = QMessageBox.question(self, "Confirm Delete", 
@@ -635,10 +677,42 @@ class MainWindow(QMainWindow):
             self.controller.delete_transaction(transaction_id)
             self.refresh_data()
     
+    def delete_selected_transactions(self):
+        transaction_ids = self.transactions_table.selected_ids()
+        if not transaction_ids:
+            self.show_error("Select one or more transactions to delete.")
+            return
+        
+        reply = QMessageBox.question(self, "Confirm Delete",
+                                   f"Delete {len(transaction_ids):,} selected transaction(s)?",
+                                   QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        
+        if reply == QMessageBox.StandardButton.Yes:
+            # One model operation, one save, one refresh
+            self.controller.delete_transactions(transaction_ids)
+            self.refresh_data()
+    
     def quick_income(self):
         self.type_combo.setCurrentText("Income")
         self.amount_input.setFocus()
     
+    def import_statements(self):
+        paths, _ = QFileDialog.getOpenFileNames(
+            self, "Import Bank Statements", "",
+            "Statements (*.csv *.ofx *.qfx);;All files (*)")
+        if not paths:
+            return
+        
+        result = self.controller.import_statements(paths)
+        self.refresh_data()
+        
+        message = f"Imported {result.added:,} new of {result.parsed:,} transactions from {result.files} file(s)."
+        if result.duplicates:
+            message += f"\n{result.duplicates:,} already in the ledger were skipped as duplicates."
+        if result.errors:
+            message += "\n\nSkipped:\n" + "\n".join(f"{path}: {error}" for path, error in result.errors.items())
+        QMessageBox.information(self, "Import Complete", message)
+    
     def quick_expense(self):
         self.type_combo.setCurrentText("Expense")
         self.amount_input.setFocus()
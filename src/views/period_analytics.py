@@ -0,0 +1,188 @@
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QSplitter, QLabel, QFrame,
+                            QTreeWidget, QTreeWidgetItem, QHeaderView)
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QColor, QPainter
+from PyQt6.QtCharts import (QChart, QChartView, QStackedBarSeries, QBarSet, QBarCategoryAxis,
+                            QLineSeries, QValueAxis)
+
+from controllers.budget_controller import BudgetController
+from views.styles.styles import HyprlandStyles
+from utils.metrics import metrics
+
+MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+SERIES_COLORS = (HyprlandStyles.ACCENT_PRIMARY, HyprlandStyles.ACCENT_SECONDARY, HyprlandStyles.ACCENT_SUCCESS,
+                 HyprlandStyles.ACCENT_WARNING, HyprlandStyles.ACCENT_ERROR, HyprlandStyles.TEXT_SECONDARY)
+BUCKET_ROLE = Qt.ItemDataRole.UserRole
+
+
+class PeriodAnalytics(QWidget):
+    """Trends tab: stacked monthly spend, year over year, and a year > month > day drill-down.
+
+    Everything is read from the controller's period summaries (the
+    aggregate cube), never from raw rows, except a single day's rows.
+    """
+
+    def __init__(self, controller: BudgetController, months: int = 12, years: int = 5):
+        super().__init__()
+        self.controller = controller
+        self.months = months
+        self.years = years
+        self.loaded_version = None
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setSpacing(16)
+
+        title = QLabel("Trends")
+        title.setStyleSheet(HyprlandStyles.get_label_style(heading=True, size="xl"))
+        layout.addWidget(title)
+
+        splitter = QSplitter(Qt.Orientation.Horizontal)
+        splitter.setChildrenCollapsible(False)
+        self.spend_chart = self.create_chart(splitter, f"Monthly Spending by Category (last {self.months} months)")
+        self.yoy_chart = self.create_chart(splitter, "Spending Year over Year")
+        splitter.setSizes([400, 400])
+        layout.addWidget(splitter, 3)
+
+        drill_title = QLabel("Drill Down")
+        drill_title.setStyleSheet(HyprlandStyles.get_label_style(heading=True, size="large"))
+        layout.addWidget(drill_title)
+
+        self.tree = QTreeWidget()
+        self.tree.setColumnCount(4)
+        self.tree.setHeaderLabels(["Period", "Income", "Expense", "Net"])
+        self.tree.header().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.tree.itemExpanded.connect(self.expand_item)
+        layout.addWidget(self.tree, 2)
+
+    def create_chart(self, splitter: QSplitter, title: str) -> QChart:
+        frame = QFrame()
+        frame.setProperty("card", "true")
+        frame_layout = QVBoxLayout(frame)
+        label = QLabel(title)
+        label.setStyleSheet(HyprlandStyles.get_label_style(heading=True, size="large"))
+        frame_layout.addWidget(label)
+
+        chart = QChart()
+        chart.setBackgroundBrush(QColor(HyprlandStyles.BACKGROUND_CARD))
+        chart.legend().setLabelColor(QColor(HyprlandStyles.TEXT_PRIMARY))
+        view = QChartView(chart)
+        view.setRenderHint(QPainter.RenderHint.Antialiasing)
+        view.setMinimumHeight(280)
+        frame_layout.addWidget(view)
+        splitter.addWidget(frame)
+        return chart
+
+    @metrics.timed('view.period_analytics')
+    def refresh(self):
+        """Rebuild from the period summaries if the ledger changed since the last time"""
+        version = self.controller.model.data_version
+        if version == self.loaded_version:
+            return
+        self.loaded_version = version
+        self.update_spend_chart()
+        self.update_yoy_chart()
+        self.reset_tree()
+
+    @staticmethod
+    def clear_chart(chart: QChart):
+        chart.removeAllSeries()
+        for axis in list(chart.axes()):
+            chart.removeAxis(axis)
+
+    def style_axis(self, axis):
+        axis.setLabelsColor(QColor(HyprlandStyles.TEXT_PRIMARY))
+
+    def update_spend_chart(self):
+        chart = self.spend_chart
+        self.clear_chart(chart)
+        summary = self.controller.get_period_summary('month')
+        months = sorted(summary)[-self.months:]
+        if not months:
+            return
+        categories = sorted({category for month in months for category, totals in summary[month].items()
+                             if totals['expense']})
+        series = QStackedBarSeries()
+        for index, category in enumerate(categories):
+            bar_set = QBarSet(category)
+            bar_set.setColor(QColor(SERIES_COLORS[index % len(SERIES_COLORS)]))
+            for month in months:
+                bar_set.append(summary[month].get(category, {}).get('expense', 0))
+            series.append(bar_set)
+        chart.addSeries(series)
+
+        axis_x = QBarCategoryAxis()
+        axis_x.append(months)
+        axis_y = QValueAxis()
+        axis_y.setTitleText("Spent ($)")
+        axis_y.setTitleBrush(QColor(HyprlandStyles.TEXT_PRIMARY))
+        for axis, alignment in ((axis_x, Qt.AlignmentFlag.AlignBottom), (axis_y, Qt.AlignmentFlag.AlignLeft)):
+            self.style_axis(axis)
+            chart.addAxis(axis, alignment)
+            series.attachAxis(axis)
+
+    def update_yoy_chart(self):
+        chart = self.yoy_chart
+        self.clear_chart(chart)
+        years = list(self.controller.get_year_over_year('expense').items())[-self.years:]
+        if not years:
+            return
+        axis_x = QValueAxis()
+        axis_x.setRange(1, 12)
+        axis_x.setTickCount(12)
+        axis_x.setLabelFormat("%d")
+        axis_x.setTitleText("Month")
+        axis_x.setTitleBrush(QColor(HyprlandStyles.TEXT_PRIMARY))
+        axis_y = QValueAxis()
+        axis_y.setTitleText("Spent ($)")
+        axis_y.setTitleBrush(QColor(HyprlandStyles.TEXT_PRIMARY))
+        axis_y.setRange(0, max(max(values) for _, values in years) or 1)
+        for axis, alignment in ((axis_x, Qt.AlignmentFlag.AlignBottom), (axis_y, Qt.AlignmentFlag.AlignLeft)):
+            self.style_axis(axis)
+            chart.addAxis(axis, alignment)
+
+        for index, (year, values) in enumerate(years):
+            series = QLineSeries()
+            series.setName(year)
+            series.setColor(QColor(SERIES_COLORS[index % len(SERIES_COLORS)]))
+            for month, value in enumerate(values, start=1):
+                series.append(month, value)
+            chart.addSeries(series)
+            series.attachAxis(axis_x)
+            series.attachAxis(axis_y)
+
+    def reset_tree(self):
+        self.tree.clear()
+        self.add_children(self.tree.invisibleRootItem(), self.controller.drill_down())
+
+    def add_children(self, parent: QTreeWidgetItem, summary):
+        for bucket in sorted(summary, reverse=True):
+            income = sum(totals['income'] for totals in summary[bucket].values())
+            expense = sum(totals['expense'] for totals in summary[bucket].values())
+            label = bucket
+            if len(bucket) == 7:
+                label = f"{MONTHS[int(bucket[5:7]) - 1]} {bucket[:4]}"
+            item = QTreeWidgetItem([label, f"${income:,.2f}", f"${expense:,.2f}", f"${income - expense:,.2f}"])
+            item.setData(0, BUCKET_ROLE, bucket)
+            item.setForeground(1, QColor(HyprlandStyles.ACCENT_SUCCESS))
+            item.setForeground(2, QColor(HyprlandStyles.ACCENT_ERROR))
+            # Filled in when first expanded
+            item.setChildIndicatorPolicy(QTreeWidgetItem.ChildIndicatorPolicy.ShowIndicator)
+            parent.addChild(item)
+
+    def expand_item(self, item: QTreeWidgetItem):
+        bucket = item.data(0, BUCKET_ROLE)
+        if item.childCount() or bucket is None:
+            return
+        if len(bucket) < 10:
+            self.add_children(item, self.controller.drill_down(bucket))
+            return
+        for t in self.controller.get_day_transactions(bucket):
+            amount = f"${t.amount:,.2f}"
+            row = QTreeWidgetItem([f"{t.category}: {t.description}",
+                                   amount if t.type == 'income' else "", amount if t.type != 'income' else "", ""])
+            row.setChildIndicatorPolicy(QTreeWidgetItem.ChildIndicatorPolicy.DontShowIndicator)
+            item.addChild(row)
+        if not item.childCount():
+            item.setChildIndicatorPolicy(QTreeWidgetItem.ChildIndicatorPolicy.DontShowIndicator)
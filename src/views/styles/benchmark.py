@@ -0,0 +1,73 @@
+"""Measure stylesheet polish cost of one MainWindow table refresh.
+
+Run from src/:  QT_QPA_PLATFORM=offscreen python -m views.styles.benchmark
+"""
+import sys
+import time
+
+from PyQt6.QtWidgets import QApplication, QLabel, QPushButton, QTableWidget
+
+from views.styles.styles import HyprlandStyles
+
+
+def _legacy_refresh(table: QTableWidget, label: QLabel, rows: int, positive: bool):
+    """What refresh_data did before stylesheets were cached"""
+    color = HyprlandStyles.ACCENT_SUCCESS if positive else HyprlandStyles.ACCENT_ERROR
+    label.setStyleSheet(f"""
+            QLabel {{
+                color: {color};
+                font-size: 28px;
+                font-weight: bold;
+                font-family: {HyprlandStyles.FONT_FAMILY};
+            }}
+        """)
+    label.ensurePolished()
+    for row in range(rows):
+        button = QPushButton("Delete")
+        button.setStyleSheet(HyprlandStyles.get_button_style.__wrapped__(primary=False, size="small"))
+        table.setCellWidget(row, 0, button)
+        button.ensurePolished()
+
+
+def _cached_refresh(table: QTableWidget, label: QLabel, rows: int, positive: bool):
+    """Current refresh_data: shared table sheet plus a dynamic property"""
+    HyprlandStyles.set_dynamic_property(label, "balance_state", "positive" if positive else "negative")
+    label.ensurePolished()
+    for row in range(rows):
+        button = QPushButton("Delete")
+        table.setCellWidget(row, 0, button)
+        button.ensurePolished()
+
+
+def measure(refresh, table_style: str, rows: int = 20, iterations: int = 200) -> float:
+    """Average milliseconds spent per refresh"""
+    table = QTableWidget(rows, 1)
+    table.setStyleSheet(table_style)
+    label = QLabel("$0.00")
+    label.setStyleSheet(HyprlandStyles.get_balance_label_style())
+
+    start = time.perf_counter()
+    for i in range(iterations):
+        # Flip sign every few refreshes, as a balance near zero would
+        refresh(table, label, rows, positive=(i // 5) % 2 == 0)
+    elapsed = time.perf_counter() - start
+
+    table.deleteLater()
+    label.deleteLater()
+    return elapsed / iterations * 1000
+
+
+def main():
+    app = QApplication.instance() or QApplication(sys.argv)
+    HyprlandStyles.setup_app_style(app)
+
+    for rows in (20, 100):
+        legacy = measure(_legacy_refresh, HyprlandStyles.get_table_style(), rows)
+        cached = measure(_cached_refresh, HyprlandStyles.get_table_style(row_actions=True), rows)
+        print(f"{rows:>4} rows  legacy {legacy:7.3f} ms  cached {cached:7.3f} ms  "
+              f"saved {legacy - cached:7.3f} ms/refresh ({(1 - cached / legacy) * 100:.0f}%)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
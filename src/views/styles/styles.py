@@ -1,6 +1,14 @@
+from functools import lru_cache
+
 from PyQt6.QtGui import QFont, QPalette, QColor
 from PyQt6.QtCore import Qt
 
+
+def _cached(builder):
+    """Memoize a stylesheet builder on its arguments"""
+    return staticmethod(lru_cache(maxsize=None)(builder))
+
+
 class HyprlandStyles:
     # Hyprland-inspired color palette (dark theme)
     BACKGROUND_PRIMARY = "#1a1b26"      # Deep blue-black
@@ -42,7 +50,7 @@ class HyprlandStyles:
         
         app.setPalette(palette)
     
-    @staticmethod
+    @_cached
     def get_button_style(primary=True, size="medium"):
         sizes = {
             "small": "8px 16px",
@@ -97,7 +105,7 @@ class HyprlandStyles:
                 }}
             """
     
-    @staticmethod
+    @_cached
     def get_input_style():
         return f"""
             QLineEdit, QComboBox {{
@@ -140,7 +148,7 @@ class HyprlandStyles:
             }}
         """
     
-    @staticmethod
+    @_cached
     def get_label_style(heading=False, size="medium"):
         sizes = {
             "small": "11px",
@@ -162,7 +170,57 @@ class HyprlandStyles:
             }}
         """
     
+    @_cached
+    def get_stat_value_style(color):
+        return f"""
+            QLabel {{
+                color: {color};
+                font-size: 18px;
+                font-weight: bold;
+                font-family: {HyprlandStyles.FONT_FAMILY};
+            }}
+        """
+    
+    @_cached
+    def get_balance_label_style():
+        """Balance label colours are switched through the balance_state
+        dynamic property, so the sheet is parsed once per widget."""
+        return f"""
+            QLabel {{
+                color: {HyprlandStyles.TEXT_PRIMARY};
+                font-size: 28px;
+                font-weight: bold;
+                font-family: {HyprlandStyles.FONT_FAMILY};
+            }}
+            QLabel[balance_state="positive"] {{
+                color: {HyprlandStyles.ACCENT_SUCCESS};
+            }}
+            QLabel[balance_state="negative"] {{
+                color: {HyprlandStyles.ACCENT_ERROR};
+            }}
+        """
+    
+    @staticmethod
+    def set_dynamic_property(widget, name, value) -> bool:
+        """Set a style-affecting property and re-polish only if it changed"""
+        if widget.property(name) == value:
+            return False
+        widget.setProperty(name, value)
+        style = widget.style()
+        style.unpolish(widget)
+        style.polish(widget)
+        return True
+    
     @staticmethod
+    def cache_info():
+        """Hit/miss counters of the memoized stylesheet builders"""
+        builders = ("get_button_style", "get_input_style", "get_label_style",
+                    "get_table_style", "get_stat_value_style", "get_balance_label_style",
+                    "get_card_style", "get_window_style", "get_scroll_area_style",
+                    "get_tab_widget_style")
+        return {name: getattr(HyprlandStyles, name).cache_info() for name in builders}
+    
+    @_cached
     def get_card_style():
         return f"""
             QFrame[card="true"] {{
@@ -191,8 +249,11 @@ class HyprlandStyles:
             }}
         """
     
-    @staticmethod
-    def get_table_style():
+    @_cached
+    def get_table_style(row_actions=False):
+        """Table stylesheet; with row_actions, also styles the per-row buttons
+        so they inherit one parsed sheet instead of carrying their own."""
+        actions = HyprlandStyles.get_button_style(primary=False, size="small") if row_actions else ""
         return f"""
             QTableWidget {{
                 background-color: {HyprlandStyles.BACKGROUND_CARD};
@@ -228,9 +289,10 @@ class HyprlandStyles:
                 border-bottom: 2px solid {HyprlandStyles.BORDER_COLOR};
                 border-right: 1px solid {HyprlandStyles.BORDER_COLOR};
             }}
+            {actions}
         """
     
-    @staticmethod
+    @_cached
     def get_window_style():
         return f"""
             QMainWindow, QWidget {{
@@ -241,7 +303,7 @@ class HyprlandStyles:
             }}
         """
     
-    @staticmethod
+    @_cached
     def get_scroll_area_style():
         return f"""
             QScrollArea {{
@@ -268,7 +330,7 @@ class HyprlandStyles:
             }}
         """
     
-    @staticmethod
+    @_cached
     def get_tab_widget_style():
         return f"""
             QTabWidget::pane {{
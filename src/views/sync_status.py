@@ -0,0 +1,36 @@
+from concurrent.futures import Future
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+
+class QtDispatcher(QObject):
+    """Runs callables on the thread this object lives in (the UI thread).
+
+    Passed to SyncService as its dispatch, so model reads and writes made
+    on behalf of the sync thread happen where the UI makes its own.
+    """
+    _call = pyqtSignal(object)
+
+    def __init__(self):
+        super().__init__()
+        self._call.connect(self._run)
+
+    def __call__(self, fn) -> Future:
+        future = Future()
+        self._call.emit((fn, future))
+        return future
+
+    def _run(self, job):
+        fn, future = job
+        try:
+            future.set_result(fn())
+        except Exception as e:
+            future.set_exception(e)
+
+
+class SyncStatusBridge(QObject):
+    """Forwards SyncService status callbacks to the UI as a signal"""
+    status_changed = pyqtSignal(str, str)  # state, detail
+
+    def __call__(self, state: str, detail: str = ""):
+        self.status_changed.emit(state, detail)
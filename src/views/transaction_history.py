@@ -0,0 +1,246 @@
+from PyQt6.QtWidgets import (QTableWidget, QTableWidgetItem, QPushButton, QHeaderView,
+                            QAbstractItemView)
+from PyQt6.QtCore import QItemSelectionModel, QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt6.QtGui import QColor
+
+from controllers.budget_controller import BudgetController
+from views.styles.styles import HyprlandStyles
+from utils.metrics import metrics
+
+
+def format_row(transaction):
+    """Everything the table needs from a transaction, as plain strings"""
+    return (
+        (transaction.date, transaction.id),
+        transaction.date.split('T')[0],
+        transaction.type.title(),
+        transaction.category,
+        transaction.description,
+        f"${transaction.amount:,.2f}",
+        transaction.type == 'income',
+    )
+
+
+class _PageSignals(QObject):
+    # generation, direction ('older' / 'newer'), list of formatted rows
+    loaded = pyqtSignal(int, str, object)
+
+
+class _PageFetch(QRunnable):
+    """Formats one page off the UI thread.
+
+    The page itself is read on the UI thread, which owns the model; rows
+    are replaced rather than changed in place, so the list handed over
+    stays valid whatever the model does meanwhile.
+    """
+
+    def __init__(self, generation, direction, page):
+        super().__init__()
+        self.generation = generation
+        self.direction = direction
+        self.page = page
+        self.signals = _PageSignals()
+
+    def run(self):
+        self.signals.loaded.emit(self.generation, self.direction, [format_row(t) for t in self.page])
+
+
+class TransactionHistoryTable(QTableWidget):
+    """Infinite-scroll view over the whole ledger, newest first.
+
+    Pages are read as the user nears either end and formatted in the
+    background, and only a window of max_rows formatted rows (and their
+    row widgets) is kept; rows scrolled far out of view are dropped and
+    re-fetched on demand.
+
+    The selection is kept as a set of ids next to Qt's, so rows picked and
+    then scrolled out of the window stay picked, and Ctrl+A picks every row
+    in the ledger. Qt's selection only mirrors it for the loaded rows.
+    """
+    delete_requested = pyqtSignal(str)
+
+    def __init__(self, controller: BudgetController, page_size: int = 50, max_rows: int = 300):
+        super().__init__()
+        self.controller = controller
+        self.page_size = page_size
+        self.max_rows = max(max_rows, page_size * 2)
+        self.rows = []
+        self.generation = 0
+        self.loaded_version = None
+        self.has_newer = False
+        self.has_older = True
+        self.pending = {}
+        self.selected = set()
+        self._syncing = False
+
+        self.setColumnCount(6)
+        self.setHorizontalHeaderLabels([
+            "Date", "Type", "Category", "Description", "Amount", "Actions"
+        ])
+        header = self.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        header.setSectionResizeMode(5, QHeaderView.ResizeMode.Fixed)
+        self.setColumnWidth(5, 100)
+
+        # Ctrl/Shift-click to pick rows for bulk delete
+        self.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.selectionModel().selectionChanged.connect(self.on_selection_changed)
+
+        # Scroll by rows, so window trims can shift the bar by a row count
+        self.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerItem)
+        self.verticalScrollBar().valueChanged.connect(self.on_scroll)
+
+    @metrics.timed('view.transactions_table')
+    def refresh(self):
+        """Reload from the top if the ledger changed since the last load"""
+        if self.loaded_version != self.controller.model.data_version:
+            self.reset()
+
+    @metrics.timed('view.transactions_table.reset')
+    def reset(self):
+        self.generation += 1
+        self.pending.clear()
+        self.loaded_version = self.controller.model.data_version
+        # The first page is small and must paint immediately, so load it inline
+        page = self.controller.get_transactions_page(self.page_size)
+        self.rows = [format_row(t) for t in page]
+        self.has_newer = False
+        self.has_older = len(page) == self.page_size
+        self._syncing = True
+        self.clearSelection()
+        self.setRowCount(len(self.rows))
+        self._syncing = False
+        for row, data in enumerate(self.rows):
+            self.fill_row(row, data)
+        get_transaction = self.controller.model.get_transaction
+        self.selected = {tid for tid in self.selected if get_transaction(tid) is not None}
+        self.restore_selection(0, len(self.rows))
+        self.scrollToTop()
+
+    def fill_row(self, row, data):
+        key, date, type_text, category, description, amount_text, is_income = data
+        self.setItem(row, 0, QTableWidgetItem(date))
+        self.setItem(row, 1, QTableWidgetItem(type_text))
+        self.setItem(row, 2, QTableWidgetItem(category))
+        self.setItem(row, 3, QTableWidgetItem(description))
+
+        amount_item = QTableWidgetItem(amount_text)
+        amount_item.setForeground(QColor(
+            HyprlandStyles.ACCENT_SUCCESS if is_income else HyprlandStyles.ACCENT_ERROR))
+        self.setItem(row, 4, amount_item)
+
+        # Delete button - styled by the table's row_actions sheet
+        delete_btn = QPushButton("Delete")
+        delete_btn.clicked.connect(lambda checked, tid=key[1]: self.delete_requested.emit(tid))
+        self.setCellWidget(row, 5, delete_btn)
+
+    def selected_ids(self):
+        """Ids of the selected rows still in the ledger, newest first, loaded or not"""
+        get_transaction = self.controller.model.get_transaction
+        transactions = [t for t in map(get_transaction, self.selected) if t is not None]
+        transactions.sort(key=lambda t: (t.date, t.id), reverse=True)
+        return [t.id for t in transactions]
+
+    def selectAll(self):
+        """Ctrl+A: every row in the ledger, not only the loaded window"""
+        self.selected = {t.id for t in self.controller.model.iter_transactions()}
+        self._syncing = True
+        super().selectAll()
+        self._syncing = False
+
+    def selectionCommand(self, index, event=None):
+        command = super().selectionCommand(index, event)
+        if command & QItemSelectionModel.SelectionFlag.Clear:
+            # A plain click or Shift-click starts over, so picks outside the window go too;
+            # on_selection_changed then takes care of the loaded rows
+            rows = self.rows
+            self.selected = {rows[index.row()][0][1] for index in self.selectionModel().selectedRows()
+                             if index.row() < len(rows)}
+        return command
+
+    def on_selection_changed(self, selected, deselected):
+        if self._syncing:
+            return
+        rows = self.rows
+        for index in deselected.indexes():
+            if index.column() == 0 and index.row() < len(rows):
+                self.selected.discard(rows[index.row()][0][1])
+        for index in selected.indexes():
+            if index.column() == 0 and index.row() < len(rows):
+                self.selected.add(rows[index.row()][0][1])
+
+    def restore_selection(self, start: int, count: int):
+        """Select the rows in [start, start + count) whose ids are picked"""
+        if not self.selected:
+            return
+        flags = QItemSelectionModel.SelectionFlag.Select | QItemSelectionModel.SelectionFlag.Rows
+        selection_model = self.selectionModel()
+        self._syncing = True
+        for row in range(start, start + count):
+            if self.rows[row][0][1] in self.selected:
+                selection_model.select(self.model().index(row, 0), flags)
+        self._syncing = False
+
+    def on_scroll(self, value: int):
+        bar = self.verticalScrollBar()
+        margin = max(1, bar.pageStep() // 2)
+        if value >= bar.maximum() - margin and self.has_older and self.rows:
+            self.fetch('older', self.rows[-1][0])
+        elif value <= bar.minimum() + margin and self.has_newer and self.rows:
+            self.fetch('newer', self.rows[0][0])
+
+    def fetch(self, direction: str, key):
+        if direction in self.pending:
+            return
+        # Keyset paging bisects the key list, so reading a page here costs O(page)
+        if direction == 'older':
+            page = self.controller.get_transactions_page(self.page_size, after=key)
+        else:
+            page = self.controller.get_transactions_page(self.page_size, before=key)
+        task = _PageFetch(self.generation, direction, page)
+        task.signals.loaded.connect(self.on_page_loaded)
+        self.pending[direction] = task
+        QThreadPool.globalInstance().start(task)
+
+    def on_page_loaded(self, generation: int, direction: str, rows):
+        if generation != self.generation:
+            return  # the table was reset while this page was in flight
+        self.pending.pop(direction, None)
+        bar = self.verticalScrollBar()
+
+        if direction == 'older':
+            self.has_older = len(rows) == self.page_size
+            start = len(self.rows)
+            self.rows.extend(rows)
+            self.setRowCount(len(self.rows))
+            for offset, data in enumerate(rows):
+                self.fill_row(start + offset, data)
+            self.restore_selection(start, len(rows))
+            overflow = len(self.rows) - self.max_rows
+            if overflow > 0:
+                value = bar.value()
+                self._syncing = True
+                del self.rows[:overflow]
+                for _ in range(overflow):
+                    self.removeRow(0)
+                self._syncing = False
+                self.has_newer = True
+                bar.setValue(value - overflow)
+        else:
+            self.has_newer = len(rows) == self.page_size
+            # Pages arrive newest first; insert them above the current window
+            value = bar.value()
+            for data in reversed(rows):
+                self.rows.insert(0, data)
+                self.insertRow(0)
+                self.fill_row(0, data)
+            self.restore_selection(0, len(rows))
+            overflow = len(self.rows) - self.max_rows
+            if overflow > 0:
+                self._syncing = True
+                del self.rows[-overflow:]
+                self.setRowCount(len(self.rows))
+                self._syncing = False
+                self.has_older = True
+            bar.setValue(value + len(rows))
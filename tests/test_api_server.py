@@ -0,0 +1,34 @@
+import pytest
+import requests
+
+from controllers.budget_controller import BudgetController
+from models.budget import BudgetModel, Transaction
+from utils.api_server import start_api_server
+
+
+@pytest.fixture
+def api(tmp_path):
+    model = BudgetModel(str(tmp_path / 'budget.json'), autoload=False)
+    model.add_transactions([Transaction(f"id-{i}", 1.0 + i, 'Food', '', f"2024-01-{i + 1:02d}", 'expense')
+                            for i in range(3)], save=False)
+    server, _, url = start_api_server(BudgetController(model))
+    yield url
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize('limit', ['0', '-1', '1001', 'ten'])
+def test_transactions_refuses_limits_out_of_range(api, limit):
+    response = requests.get(f"{api}/transactions", params={'limit': limit}, timeout=5)
+    assert response.status_code == 400
+
+
+def test_transactions_pages_through_the_ledger(api):
+    ids, after = [], None
+    while True:
+        page = requests.get(f"{api}/transactions", params={'limit': 2, 'after': after}, timeout=5).json()
+        ids += [t['id'] for t in page['transactions']]
+        after = page['next']
+        if after is None:
+            break
+    assert sorted(ids) == ['id-0', 'id-1', 'id-2']
@@ -0,0 +1,36 @@
+import pytest
+
+from models.budget import BudgetModel, Transaction
+
+
+def row(i, day='2024-01-05'):
+    return Transaction(f"id-{i}", 10.0 + i, 'Food', f"row {i}", day, 'expense')
+
+
+@pytest.fixture
+def model(tmp_path):
+    model = BudgetModel(str(tmp_path / 'budget.json'), autoload=False)
+    model.add_transactions([row(0)], save=False)
+    return model
+
+
+@pytest.mark.parametrize('with_cube', [False, True])
+@pytest.mark.parametrize('bad', [row(2, day='01/05/2024'), row(2, day='2024-02-30'),
+                                 Transaction('id-2', '12', 'Food', '', '2024-01-05', 'expense')])
+def test_a_bad_row_refuses_the_whole_batch(model, with_cube, bad):
+    if with_cube:
+        model.cube
+    version = model.data_version
+
+    with pytest.raises(ValueError, match='id-2'):
+        model.add_transactions([row(1), bad], save=False)
+
+    assert len(model.transactions) == len(model._by_id) == len(model._keys) == 1
+    assert model.data_version == version
+    assert model.get_balance() == pytest.approx(-10.0)
+
+
+def test_update_refuses_a_bad_date(model):
+    with pytest.raises(ValueError):
+        model.update_transaction(row(0, day='5 Jan 2024'))
+    assert model.get_transaction('id-0').date == '2024-01-05'
@@ -0,0 +1,50 @@
+from models.categorizer import Categorizer, CategoryRule
+
+
+def categorizer(*rules):
+    c = Categorizer(rules_file=None)
+    for rule in reversed(rules):
+        c.add_rule(rule, 0)
+    return c
+
+
+def test_first_matching_rule_wins():
+    c = Categorizer(rules_file=None)
+    assert c.classify('POS STARBUCKS #1234') == 'Food'
+    assert c.classify('ACME PAYROLL', 3000, 'income') == 'Salary'
+    assert c.classify('random') is None
+
+
+def test_rule_refused_on_amount_does_not_hide_a_lower_one():
+    c = categorizer(CategoryRule('Entertainment', keywords=['amazon'], max_amount=20, type='expense'))
+    assert c.classify('AMAZON MKTPLACE', 50) == 'Shopping'
+    assert c.classify('AMAZON MKTPLACE', 5) == 'Entertainment'
+
+
+def test_rule_refused_on_type_does_not_hide_a_lower_one():
+    c = categorizer(CategoryRule('Refund', keywords=['uber'], type='income'))
+    assert c.classify('Uber trip', 12, 'expense') == 'Transport'
+    assert c.classify('Uber trip', 12, 'income') == 'Refund'
+
+
+def test_overlapping_patterns_are_all_found():
+    c = categorizer(CategoryRule('Big', pattern=r'shell oil', min_amount=100),
+                    CategoryRule('Fuel', pattern=r'oil'))
+    assert c.classify('SHELL OIL 123', 150) == 'Big'
+    assert c.classify('SHELL OIL 123', 30) == 'Fuel'
+
+
+def test_rules_with_the_same_group_name_both_work():
+    c = categorizer(CategoryRule('Coffee', pattern=r'(?P<shop>costa|nero) coffee'),
+                    CategoryRule('Tea', pattern=r'(?P<shop>twinings) tea', keywords=['chai']))
+    assert c.classify('COSTA COFFEE 12') == 'Coffee'
+    assert c.classify('Twinings tea') == 'Tea'
+    assert c.classify('chai latte') == 'Tea'
+
+
+def test_backreferences_keep_their_meaning():
+    c = categorizer(CategoryRule('Repeat', pattern=r'(a)\1'), CategoryRule('Quoted', pattern=r"(?P<q>['\"])x(?P=q)"))
+    assert c.classify('aa') == 'Repeat'
+    assert c.classify('a') is None
+    assert c.classify("'x'") == 'Quoted'
+    assert c.classify("'x\"") is None
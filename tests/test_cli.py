@@ -0,0 +1,37 @@
+import io
+
+import cli
+from models.auth import AuthModel
+
+
+def test_user_add_creates_an_account_that_can_sign_in(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr('sys.stdin', io.StringIO("s3cret\n"))
+    assert cli.main(['user', 'add', 'alice', '--password-stdin']) == 0
+    assert "added alice" in capsys.readouterr().out
+
+    auth = AuthModel()
+    assert auth.authenticate('alice', 's3cret')
+    assert not auth.authenticate('alice', 'admin')
+    assert auth.has_default_password()
+
+
+def test_user_add_refuses_an_empty_password(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr('sys.stdin', io.StringIO("\n"))
+    assert cli.main(['user', 'add', 'bob', '--password-stdin']) == 1
+    assert 'bob' not in AuthModel().users
+
+
+def test_user_add_refuses_a_ledger_another_account_uses(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr('sys.stdin', io.StringIO("one\ntwo\nthree\nfour\n"))
+    assert cli.main(['user', 'add', 'a b', '--password-stdin']) == 0
+    assert cli.main(['user', 'add', 'a_b', '--password-stdin']) == 1
+    assert cli.main(['user', 'add', 'A B', '--password-stdin']) == 1
+    assert cli.main(['user', 'add', 'carol', '--ledger', 'data/budget_data.json', '--password-stdin']) == 1
+    assert "already belongs to" in capsys.readouterr().err
+
+    auth = AuthModel()
+    assert set(auth.users) == {'admin', 'a b'}
+    assert auth.authenticate('a b', 'one')
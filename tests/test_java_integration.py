@@ -0,0 +1,166 @@
+import json
+import time
+from dataclasses import replace
+
+import pytest
+
+from models.budget import BudgetModel, Transaction
+from utils.java_integration import CheckpointError, JavaIntegration
+from utils.java_stub_server import JavaStubState, start_stub_server
+from utils.sync_service import SyncService
+
+
+def row(i, kind='expense'):
+    return Transaction(f"id-{i:05d}", 10.0 + i, 'Food', f"row {i}", f"2024-{i % 12 + 1:02d}-01T00:00:00", kind)
+
+
+@pytest.fixture
+def model(tmp_path):
+    return BudgetModel(str(tmp_path / 'budget.json'), autoload=False)
+
+
+@pytest.fixture
+def stub():
+    servers = []
+
+    def start(rows=(), fail_every=0):
+        server, state, url = start_stub_server(state=JavaStubState([t.to_dict() for t in rows], fail_every))
+        servers.append(server)
+        return state, url
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def client(url, tmp_path, chunk_size=1000):
+    # No transport retries: every injected failure reaches the caller
+    return JavaIntegration(url, chunk_size=chunk_size, max_retries=0,
+                           checkpoint_file=str(tmp_path / 'checkpoint.json'))
+
+
+def checkpoint(tmp_path):
+    with open(tmp_path / 'checkpoint.json') as f:
+        return json.load(f)
+
+
+def test_export_resumes_from_the_last_acknowledged_chunk(model, stub, tmp_path):
+    model.add_transactions([row(i) for i in range(2500)])
+    state, url = stub(fail_every=2)
+    java = client(url, tmp_path)
+
+    assert not java.export_to_java(model)
+    export = checkpoint(tmp_path)['export']
+    assert export['acknowledged'] == 0
+
+    assert not java.export_to_java(model)
+    assert checkpoint(tmp_path)['export'] == dict(export, acknowledged=1)
+
+    assert java.export_to_java(model)
+    assert 'export' not in checkpoint(tmp_path)
+    assert sorted(state.received[export['id']]) == [0, 1, 2]
+    assert [r['id'] for r in state.imported(export['id'])] == [t.id for t in model.iter_transactions()]
+
+
+def test_import_resumes_from_the_saved_cursor(model, stub, tmp_path):
+    state, url = stub([row(i, 'income') for i in range(2500)], fail_every=2)
+    java = client(url, tmp_path)
+
+    assert not java.import_from_java(model)
+    assert checkpoint(tmp_path)['import'] == {'cursor': '1000'}
+    assert len(model.transactions) == 1000
+    # The pages already applied were saved before the cursor moved past them
+    assert len(BudgetModel(model.data_file).transactions) == 1000
+
+    assert not java.import_from_java(model)
+    assert checkpoint(tmp_path)['import'] == {'cursor': '2000'}
+
+    assert java.import_from_java(model)
+    assert 'import' not in checkpoint(tmp_path)
+    assert len(model.transactions) == 2500
+    assert model.get_balance() == pytest.approx(sum(10.0 + i for i in range(2500)))
+
+
+def test_push_sends_each_change_once_and_pull_applies_java_changes(model, stub, tmp_path):
+    state, url = stub()
+    java = client(url, tmp_path)
+    model.add_transactions([row(i) for i in range(3)])
+
+    assert java.push_changes(model)
+    assert [r['id'] for r in state.received_changes] == ['id-00000', 'id-00001', 'id-00002']
+    assert checkpoint(tmp_path)['delta']['exported_seq'] == 3
+
+    model.update_transaction(replace(model.get_transaction('id-00001'), amount=99.0))
+    assert java.push_changes(model)
+    assert [r['seq'] for r in state.received_changes] == [1, 2, 3, 4]
+    assert state.received_changes[-1]['transaction']['amount'] == 99.0
+
+    state.record_change('add', row(7, 'income').to_dict())
+    state.record_change('delete', {'id': 'id-00000'})
+    assert java.pull_changes(model)
+    assert model.get_transaction('id-00007') is not None
+    assert model.get_transaction('id-00000') is None
+    assert checkpoint(tmp_path)['delta']['imported_seq'] == 2
+
+
+def test_pull_falls_back_to_a_full_import_when_java_pruned_its_log(model, stub, tmp_path):
+    state, url = stub([row(i, 'income') for i in range(5)])
+    state.change_floor = 40
+    state.record_change('add', row(5, 'income').to_dict())
+    java = client(url, tmp_path)
+
+    assert java.pull_changes(model)
+    assert len(model.transactions) == 5
+    assert checkpoint(tmp_path)['delta']['imported_seq'] == 41
+
+    # From the new mark on, deltas work again
+    state.record_change('add', row(6, 'income').to_dict())
+    assert java.pull_changes(model)
+    assert model.get_transaction('id-00006') is not None
+    assert checkpoint(tmp_path)['delta']['imported_seq'] == 42
+
+
+def test_checkpoint_after_a_push_fails_midway(model, stub, tmp_path):
+    state, url = stub(fail_every=3)
+    java = client(url, tmp_path, chunk_size=2)
+    model.add_transactions([row(i) for i in range(5)])
+
+    assert not java.push_changes(model)
+    # Two chunks of two were acknowledged before the third request failed
+    assert checkpoint(tmp_path)['delta'] == {'exported_seq': 4}
+    # The log was pruned through the mark, not further
+    assert model.changes_since(3) is None
+    assert [record['seq'] for record in model.changes_since(4)] == [5]
+
+    assert java.push_changes(model)
+    assert [r['seq'] for r in state.received_changes] == [1, 2, 3, 4, 5]
+    assert checkpoint(tmp_path)['delta'] == {'exported_seq': 5}
+
+
+def test_damaged_checkpoint_is_reported(tmp_path):
+    (tmp_path / 'checkpoint.json').write_text('{"delta": {"exported')
+    java = client('http://127.0.0.1:9/api', tmp_path)
+    with pytest.raises(CheckpointError):
+        java.delta_mark('exported_seq')
+
+
+def test_sync_service_falls_back_to_full_transfers(model, stub, tmp_path):
+    model.add_transactions([row(i) for i in range(30)])
+    model.changes.prune(model.changes.seq)
+    state, url = stub([row(100 + i, 'income') for i in range(20)])
+    state.change_floor = 7
+    service = SyncService(model, client(url, tmp_path, chunk_size=8), poll_interval=60, base_delay=0.01).start()
+    try:
+        deadline = time.time() + 10
+        while time.time() < deadline:
+            # Both marks are set once their full transfer is done
+            if service.integration.delta_mark('exported_seq') and service.integration.delta_mark('imported_seq'):
+                break
+            time.sleep(0.02)
+    finally:
+        service.stop()
+    assert len(model.transactions) == 50
+    # The export may start before or after the import lands; either way it holds every local row
+    exported = {r['id'] for r in state.imported(next(iter(state.received)))}
+    assert {f"id-{i:05d}" for i in range(30)} <= exported
+    assert checkpoint(tmp_path)['delta']['imported_seq'] == 7
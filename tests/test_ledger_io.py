@@ -0,0 +1,60 @@
+import io
+
+import pytest
+
+import cli
+from models.budget import BudgetModel
+from utils.ledger_io import export_ledger, import_ledger, read_csv, read_ndjson
+
+HEADER = "id,amount,category,description,date,type\n"
+
+
+@pytest.fixture
+def model(tmp_path):
+    return BudgetModel(str(tmp_path / 'budget.json'), autoload=False)
+
+
+def test_written_files_read_back_unchanged(model, tmp_path):
+    model.add_transactions(list(read_csv(io.StringIO(
+        HEADER + "a,12.5,Food,Lunch,2024-05-01T12:00:00,expense\nb,3000,Salary,Pay,2024-05-02,income\n"))))
+    for name in ('ledger.csv', 'ledger.ndjson'):
+        other = BudgetModel(str(tmp_path / f'{name}.json'), autoload=False)
+        export_ledger(model, str(tmp_path / name))
+        assert import_ledger(other, str(tmp_path / name)) == 2
+        assert list(other.iter_transactions()) == list(model.iter_transactions())
+
+
+def test_csv_ledger_row_with_a_non_iso_date_is_refused():
+    with pytest.raises(ValueError, match="YYYY-MM-DD"):
+        list(read_csv(io.StringIO(HEADER + "a,5,Food,Lunch,01/05/2024,expense\n")))
+
+
+def test_cli_import_of_a_bad_csv_row_leaves_the_ledger_usable(tmp_path, capsys):
+    path = tmp_path / 'ledger.csv'
+    path.write_text(HEADER + "a,5,Food,Lunch,01/05/2024,expense\n")
+    data = str(tmp_path / 'budget.json')
+    assert cli.main(['--data', data, 'import', str(path)]) == 1
+    assert "added" not in capsys.readouterr().out
+    assert cli.main(['--data', data, 'report']) == 0
+
+
+def test_negative_amount_means_the_same_in_csv_and_ndjson():
+    [from_csv] = read_csv(io.StringIO(HEADER + "a,-5,Food,Lunch,2024-05-01,expense\n"))
+    [from_ndjson] = read_ndjson(io.StringIO(
+        '{"id":"a","amount":-5,"category":"Food","description":"Lunch","date":"2024-05-01","type":"expense"}\n'))
+    assert from_csv == from_ndjson
+    assert (from_csv.amount, from_csv.type) == (5.0, 'expense')
+
+
+def test_ndjson_string_amount_is_parsed_not_crashed_on():
+    [t] = read_ndjson(io.StringIO(
+        '{"id":"a","amount":"5","category":"Food","description":"Lunch","date":"2024-05-01","type":"expense"}\n'))
+    assert t.amount == 5.0
+
+
+def test_ndjson_bad_date_and_bad_amount_raise_value_error():
+    line = '{{"id":"a","amount":{},"category":"Food","description":"x","date":"{}","type":"expense"}}\n'
+    with pytest.raises(ValueError):
+        list(read_ndjson(io.StringIO(line.format(5, '2024-13-45'))))
+    with pytest.raises(ValueError):
+        list(read_ndjson(io.StringIO(line.format('"five"', '2024-05-01'))))
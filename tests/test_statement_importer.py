@@ -0,0 +1,24 @@
+import pytest
+
+from utils.statement_importer import parse_csv_statement
+
+
+def dates(text):
+    return [row[4][:10] for row in parse_csv_statement(text, 'test.csv')]
+
+
+def test_one_date_format_for_the_whole_file():
+    text = "Date,Description,Amount\n03/02/2024,Coffee,-3.50\n15/02/2024,Salary,3200\n"
+    assert dates(text) == ['2024-02-03', '2024-02-15']
+
+
+def test_ambiguous_file_uses_the_first_listed_format():
+    text = "Date,Description,Amount\n03/02/2024,Coffee,-3.50\n04/02/2024,Tea,-2.00\n"
+    assert dates(text) == ['2024-03-02', '2024-04-02']
+
+
+def test_mixed_date_formats_are_refused():
+    text = "Date,Description,Amount\n2024-02-03,Coffee,-3.50\n15/02/2024,Salary,3200\n"
+    with pytest.raises(ValueError, match="mix formats"):
+        parse_csv_statement(text, 'test.csv')
+